@@ -1,12 +1,13 @@
 from rest_framework import serializers
 from .models import CuadroToken
+from fondiart_api.fieldsets import SparseFieldsetSerializerMixin
 
 class CuadroTokenSerializer(serializers.ModelSerializer):
     class Meta:
         model = CuadroToken
         fields = '__all__'
 
-class CuadroTokenDetailSerializer(serializers.ModelSerializer):
+class CuadroTokenDetailSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     artwork_title = serializers.CharField(source='artwork.title', read_only=True)
     FractionFrom = serializers.DecimalField(source='artwork.fractionFrom', max_digits=10, decimal_places=2, read_only=True)
     artwork_image = serializers.CharField(source='artwork.image.name', read_only=True)
@@ -5,19 +5,25 @@ from django.shortcuts import get_object_or_404
 from fondiart_api.models import Artwork, Wallet
 from rest_framework.permissions import IsAuthenticated
 from fondiart_api.permissions import IsAdminRoleUser
+from fondiart_api.conditional import ConditionalListMixin, CUADRO_TOKEN, ARTWORK
+from fondiart_api.query_plan import QueryPlanMixin
+from fondiart_api.fieldsets import SparseFieldsetMixin
+from fondiart_api.detail_cache import get_artwork_section, set_artwork_section, invalidate_artwork, CONTRACT_ADDRESS
 from .models import CuadroToken
 from .cuadro_token_service import deploy_and_tokenize, transfer_tokens
 from .serializers import CuadroTokenSerializer, TransferTokensSerializer, CuadroTokenDetailSerializer
 import os
 from django.db import transaction
-from fondiart_api.models import User
 from finance.models import TokenHolding
+from finance.platform_accounts import get_platform_accounts
 from rest_framework.views import APIView
 
-class CuadroTokenListView(generics.ListAPIView):
+class CuadroTokenListView(ConditionalListMixin, SparseFieldsetMixin, QueryPlanMixin, generics.ListAPIView):
     queryset = CuadroToken.objects.all()
     serializer_class = CuadroTokenDetailSerializer
+    select_related_fields = ('artwork',)
     permission_classes = []
+    etag_resources = (CUADRO_TOKEN, ARTWORK)
 
 class TokenizeArtworkView(generics.GenericAPIView):
     permission_classes = [IsAdminRoleUser]
@@ -77,6 +83,8 @@ class TokenizeArtworkView(generics.GenericAPIView):
                 defaults=token_defaults
             )
             print(f"[DEBUG] update_or_create successful. Token was created: {created}")
+            invalidate_artwork(artwork.id)
+            set_artwork_section(artwork.id, CONTRACT_ADDRESS, token_instance.contract_address)
 
             serializer = self.get_serializer(token_instance)
             print("[DEBUG] Serialization successful. Returning 201 CREATED.")
@@ -119,8 +127,11 @@ class GetContractAddressView(generics.GenericAPIView):
 
     def get(self, request, *args, **kwargs):
         artwork_id = self.kwargs.get('artwork_id')
-        token = get_object_or_404(CuadroToken, artwork_id=artwork_id)
-        return Response({'contract_address': token.contract_address}, status=status.HTTP_200_OK)
+        contract_address = get_artwork_section(
+            artwork_id, CONTRACT_ADDRESS,
+            lambda: get_object_or_404(CuadroToken, artwork_id=artwork_id).contract_address,
+        )
+        return Response({'contract_address': contract_address}, status=status.HTTP_200_OK)
 
 class InitialTokenDistributionView(APIView):
     permission_classes = [IsAdminRoleUser]
@@ -131,21 +142,21 @@ class InitialTokenDistributionView(APIView):
         cuadro_token = get_object_or_404(CuadroToken, artwork=artwork)
         
         artist = artwork.artist
-        admin_user = User.objects.filter(role='admin').first()
+        platform_accounts = get_platform_accounts()
 
-        if not admin_user:
+        if platform_accounts is None:
             return Response({'error': 'No admin user found.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         distributions = [
-            {'user': artist, 'amount': 60000},
-            {'user': admin_user, 'amount': 10000}
+            {'user_id': artist.id, 'amount': 60000},
+            {'user_id': platform_accounts.user_id, 'amount': 10000}
         ]
 
         try:
             with transaction.atomic():
                 for dist in distributions:
                     TokenHolding.objects.create(
-                        user=dist['user'],
+                        user_id=dist['user_id'],
                         token=cuadro_token,
                         quantity=dist['amount'],
                         purchase_price=0
@@ -0,0 +1,83 @@
+from decimal import Decimal
+from django.db.models import Q, Sum
+
+from .ledger import CHECKPOINT_INTERVAL, cents, signed_amount, signed_amount_expression
+from .models import BalanceCheckpoint, CuentaComitente, Transaccion
+
+
+def _after(fecha, transaccion_id):
+    return Q(fecha__gt=fecha) | Q(fecha=fecha, id__gt=transaccion_id)
+
+
+def balance_at(cuenta_id, at, inclusive=True):
+    """
+    Balance of an account at a point in time, after (inclusive=True) or
+    before the transactions stamped exactly at `at`.
+
+    Rows posted through the ledger carry balance_after, so this is usually
+    one lookup on the (cuenta, fecha) index. Older rows are replayed from
+    the closest BalanceCheckpoint, which bounds the slice to at most
+    BALANCE_CHECKPOINT_INTERVAL transactions once checkpoint_balances has
+    run over them.
+    """
+    rows = Transaccion.objects.filter(cuenta_id=cuenta_id, **{'fecha__lte' if inclusive else 'fecha__lt': at})
+    last = rows.order_by('-fecha', '-id').values('id', 'fecha', 'balance_after').first()
+    if last is None:
+        return Decimal('0.00')
+    if last['balance_after'] is not None:
+        return last['balance_after']
+
+    checkpoint = (
+        BalanceCheckpoint.objects.filter(cuenta_id=cuenta_id, fecha__lte=last['fecha'])
+        .order_by('-fecha', '-transaccion_id').values('fecha', 'transaccion_id', 'balance').first()
+    )
+    if checkpoint is None:
+        base = Decimal('0.00')
+    else:
+        base = checkpoint['balance']
+        rows = rows.filter(_after(checkpoint['fecha'], checkpoint['transaccion_id']))
+    movement = rows.aggregate(total=Sum(signed_amount_expression()))['total']
+    return base + cents(movement or 0)
+
+
+def checkpoint_account(cuenta_id, interval=CHECKPOINT_INTERVAL, batch_size=2000):
+    """
+    Fills balance_after on the account's rows that lack it and adds the
+    missing checkpoints, replaying forward from the last row with a known
+    balance. Used by the checkpoint_balances command for rows written
+    before the ledger kept running balances. Returns the rows updated.
+    """
+    known = (
+        Transaccion.objects.filter(cuenta_id=cuenta_id, balance_after__isnull=False)
+        .order_by('-fecha', '-id').values('id', 'fecha', 'balance_after').first()
+    )
+    pending = Transaccion.objects.filter(cuenta_id=cuenta_id, balance_after__isnull=True)
+    balance = Decimal('0.00')
+    position = Transaccion.objects.filter(cuenta_id=cuenta_id, balance_after__isnull=False).count()
+    if known is not None:
+        balance = known['balance_after']
+        pending = pending.filter(_after(known['fecha'], known['id']))
+
+    updated, batch, checkpoints = 0, [], []
+    for row in pending.order_by('fecha', 'id').only('id', 'cuenta_id', 'tipo', 'monto_pesos', 'fecha').iterator(chunk_size=batch_size):
+        balance += signed_amount(row.tipo, row.monto_pesos)
+        position += 1
+        row.balance_after = balance
+        batch.append(row)
+        if position % interval == 0:
+            checkpoints.append(BalanceCheckpoint(cuenta_id=cuenta_id, transaccion_id=row.id, fecha=row.fecha, balance=balance))
+        if len(batch) >= batch_size:
+            updated += Transaccion.objects.bulk_update(batch, ['balance_after'])
+            batch = []
+    if batch:
+        updated += Transaccion.objects.bulk_update(batch, ['balance_after'])
+    BalanceCheckpoint.objects.bulk_create(checkpoints, ignore_conflicts=True)
+    return updated
+
+
+def checkpoint_all_accounts(interval=CHECKPOINT_INTERVAL):
+    total = 0
+    pending = Transaccion.objects.filter(balance_after__isnull=True).values('cuenta_id')
+    for cuenta_id in CuentaComitente.objects.filter(pk__in=pending).values_list('pk', flat=True).iterator():
+        total += checkpoint_account(cuenta_id, interval=interval)
+    return total
@@ -0,0 +1,96 @@
+import csv
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from rest_framework.exceptions import ValidationError
+
+from .history import MAX_ID, filter_transactions
+from .models import CuentaComitente, Donation, TokenHolding, Transaccion
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Dataset name -> (base queryset for a user, exported columns)
+DATASETS = {
+    'transactions': (
+        # Filtered on the account id rather than through a join, so the
+        # (cuenta, id) index serves the id order and the resume seek
+        lambda user_id: Transaccion.objects.filter(cuenta_id=CuentaComitente.objects.filter(user_id=user_id).values('pk')[:1]),
+        ('id', 'fecha', 'tipo', 'estado', 'monto_pesos', 'balance_after', 'cantidad_tokens', 'artwork_id', 'recipient_artist_id'),
+    ),
+    'holdings': (
+        lambda user_id: TokenHolding.objects.filter(user_id=user_id),
+        ('id', 'purchase_date', 'token_id', 'token__token_symbol', 'token__artwork_id', 'quantity', 'purchase_price'),
+    ),
+    'donations': (
+        lambda user_id: Donation.objects.filter(donor_id=user_id),
+        ('id', 'timestamp', 'project_id', 'project__title', 'amount'),
+    ),
+}
+
+
+class _Echo:
+    # csv.writer only needs write(); returning the line lets it be yielded
+    def write(self, value):
+        return value
+
+
+def _id_param(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        value = None
+    if value is None or not 0 <= value <= MAX_ID:
+        raise ValidationError({name: f'{name} must be a row id.'})
+    return value
+
+
+def export_rows(dataset, user_id, params):
+    """
+    Returns (columns, rows, until_id) for an export. Rows are value tuples
+    in id order, read with a server-side cursor EXPORT_CHUNK_SIZE at a time;
+    each dataset is indexed on its owner column and id, so resuming seeks
+    to after_id instead of sorting.
+
+    An export covers the ids up to until_id, which defaults to the highest
+    one when it starts, so rows created meanwhile don't shift it. A broken
+    download resumes with after_id=<last id received> and the same until_id.
+    Transactions also take the history filters (tipo, estado, artwork,
+    from, to).
+    """
+    if dataset not in DATASETS:
+        raise ValidationError({'dataset': f'dataset must be one of {", ".join(DATASETS)}.'})
+    base, columns = DATASETS[dataset]
+    queryset = base(user_id)
+    if dataset == 'transactions':
+        queryset = filter_transactions(queryset, params)
+
+    after_id = _id_param(params, 'after_id')
+    until_id = _id_param(params, 'until_id')
+    if until_id is None:
+        until_id = queryset.aggregate(last=Max('id'))['last'] or 0
+    queryset = queryset.filter(id__lte=until_id)
+    if after_id is not None:
+        queryset = queryset.filter(id__gt=after_id)
+    rows = queryset.order_by('id').values_list(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return columns, rows, until_id
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(columns, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+}
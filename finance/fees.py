@@ -0,0 +1,40 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Sum
+
+from .ledger import Leg, Tipo, cents, external, post_transfer
+from .models import CuentaComitente, PlatformFeeAccrual, PlatformFeeSweep
+from .platform_accounts import get_platform_accounts
+
+
+def sweep_platform_fees():
+    """
+    Rolls the unswept PlatformFeeAccrual rows into the admin balance, with
+    one Transaccion per type. Rows are claimed with a single UPDATE, so
+    accruals committed while the sweep runs are simply left for the next
+    one. Returns the sweep, or None when there was nothing to sweep.
+    """
+    platform_accounts = get_platform_accounts()
+    if platform_accounts is None or platform_accounts.cuenta_id is None:
+        raise CuentaComitente.DoesNotExist('Admin does not have a brokerage account.')
+    with transaction.atomic():
+        sweep = PlatformFeeSweep.objects.create(cuenta_id=platform_accounts.cuenta_id)
+        claimed = PlatformFeeAccrual.objects.filter(sweep__isnull=True).update(sweep=sweep)
+        if not claimed:
+            sweep.delete()
+            return None
+
+        totals = PlatformFeeAccrual.objects.filter(sweep=sweep).values('tipo').annotate(total=Sum('monto')).order_by('tipo')
+        legs = []
+        for row in totals:
+            # SQLite sums decimals as floats
+            amount = cents(row['total'])
+            legs.append(Leg(platform_accounts.cuenta_id, row['tipo'], amount))
+            # The other side is the accruals being swept
+            legs.append(external(Tipo.RETIRO, amount))
+        post_transfer(*legs)
+
+        sweep.total = sum((leg.monto for leg in legs if leg.cuenta_id is not None), Decimal('0'))
+        sweep.accruals_count = claimed
+        sweep.save(update_fields=['total', 'accruals_count'])
+    return sweep
@@ -0,0 +1,119 @@
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from fondiart_api.models import Project
+from fondiart_api.artist_stats import adjust_artist_stats
+from fondiart_api.trending import record_project_event
+from .models import CuentaComitente, ProjectContributor, Transaccion
+from .ledger import Leg, external, post_transfer
+
+
+def funding_percentage(project):
+    if not project.funding_goal:
+        return 0.0
+    return round(float(project.amount_raised / project.funding_goal * 100), 2)
+
+
+def funding_progress(projects, user=None):
+    """
+    Donor count, total contributed and the user's own contribution for many
+    projects. The donor count is read from the Project counter; the totals
+    come from one grouped query over ProjectContributor (one row per donor).
+
+        {project_id: {'donors_count': 3, 'total_donated': Decimal, 'my_contribution': Decimal}}
+
+    Projects without contributions are included with zeros.
+    """
+    progress = {
+        project.pk: {'donors_count': project.donors_count, 'total_donated': Decimal('0'), 'my_contribution': Decimal('0')}
+        for project in projects
+    }
+    if not progress:
+        return progress
+
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    rows = (
+        ProjectContributor.objects.filter(project_id__in=list(progress))
+        .values('project_id')
+        .annotate(
+            total_donated=Sum('total_amount'),
+            my_contribution=Sum('total_amount', filter=Q(donor_id=user_id)),
+        )
+        .order_by()
+    )
+    for row in rows:
+        progress[row['project_id']]['total_donated'] = row['total_donated'] or Decimal('0')
+        progress[row['project_id']]['my_contribution'] = row['my_contribution'] or Decimal('0')
+    return progress
+
+
+def _record_contributor(project_id, donor_id, amount):
+    """
+    Adds the contribution to the (project, donor) row. Returns True when it
+    is the donor's first contribution to the project.
+    """
+    changes = {
+        'total_amount': F('total_amount') + amount,
+        'contributions_count': F('contributions_count') + 1,
+        'last_contribution_at': timezone.now(),
+    }
+    if ProjectContributor.objects.filter(project_id=project_id, donor_id=donor_id).update(**changes):
+        return False
+    try:
+        with transaction.atomic():
+            ProjectContributor.objects.create(project_id=project_id, donor_id=donor_id, total_amount=amount, contributions_count=1)
+        return True
+    except IntegrityError:
+        # A concurrent first contribution created the row in the meantime
+        ProjectContributor.objects.filter(project_id=project_id, donor_id=donor_id).update(**changes)
+        return False
+
+
+def record_project_contribution(project_id, donor_id, amount):
+    """
+    Books a contribution against a project's funding counters with
+    database-side increments, so concurrent donations never lose updates.
+    The increments lock the project row until the caller's transaction
+    commits, so keep that transaction short: contributions to the same
+    project queue behind it. Releases the funds to the artist when this
+    contribution reaches the goal.
+    """
+    with transaction.atomic():
+        Project.objects.filter(pk=project_id).update(amount_raised=F('amount_raised') + amount)
+        record_project_event(project_id, 'donation')
+        if _record_contributor(project_id, donor_id, amount):
+            Project.objects.filter(pk=project_id).update(donors_count=F('donors_count') + 1)
+        artist_id, raised, goal, disbursed = Project.objects.filter(pk=project_id).values_list(
+            'artist_id', 'amount_raised', 'funding_goal', 'funds_disbursed').get()
+        crossed = raised >= goal > raised - amount
+        adjust_artist_stats(artist_id, projects_raised=amount, projects_funded=1 if crossed else 0)
+        if raised >= goal and not disbursed:
+            disburse_project_funds(project_id)
+
+
+def disburse_project_funds(project_id):
+    """
+    Transfers the raised amount to the artist once the goal is reached.
+    The check runs under a row lock and flips funds_disbursed in the same
+    transaction, so it happens exactly once however many donations cross
+    the goal concurrently. Returns True if this call disbursed the funds.
+    """
+    with transaction.atomic():
+        project = Project.objects.select_for_update().filter(pk=project_id).first()
+        if project is None or project.funds_disbursed or project.amount_raised < project.funding_goal:
+            return False
+        try:
+            artist_account = CuentaComitente.objects.get(user_id=project.artist_id)
+        except CuentaComitente.DoesNotExist:
+            # Without an account the funds stay on the project until one exists
+            return False
+
+        # Paid out of the project's escrow, which isn't a platform account
+        post_transfer(
+            Leg(artist_account.id, Transaccion.TipoTransaccion.FINANCIACION_RECIBIDA, project.amount_raised),
+            external(Transaccion.TipoTransaccion.FINANCIACION_PROYECTO, project.amount_raised),
+        )
+        Project.objects.filter(pk=project_id).update(funds_disbursed=True)
+        return True
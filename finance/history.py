@@ -0,0 +1,73 @@
+from datetime import datetime, time
+from django.db.models import Count, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .ledger import cents
+from .models import Transaccion
+
+# Largest value a bigint id column holds; larger ones overflow the query
+MAX_ID = 2 ** 63 - 1
+
+
+def _parse_bound(name, raw, end_of_day):
+    """
+    An ISO datetime, or a date standing for the start (or end) of that day.
+    """
+    try:
+        # Well-formed but impossible values (2026-02-30) raise instead of returning None
+        at = parse_datetime(raw)
+        day = parse_date(raw) if at is None else None
+    except ValueError:
+        at = day = None
+    if at is None:
+        if day is None:
+            raise ValidationError({name: f'{name} must be an ISO 8601 date or datetime.'})
+        at = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(at):
+        at = timezone.make_aware(at)
+    return at
+
+
+def _parse_choices(name, raw, choices):
+    values = [value.strip().upper() for value in raw.split(',') if value.strip()]
+    unknown = sorted(set(values) - set(choices.values))
+    if unknown:
+        raise ValidationError({name: f'Unknown {name}: {", ".join(unknown)}.'})
+    return values
+
+
+def filter_transactions(queryset, params):
+    """
+    Applies the history filters in the query params: tipo and estado (comma
+    separated), artwork, and a from/to range on fecha, both inclusive. With
+    the account fixed they are served by the (cuenta, fecha) and
+    (cuenta, tipo, fecha) indexes.
+    """
+    if params.get('tipo'):
+        queryset = queryset.filter(tipo__in=_parse_choices('tipo', params['tipo'], Transaccion.TipoTransaccion))
+    if params.get('estado'):
+        queryset = queryset.filter(estado__in=_parse_choices('estado', params['estado'], Transaccion.EstadoTransaccion))
+    if params.get('artwork'):
+        try:
+            artwork_id = int(params['artwork'])
+        except ValueError:
+            artwork_id = None
+        if artwork_id is None or not 0 < artwork_id <= MAX_ID:
+            raise ValidationError({'artwork': 'artwork must be an artwork id.'})
+        queryset = queryset.filter(artwork_id=artwork_id)
+    if params.get('from'):
+        queryset = queryset.filter(fecha__gte=_parse_bound('from', params['from'], end_of_day=False))
+    if params.get('to'):
+        queryset = queryset.filter(fecha__lte=_parse_bound('to', params['to'], end_of_day=True))
+    return queryset
+
+
+def totals_by_type(queryset):
+    """
+    Number of transactions and amount moved per tipo, in one grouped query.
+    """
+    rows = queryset.order_by().values('tipo').annotate(count=Count('id'), total=Sum('monto_pesos'))
+    # SQLite sums decimals as floats
+    return {row['tipo']: {'count': row['count'], 'total': cents(row['total'])} for row in rows}
@@ -0,0 +1,84 @@
+import functools
+import hashlib
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_TTL = timedelta(hours=getattr(settings, 'IDEMPOTENCY_KEY_TTL_HOURS', 24))
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.method}|{request.path}|{body}'.encode('utf-8')).hexdigest()
+
+
+def _stored(user, key, expired):
+    return IdempotencyKey.objects.filter(user=user, key=key, created_at__gte=expired).first()
+
+
+def _replay(record, fingerprint):
+    if record.fingerprint != fingerprint:
+        return Response(
+            {'error': f'{IDEMPOTENCY_HEADER} was already used for a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    response = Response(record.response_body, status=record.response_status)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(handler):
+    """
+    Makes a view's post() safe to retry with an Idempotency-Key header.
+
+    The first request for a (user, key) pair runs inside one transaction
+    that also inserts the key, and stores the final response with it. A
+    retry gets the stored response back from a single indexed lookup,
+    without running the handler again. A duplicate arriving while the
+    first is still running blocks on the key's unique index until the
+    first commits, then replays its response. If the first fails, its key
+    rolls back with it and the duplicate runs normally. A 5xx response
+    rolls back the handler's writes along with the key, so the request
+    can be retried safely.
+    """
+    @functools.wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return handler(view, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'error': f'{IDEMPOTENCY_HEADER} is longer than {MAX_KEY_LENGTH} characters.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = request_fingerprint(request)
+        expired = timezone.now() - IDEMPOTENCY_KEY_TTL
+        stored = _stored(request.user, key, expired)
+        if stored is not None:
+            return _replay(stored, fingerprint)
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    IdempotencyKey.objects.filter(user=request.user, key=key, created_at__lt=expired).delete()
+                    record = IdempotencyKey.objects.create(user=request.user, key=key, fingerprint=fingerprint)
+            except IntegrityError:
+                # A concurrent request with the same key got there first and has committed by now
+                record = None
+            if record is not None:
+                response = handler(view, request, *args, **kwargs)
+                if response.status_code >= 500:
+                    transaction.set_rollback(True)
+                else:
+                    record.response_status = response.status_code
+                    record.response_body = response.data
+                    record.save(update_fields=['response_status', 'response_body'])
+                return response
+        return _replay(IdempotencyKey.objects.get(user=request.user, key=key), fingerprint)
+    return wrapper
@@ -0,0 +1,202 @@
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, When
+from django.dispatch import Signal
+
+from .models import BalanceCheckpoint, CuentaComitente, PlatformFeeAccrual, Transaccion
+
+Tipo = Transaccion.TipoTransaccion
+
+# Sign of each TipoTransaccion on the account's balance
+DEBIT_TYPES = frozenset({Tipo.COMPRA, Tipo.RETIRO, Tipo.DONACION_ENVIADA, Tipo.FINANCIACION_PROYECTO})
+CREDIT_TYPES = frozenset({Tipo.VENTA, Tipo.DEPOSITO, Tipo.DONACION_RECIBIDA, Tipo.FINANCIACION_RECIBIDA, Tipo.COMISION})
+
+CENT = Decimal('0.01')
+# cuenta_id of the legs created by platform()
+PLATFORM = 'platform'
+CHECKPOINT_INTERVAL = getattr(settings, 'BALANCE_CHECKPOINT_INTERVAL', 100)
+
+# Sent with the Transaccion rows of every posting, inside its transaction.
+# bulk_create doesn't send post_save, so this is the hook for side effects.
+transactions_posted = Signal()
+
+
+class LedgerError(Exception):
+    pass
+
+
+class UnbalancedPosting(LedgerError):
+    pass
+
+
+class InsufficientFunds(LedgerError):
+    def __init__(self, cuenta_id):
+        self.cuenta_id = cuenta_id
+        super().__init__(f'Insufficient funds in account {cuenta_id}.')
+
+
+@dataclass(frozen=True)
+class Leg:
+    """
+    One side of a posting. cuenta_id=None stands for money entering or
+    leaving the platform (a bank transfer, a project's escrow): it counts
+    towards the balance of the posting but has no account or row.
+    """
+    cuenta_id: Optional[int]
+    tipo: str
+    monto: Decimal
+    artwork_id: Optional[int] = None
+    cantidad_tokens: Optional[Decimal] = None
+    recipient_artist_id: Optional[int] = None
+    # Account paying a platform() credit, whose row the accrual is linked to
+    payer_id: Optional[int] = None
+
+    @property
+    def signed_amount(self):
+        return signed_amount(self.tipo, self.monto)
+
+
+def signed_amount(tipo, monto):
+    if tipo in CREDIT_TYPES:
+        return monto
+    if tipo in DEBIT_TYPES:
+        return -monto
+    raise LedgerError(f'Unknown transaction type {tipo}.')
+
+
+def signed_amount_expression():
+    """
+    signed_amount() as a database expression over Transaccion rows.
+    """
+    return Case(
+        When(tipo__in=list(CREDIT_TYPES), then=F('monto_pesos')),
+        default=-F('monto_pesos'),
+        output_field=DecimalField(max_digits=15, decimal_places=2),
+    )
+
+
+def cents(value):
+    """
+    Rounds an amount (e.g. a commission) to what an account can hold.
+    Postings only take whole cents, so they can't drift from the balances.
+    """
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def external(tipo, monto):
+    """
+    The outside counterpart of a leg of the given type and amount.
+    """
+    return Leg(None, tipo, monto)
+
+
+def platform(tipo, monto, payer_id=None):
+    """
+    A credit to the platform, paid by the account payer_id. Instead of
+    locking the admin account, which every trade would then queue on, it is
+    appended to PlatformFeeAccrual and rolled into the admin balance later
+    by sweep_platform_fees.
+    """
+    return Leg(PLATFORM, tipo, monto, payer_id=payer_id)
+
+
+def post_transfer(*legs, check_funds=True):
+    """
+    Applies a multi-leg transfer atomically and returns the Transaccion rows.
+
+    The signed amounts of the legs must add up to zero. The accounts are
+    locked with SELECT ... FOR UPDATE in primary key order, so concurrent
+    postings over the same accounts queue instead of deadlocking, and each
+    account is debited only if it can cover its net debit. Balances change
+    through one UPDATE with database-side arithmetic and the legs are
+    written with a single bulk_create, each with the balance it leaves its
+    account at. Every CHECKPOINT_INTERVAL transactions of an account also
+    get a BalanceCheckpoint. platform() legs only append accruals.
+    """
+    legs = [leg for leg in legs if leg.monto]
+    if any(leg.monto < 0 for leg in legs):
+        raise LedgerError('Leg amounts must be positive; the type gives the sign.')
+    if any(leg.monto != cents(leg.monto) for leg in legs):
+        raise LedgerError('Leg amounts must be whole cents.')
+    if sum((leg.signed_amount for leg in legs), Decimal('0')) != 0:
+        raise UnbalancedPosting(f'Legs do not balance: {legs}')
+
+    accruals = [leg for leg in legs if leg.cuenta_id == PLATFORM]
+    if any(leg.signed_amount < 0 for leg in accruals):
+        raise LedgerError('Platform accruals can only be credits.')
+    legs = [leg for leg in legs if leg.cuenta_id not in (None, PLATFORM)]
+    if not legs and not accruals:
+        return []
+
+    with transaction.atomic():
+        rows = _post_to_accounts(legs, check_funds) if legs else []
+        if accruals:
+            # Each accrual points at its payer's row, or the first one without a payer
+            payer_rows = {}
+            for row in reversed(rows):
+                payer_rows[row.cuenta_id] = row
+            PlatformFeeAccrual.objects.bulk_create([
+                PlatformFeeAccrual(
+                    tipo=leg.tipo, monto=leg.monto,
+                    transaccion=payer_rows.get(leg.payer_id, rows[0] if rows else None),
+                )
+                for leg in accruals
+            ])
+        transactions_posted.send(sender=Transaccion, transactions=rows)
+    return rows
+
+
+def _post_to_accounts(legs, check_funds):
+    deltas, counts = {}, {}
+    for leg in legs:
+        deltas[leg.cuenta_id] = deltas.get(leg.cuenta_id, Decimal('0')) + leg.signed_amount
+        counts[leg.cuenta_id] = counts.get(leg.cuenta_id, 0) + 1
+
+    accounts = {
+        pk: (balance, count) for pk, balance, count in
+        CuentaComitente.objects.select_for_update()
+        .filter(pk__in=deltas).order_by('pk').values_list('pk', 'balance', 'transactions_count')
+    }
+    for cuenta_id, delta in deltas.items():
+        if cuenta_id not in accounts:
+            raise CuentaComitente.DoesNotExist(f'Account {cuenta_id} does not exist.')
+        if check_funds and delta < 0 and accounts[cuenta_id][0] + delta < 0:
+            raise InsufficientFunds(cuenta_id)
+
+    CuentaComitente.objects.filter(pk__in=deltas).update(
+        balance=Case(
+            *[When(pk=cuenta_id, then=F('balance') + delta) for cuenta_id, delta in deltas.items()],
+            output_field=DecimalField(max_digits=15, decimal_places=2),
+        ),
+        transactions_count=Case(
+            *[When(pk=cuenta_id, then=F('transactions_count') + count) for cuenta_id, count in counts.items()],
+        ),
+    )
+
+    rows, checkpointed = [], []
+    running = dict(accounts)
+    for leg in legs:
+        balance, count = running[leg.cuenta_id]
+        running[leg.cuenta_id] = balance, count = balance + leg.signed_amount, count + 1
+        rows.append(Transaccion(
+            cuenta_id=leg.cuenta_id,
+            tipo=leg.tipo,
+            monto_pesos=leg.monto,
+            artwork_id=leg.artwork_id,
+            cantidad_tokens=leg.cantidad_tokens,
+            recipient_artist_id=leg.recipient_artist_id,
+            estado=Transaccion.EstadoTransaccion.COMPLETADA,
+            balance_after=balance,
+        ))
+        if count % CHECKPOINT_INTERVAL == 0:
+            checkpointed.append(rows[-1])
+    rows = Transaccion.objects.bulk_create(rows)
+    if checkpointed:
+        BalanceCheckpoint.objects.bulk_create([
+            BalanceCheckpoint(cuenta_id=row.cuenta_id, transaccion=row, fecha=row.fecha, balance=row.balance_after)
+            for row in checkpointed
+        ])
+    return rows
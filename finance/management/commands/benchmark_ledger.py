@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db.models import Sum
+
+from fondiart_api.models import User
+from finance.models import CuentaComitente, Transaccion
+from finance.ledger import Leg, InsufficientFunds, cents, post_transfer, signed_amount_expression
+
+BENCH_PREFIX = 'ledger-bench-'
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs concurrent transfers through finance.ledger.post_transfer and checks that '
+        'no money was created or lost. Works on throwaway ledger-bench-* users, removed afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=20, help='Number of user accounts transferring between each other.')
+        parser.add_argument('--workers', type=int, default=8, help='Number of concurrent threads.')
+        parser.add_argument('--transfers', type=int, default=200, help='Transfers per worker.')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark users and their transactions.')
+
+    def handle(self, *args, **options):
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+        accounts = self.create_accounts(options['accounts'])
+        fee_account = accounts.pop()
+        initial_total = sum(balance for _, balance in accounts) + fee_account[1]
+
+        stats = {'posted': 0, 'rejected': 0, 'retries': 0}
+        lock = threading.Lock()
+        account_ids = [pk for pk, _ in accounts]
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(options['transfers']):
+                    payer, payee = rng.sample(account_ids, 2)
+                    amount = cents(Decimal(rng.randint(1, 5000)) / 100)
+                    fee = cents(amount * Decimal('0.02'))
+                    outcome = self.transfer(payer, payee, fee_account[0], amount, fee)
+                    with lock:
+                        for key, value in outcome.items():
+                            stats[key] += value
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(options['workers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{stats['posted']} transfers posted, {stats['rejected']} rejected for insufficient funds, "
+            f"{stats['retries']} retried, in {elapsed:.2f}s ({stats['posted'] / elapsed:.1f} transfers/s)."
+        )
+        try:
+            self.check_conservation(accounts + [fee_account], initial_total)
+        finally:
+            if not options['keep']:
+                User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+
+    def create_accounts(self, count):
+        accounts = []
+        for i in range(max(count, 2) + 1):
+            user = User.objects.create_user(
+                username=f'{BENCH_PREFIX}{i}', email=f'{BENCH_PREFIX}{i}@example.com', password=None, name=f'Bench {i}',
+            )
+            balance = Decimal('1000.00')
+            accounts.append((CuentaComitente.objects.create(user=user, balance=balance).pk, balance))
+        return accounts
+
+    def transfer(self, payer, payee, fee_account, amount, fee):
+        retries = 0
+        while True:
+            try:
+                post_transfer(
+                    Leg(payer, Transaccion.TipoTransaccion.RETIRO, amount + fee),
+                    Leg(payee, Transaccion.TipoTransaccion.DEPOSITO, amount),
+                    Leg(fee_account, Transaccion.TipoTransaccion.COMISION, fee),
+                )
+                return {'posted': 1, 'retries': retries}
+            except InsufficientFunds:
+                return {'rejected': 1, 'retries': retries}
+            except OperationalError:
+                # SQLite reports lock contention instead of waiting on it
+                retries += 1
+                time.sleep(0.001 * retries)
+
+    def check_conservation(self, accounts, initial_total):
+        initial = dict(accounts)
+        balances = dict(CuentaComitente.objects.filter(pk__in=initial).values_list('pk', 'balance'))
+        movements = dict(
+            Transaccion.objects.filter(cuenta_id__in=initial)
+            .values('cuenta_id').annotate(total=Sum(signed_amount_expression())).order_by()
+            .values_list('cuenta_id', 'total')
+        )
+
+        total = sum(balances.values())
+        # SQLite sums decimals as floats, hence the rounding
+        mismatched = [
+            pk for pk, balance in balances.items()
+            if balance != initial[pk] + cents(movements.get(pk) or 0)
+        ]
+        negative = [pk for pk, balance in balances.items() if balance < 0]
+        if total != initial_total or mismatched or negative:
+            raise CommandError(
+                f'Ledger inconsistent: total {total} (expected {initial_total}), '
+                f'{len(mismatched)} accounts disagree with their transactions, {len(negative)} negative.'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Funds conserved: {total} across {len(balances)} accounts, every balance matches its transactions.'
+        ))
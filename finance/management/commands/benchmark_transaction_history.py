@@ -0,0 +1,109 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from fondiart_api.models import User
+from finance.models import CuentaComitente, Transaccion
+from finance.history import filter_transactions, totals_by_type
+
+BENCH_USERNAME = 'history-bench'
+
+
+class Command(BaseCommand):
+    help = (
+        'Times the transaction history queries (first page, type and date filters, totals per type) '
+        'over a throwaway history-bench account with --rows transactions, removed afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Transactions to generate for the benchmark account.')
+        parser.add_argument('--other-accounts', type=int, default=20, help='Accounts sharing the table, each with a slice of the rows.')
+        parser.add_argument('--days', type=int, default=730, help='Spread the rows over this many days.')
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs of each query; the best one is reported.')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark users and their transactions.')
+
+    def handle(self, *args, **options):
+        self.cleanup()
+        cuenta_ids = self.create_accounts(options['other_accounts'])
+        started = time.perf_counter()
+        self.generate(cuenta_ids, options['rows'], options['days'], options['batch_size'])
+        self.stdout.write(f"Inserted {options['rows']} transactions in {time.perf_counter() - started:.1f}s.")
+
+        try:
+            self.run_queries(cuenta_ids[0], options['days'], options['repeat'])
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    def cleanup(self):
+        accounts = CuentaComitente.objects.filter(user__username__startswith=BENCH_USERNAME)
+        Transaccion.objects.filter(cuenta__in=accounts).delete()
+        User.objects.filter(username__startswith=BENCH_USERNAME).delete()
+
+    def create_accounts(self, others):
+        cuenta_ids = []
+        for i in range(others + 1):
+            user = User.objects.create_user(
+                username=f'{BENCH_USERNAME}-{i}', email=f'{BENCH_USERNAME}-{i}@example.com', password=None, name=f'History bench {i}',
+            )
+            cuenta_ids.append(CuentaComitente.objects.create(user=user).pk)
+        return cuenta_ids
+
+    def generate(self, cuenta_ids, rows, days, batch_size):
+        # fecha is auto_now_add, which bulk_create would overwrite, so the rows go in as plain inserts
+        rng = random.Random(0)
+        tipos = Transaccion.TipoTransaccion.values
+        estados = Transaccion.EstadoTransaccion.values
+        now = timezone.now()
+        # Half the rows belong to the measured account, the rest are spread over the others
+        weights = [len(cuenta_ids) - 1] + [1] * (len(cuenta_ids) - 1)
+        sql = (
+            f'INSERT INTO {Transaccion._meta.db_table} (cuenta_id, tipo, monto_pesos, fecha, estado) '
+            'VALUES (%s, %s, %s, %s, %s)'
+        )
+        fecha_field = Transaccion._meta.get_field('fecha')
+        for start in range(0, rows, batch_size):
+            batch = [
+                (
+                    rng.choices(cuenta_ids, weights)[0],
+                    rng.choice(tipos),
+                    str(Decimal(rng.randint(1, 1_000_000)) / 100),
+                    fecha_field.get_db_prep_value(now - timedelta(seconds=rng.randint(0, days * 86400)), connection),
+                    rng.choice(estados),
+                )
+                for _ in range(min(batch_size, rows - start))
+            ]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+
+    def run_queries(self, cuenta_id, days, repeat):
+        user_id = CuentaComitente.objects.filter(pk=cuenta_id).values_list('user_id', flat=True).get()
+        history = Transaccion.objects.filter(cuenta__user_id=user_id)
+        month_ago = (timezone.now() - timedelta(days=30)).isoformat()
+        year = (timezone.now() - timedelta(days=min(days, 365))).isoformat()
+        cases = [
+            ('first page', lambda: list(history.order_by('-fecha', '-pk')[:20])),
+            ('tipo=COMPRA, first page', lambda: list(
+                filter_transactions(history, {'tipo': 'COMPRA'}).order_by('-fecha', '-pk')[:20])),
+            ('last 30 days, first page', lambda: list(
+                filter_transactions(history, {'from': month_ago}).order_by('-fecha', '-pk')[:20])),
+            ('tipo=VENTA,DEPOSITO over a year, count', lambda: filter_transactions(
+                history, {'tipo': 'VENTA,DEPOSITO', 'from': year}).count()),
+            ('totals per type, last 30 days', lambda: totals_by_type(filter_transactions(history, {'from': month_ago}))),
+            ('totals per type, all time', lambda: totals_by_type(history)),
+        ]
+        for label, run in cases:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(f'{label:<42} {min(timings) * 1000:9.1f} ms')
+
+        plan = filter_transactions(history, {'tipo': 'COMPRA', 'from': month_ago}).order_by('-fecha', '-pk')[:20].explain()
+        self.stdout.write(f'Plan for a filtered page:\n{plan}')
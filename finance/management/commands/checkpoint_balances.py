@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from finance.balances import checkpoint_all_accounts
+from finance.ledger import CHECKPOINT_INTERVAL
+
+class Command(BaseCommand):
+    help = 'Fills Transaccion.balance_after and the balance checkpoints for rows written before the ledger kept running balances.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=CHECKPOINT_INTERVAL, help='Transactions per account between checkpoints.')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Replaying account histories...')
+        total = checkpoint_all_accounts(interval=options['interval'])
+        self.stdout.write(self.style.SUCCESS(f'Running balances filled for {total} transactions.'))
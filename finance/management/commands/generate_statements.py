@@ -0,0 +1,72 @@
+import time
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from finance.models import CuentaComitente, MonthlyStatement
+from finance.statements import build_statement_data, parse_period, render_statement, statement_instance
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes the MonthlyStatement of every brokerage account for a month. Accounts are handled in chunks, '
+        'each committed on its own, and accounts that already have a statement are skipped, so an '
+        'interrupted run picks up where it stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', help='Month as YYYY-MM. Defaults to the previous month.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Accounts aggregated and committed together.')
+        parser.add_argument('--workers', type=int, default=4, help='Processes rendering statements; 1 renders inline.')
+        parser.add_argument('--force', action='store_true', help="Delete the period's statements and build them again.")
+
+    def handle(self, *args, **options):
+        period = self.get_period(options['period'])
+        if options['force']:
+            MonthlyStatement.objects.filter(period=period).delete()
+
+        executor = None
+        if options['workers'] > 1:
+            # Forked workers must not share the parent's database connections
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=options['workers'])
+        try:
+            written, chunks = self.generate(period, options['chunk_size'], executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.stdout.write(self.style.SUCCESS(f'{written} statements for {period:%Y-%m} written in {chunks} chunks.'))
+
+    def get_period(self, raw):
+        if raw is None:
+            end_of_last_month = timezone.localdate().replace(day=1) - timedelta(days=1)
+            return end_of_last_month.replace(day=1)
+        try:
+            return parse_period(raw)
+        except ValueError:
+            raise CommandError('--period must be YYYY-MM.')
+
+    def generate(self, period, chunk_size, executor):
+        pending = CuentaComitente.objects.exclude(statements__period=period).order_by('pk')
+        written, chunks, last_pk = 0, 0, 0
+        while True:
+            cuenta_ids = list(pending.filter(pk__gt=last_pk).values_list('pk', flat=True)[:chunk_size])
+            if not cuenta_ids:
+                return written, chunks
+            started = time.perf_counter()
+            statements = build_statement_data(cuenta_ids, period)
+            if executor is None:
+                rendered = [render_statement(statement) for statement in statements]
+            else:
+                rendered = list(executor.map(render_statement, statements, chunksize=max(1, len(statements) // 16)))
+            with transaction.atomic():
+                MonthlyStatement.objects.bulk_create(
+                    [statement_instance(statement, text) for statement, text in zip(statements, rendered)],
+                    ignore_conflicts=True,
+                )
+            written += len(statements)
+            chunks += 1
+            last_pk = cuenta_ids[-1]
+            self.stdout.write(f'Chunk {chunks}: accounts {cuenta_ids[0]}-{last_pk} in {time.perf_counter() - started:.2f}s.')
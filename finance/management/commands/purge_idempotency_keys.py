@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from finance.idempotency import IDEMPOTENCY_KEY_TTL
+from finance.models import IdempotencyKey
+
+class Command(BaseCommand):
+    help = 'Deletes stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL_HOURS.'
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(created_at__lt=timezone.now() - IDEMPOTENCY_KEY_TTL).delete()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} expired idempotency keys deleted.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from finance.fees import sweep_platform_fees
+from finance.models import CuentaComitente
+
+class Command(BaseCommand):
+    help = 'Credits the accrued platform fees to the admin brokerage account. Meant to run periodically.'
+
+    def handle(self, *args, **options):
+        try:
+            sweep = sweep_platform_fees()
+        except CuentaComitente.DoesNotExist:
+            raise CommandError('Admin does not have a brokerage account to credit the fees to.')
+        if sweep is None:
+            self.stdout.write('No platform fees to sweep.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Swept {sweep.accruals_count} accruals, {sweep.total} credited.'))
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0009_transaccion_recipient_artist'),
+        ('fondiart_api', '0021_catalog_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['cuenta', 'fecha', 'id'], name='transaccion_cuenta_fecha_idx'),
+        ),
+    ]
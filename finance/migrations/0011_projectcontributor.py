@@ -0,0 +1,98 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:30
+
+from decimal import Decimal, ROUND_HALF_UP
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def _legacy_funding(apps, gaps):
+    """
+    FundProjectView used to debit the funder amount + 2% as a
+    FINANCIACION_PROYECTO row with no link to the project. The project
+    only shows as the part of amount_raised not covered by donations, so
+    each row is attributed to the one project whose uncovered amount
+    still fits it; rows that fit several projects can't be told apart and
+    are left out.
+    """
+    Transaccion = apps.get_model('finance', 'Transaccion')
+    rows = (
+        Transaccion.objects.filter(tipo='FINANCIACION_PROYECTO', cuenta__isnull=False)
+        .order_by('id').values_list('cuenta__user_id', 'monto_pesos')
+    )
+    for donor_id, monto in rows:
+        amount = (monto / Decimal('1.02')).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        # The 2% wasn't rounded when charged, so allow a cent either way
+        fits = [project_id for project_id, gap in gaps.items() if gap >= amount - Decimal('0.01')]
+        if len(fits) == 1:
+            gaps[fits[0]] -= amount
+            yield fits[0], donor_id, amount
+
+
+def populate_contributors(apps, schema_editor):
+    Donation = apps.get_model('finance', 'Donation')
+    Project = apps.get_model('fondiart_api', 'Project')
+    ProjectContributor = apps.get_model('finance', 'ProjectContributor')
+    contributors = {}
+    rows = (
+        Donation.objects.values('project_id', 'donor_id')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        # SQLite sums decimals as floats
+        total = Decimal(str(row['total'])).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        contributors[row['project_id'], row['donor_id']] = [total, row['count']]
+
+    donated = {}
+    for (project_id, _), (total, _) in contributors.items():
+        donated[project_id] = donated.get(project_id, Decimal('0')) + total
+    gaps = {
+        project_id: raised - donated.get(project_id, Decimal('0'))
+        for project_id, raised in Project.objects.values_list('pk', 'amount_raised')
+        if raised > donated.get(project_id, Decimal('0'))
+    }
+    for project_id, donor_id, amount in _legacy_funding(apps, gaps):
+        contributor = contributors.setdefault((project_id, donor_id), [Decimal('0'), 0])
+        contributor[0] += amount
+        contributor[1] += 1
+
+    ProjectContributor.objects.bulk_create(
+        [
+            ProjectContributor(project_id=project_id, donor_id=donor_id, total_amount=total, contributions_count=count)
+            for (project_id, donor_id), (total, count) in contributors.items()
+        ],
+        batch_size=1000,
+    )
+    for row in ProjectContributor.objects.values('project_id').annotate(donors=Count('id')).order_by():
+        Project.objects.filter(pk=row['project_id']).update(donors_count=row['donors'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0010_transaccion_cuenta_fecha_idx'),
+        ('fondiart_api', '0026_project_donors_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectContributor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('contributions_count', models.PositiveIntegerField(default=0)),
+                ('first_contribution_at', models.DateTimeField(auto_now_add=True)),
+                ('last_contribution_at', models.DateTimeField(auto_now=True)),
+                ('donor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_contributions', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contributors', to='fondiart_api.project')),
+            ],
+            options={
+                'unique_together': {('project', 'donor')},
+            },
+        ),
+        migrations.RunPython(populate_contributors, migrations.RunPython.noop),
+    ]
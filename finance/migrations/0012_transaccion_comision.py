@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0011_projectcontributor'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaccion',
+            name='tipo',
+            field=models.CharField(choices=[('COMPRA', 'Compra de Tokens'), ('VENTA', 'Venta de Tokens'), ('DEPOSITO', 'Depósito de Pesos'), ('RETIRO', 'Retiro de Pesos'), ('DONACION_ENVIADA', 'Donación Enviada'), ('DONACION_RECIBIDA', 'Donación Recibida'), ('FINANCIACION_PROYECTO', 'Financiación de Proyecto'), ('FINANCIACION_RECIBIDA', 'Financiación Recibida'), ('COMISION', 'Comisión')], max_length=25),
+        ),
+    ]
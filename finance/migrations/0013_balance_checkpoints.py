@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0012_transaccion_comision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cuentacomitente',
+            name='transactions_count',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='transaccion',
+            name='balance_after',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True),
+        ),
+        migrations.CreateModel(
+            name='BalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField()),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('cuenta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='finance.cuentacomitente')),
+                ('transaccion', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoint', to='finance.transaccion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cuenta', 'fecha', 'transaccion'], name='checkpoint_cuenta_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0014_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformFeeSweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('accruals_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('cuenta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_sweeps', to='finance.cuentacomitente')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PlatformFeeAccrual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('COMPRA', 'Compra de Tokens'), ('VENTA', 'Venta de Tokens'), ('DEPOSITO', 'Depósito de Pesos'), ('RETIRO', 'Retiro de Pesos'), ('DONACION_ENVIADA', 'Donación Enviada'), ('DONACION_RECIBIDA', 'Donación Recibida'), ('FINANCIACION_PROYECTO', 'Financiación de Proyecto'), ('FINANCIACION_RECIBIDA', 'Financiación Recibida'), ('COMISION', 'Comisión')], max_length=25)),
+                ('monto', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('transaccion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='platform_accruals', to='finance.transaccion')),
+                ('sweep', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='accruals', to='finance.platformfeesweep')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('sweep__isnull', True)), fields=['id'], name='fee_accrual_unswept_idx')],
+            },
+        ),
+    ]
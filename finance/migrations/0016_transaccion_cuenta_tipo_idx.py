@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0015_platform_fee_accrual'),
+        ('fondiart_api', '0027_trending_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['cuenta', 'tipo', 'fecha', 'id'], name='transaccion_cuenta_tipo_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:55
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0016_transaccion_cuenta_tipo_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyStatement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('opening_balance', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('closing_balance', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('movements', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('fees', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('holdings', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('rendered', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('cuenta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statements', to='finance.cuentacomitente')),
+            ],
+            options={
+                'unique_together': {('cuenta', 'period')},
+            },
+        ),
+    ]
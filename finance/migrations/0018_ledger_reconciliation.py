@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0004_alter_cuadrotoken_tokens_disponibles_and_more'),
+        ('finance', '0017_monthly_statement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountLedgerTotal',
+            fields=[
+                ('cuenta', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ledger_total', serialize=False, to='finance.cuentacomitente')),
+                ('net_cents', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReconciliationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('watermark', models.BigIntegerField(blank=True, null=True)),
+                ('transactions_processed', models.PositiveBigIntegerField(default=0)),
+                ('accounts_checked', models.PositiveIntegerField(default=0)),
+                ('tokens_checked', models.PositiveIntegerField(default=0)),
+                ('discrepancies_found', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReconciliationDiscrepancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ACCOUNT_BALANCE', 'Balance differs from its transactions'), ('TOKEN_HOLDINGS', 'Tokens sold differ from the holdings'), ('TOKEN_SUPPLY', 'Available plus sold tokens differ from the supply')], max_length=20)),
+                ('expected', models.BigIntegerField()),
+                ('actual', models.BigIntegerField()),
+                ('cuenta', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='discrepancies', to='finance.cuentacomitente')),
+                ('token', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='discrepancies', to='blockchain.cuadrotoken')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discrepancies', to='finance.reconciliationrun')),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0004_alter_cuadrotoken_tokens_disponibles_and_more'),
+        ('finance', '0018_ledger_reconciliation'),
+        ('fondiart_api', '0028_catalog_price_desc_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['donor', 'id'], name='donation_donor_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tokenholding',
+            index=models.Index(fields=['user', 'id'], name='tokenholding_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['cuenta', 'id'], name='transaccion_cuenta_id_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from blockchain.models import CuadroToken
 
 class TokenHolding(models.Model):
@@ -9,6 +10,12 @@ class TokenHolding(models.Model):
     purchase_price = models.DecimalField(max_digits=10, decimal_places=2)
     purchase_date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Per-user exports stream in id order (see finance.exports)
+            models.Index(fields=['user', 'id'], name='tokenholding_user_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} holds {self.quantity} of {self.token.token_symbol}"
 
@@ -23,6 +30,8 @@ class CuentaComitente(models.Model):
         decimal_places=2,
         default=0.00
     )
+    # Transactions posted through finance.ledger, used to place BalanceCheckpoints
+    transactions_count = models.PositiveBigIntegerField(default=0)
 
     def __str__(self):
         return f"Cuenta de {self.user.username} - Saldo: {self.balance}"
@@ -37,6 +46,7 @@ class Transaccion(models.Model):
         DONACION_RECIBIDA = 'DONACION_RECIBIDA', 'Donación Recibida'
         FINANCIACION_PROYECTO = 'FINANCIACION_PROYECTO', 'Financiación de Proyecto'
         FINANCIACION_RECIBIDA = 'FINANCIACION_RECIBIDA', 'Financiación Recibida'
+        COMISION = 'COMISION', 'Comisión'
 
     cuenta = models.ForeignKey(
         CuentaComitente,
@@ -78,19 +88,66 @@ class Transaccion(models.Model):
         default=EstadoTransaccion.PENDIENTE
     )
     recipient_artist = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='received_donations')
+    # Account balance right after this transaction; null on rows written outside finance.ledger
+    balance_after = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['cuenta', 'fecha', 'id'], name='transaccion_cuenta_fecha_idx'),
+            models.Index(fields=['cuenta', 'tipo', 'fecha', 'id'], name='transaccion_cuenta_tipo_idx'),
+            models.Index(fields=['cuenta', 'id'], name='transaccion_cuenta_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.tipo} - {self.cuenta.user.username} - {self.monto_pesos}"
 
+# Balance of an account after every BALANCE_CHECKPOINT_INTERVAL transactions,
+# written by finance.ledger (and the checkpoint_balances command for older rows).
+# Lets finance.balances replay a bounded slice instead of the whole history.
+class BalanceCheckpoint(models.Model):
+    cuenta = models.ForeignKey(CuentaComitente, on_delete=models.CASCADE, related_name='checkpoints')
+    transaccion = models.OneToOneField(Transaccion, on_delete=models.CASCADE, related_name='checkpoint')
+    fecha = models.DateTimeField()
+    balance = models.DecimalField(max_digits=15, decimal_places=2)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['cuenta', 'fecha', 'transaccion'], name='checkpoint_cuenta_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cuenta_id} @ {self.fecha}: {self.balance}"
+
 class Donation(models.Model):
     project = models.ForeignKey('fondiart_api.Project', on_delete=models.CASCADE, related_name='donations')
     donor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='donations')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['donor', 'id'], name='donation_donor_id_idx'),
+        ]
+
     def __str__(self):
         return f"Donation of {self.amount} to {self.project.title} by {self.donor.username}"
 
+# One row per (project, donor), so donor counts don't need a DISTINCT scan.
+# Maintained by finance.funding.record_project_contribution.
+class ProjectContributor(models.Model):
+    project = models.ForeignKey('fondiart_api.Project', on_delete=models.CASCADE, related_name='contributors')
+    donor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='project_contributions')
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    contributions_count = models.PositiveIntegerField(default=0)
+    first_contribution_at = models.DateTimeField(auto_now_add=True)
+    last_contribution_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('project', 'donor')
+
+    def __str__(self):
+        return f"{self.donor.username} contributed {self.total_amount} to {self.project.title}"
+
 class SellOrder(models.Model):
     STATUS_CHOICES = (
         ('abierta', 'Abierta'),
@@ -106,4 +163,113 @@ class SellOrder(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='abierta')
 
     def __str__(self):
-        return f"Sell order for {self.quantity} of {self.token.token_symbol} by {self.user.username}"
\ No newline at end of file
+        return f"Sell order for {self.quantity} of {self.token.token_symbol} by {self.user.username}"
+
+# Platform revenue (commissions, primary sales, transfers to the admin) is
+# appended here by finance.ledger instead of being credited to the admin
+# account on every trade; sweep_platform_fees rolls it into that balance.
+class PlatformFeeSweep(models.Model):
+    cuenta = models.ForeignKey(CuentaComitente, on_delete=models.CASCADE, related_name='fee_sweeps')
+    total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    accruals_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Sweep {self.pk}: {self.total}"
+
+class PlatformFeeAccrual(models.Model):
+    tipo = models.CharField(max_length=25, choices=Transaccion.TipoTransaccion.choices)
+    monto = models.DecimalField(max_digits=15, decimal_places=2)
+    # Row of the account that paid it in the posting that produced it
+    transaccion = models.ForeignKey(Transaccion, on_delete=models.SET_NULL, null=True, blank=True, related_name='platform_accruals')
+    sweep = models.ForeignKey(PlatformFeeSweep, on_delete=models.SET_NULL, null=True, blank=True, related_name='accruals')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # The sweeper only ever looks at rows it hasn't swept
+            models.Index(fields=['id'], condition=models.Q(sweep__isnull=True), name='fee_accrual_unswept_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.monto}"
+
+# Statement of an account for one calendar month, written by the
+# generate_statements command. period is the first day of the month.
+class MonthlyStatement(models.Model):
+    cuenta = models.ForeignKey(CuentaComitente, on_delete=models.CASCADE, related_name='statements')
+    period = models.DateField()
+    opening_balance = models.DecimalField(max_digits=15, decimal_places=2)
+    closing_balance = models.DecimalField(max_digits=15, decimal_places=2)
+    # {tipo: {"count": n, "total": "12.34"}}
+    movements = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    fees = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    # [{"token_id": 1, "token_symbol": "AB1", "quantity": 10}], as of generation
+    holdings = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    rendered = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('cuenta', 'period')
+
+    def __str__(self):
+        return f"Statement {self.period:%Y-%m} for account {self.cuenta_id}"
+
+# Incremental reconciliation state, kept by the reconcile_ledger command
+# (see finance.reconciliation). Each run folds the transactions after the
+# previous run's watermark into AccountLedgerTotal and checks every account
+# balance and token supply against it.
+class ReconciliationRun(models.Model):
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Highest Transaccion id folded into AccountLedgerTotal by this run,
+    # set in the same transaction as the totals
+    watermark = models.BigIntegerField(null=True, blank=True)
+    transactions_processed = models.PositiveBigIntegerField(default=0)
+    accounts_checked = models.PositiveIntegerField(default=0)
+    tokens_checked = models.PositiveIntegerField(default=0)
+    discrepancies_found = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Reconciliation {self.pk} up to transaction {self.watermark}"
+
+class AccountLedgerTotal(models.Model):
+    cuenta = models.OneToOneField(CuentaComitente, on_delete=models.CASCADE, primary_key=True, related_name='ledger_total')
+    # Signed sum of the account's transactions up to the watermark, in cents
+    net_cents = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Account {self.cuenta_id}: {self.net_cents} cents"
+
+class ReconciliationDiscrepancy(models.Model):
+    class Kind(models.TextChoices):
+        ACCOUNT_BALANCE = 'ACCOUNT_BALANCE', 'Balance differs from its transactions'
+        TOKEN_HOLDINGS = 'TOKEN_HOLDINGS', 'Tokens sold differ from the holdings'
+        TOKEN_SUPPLY = 'TOKEN_SUPPLY', 'Available plus sold tokens differ from the supply'
+
+    run = models.ForeignKey(ReconciliationRun, on_delete=models.CASCADE, related_name='discrepancies')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    cuenta = models.ForeignKey(CuentaComitente, on_delete=models.CASCADE, null=True, blank=True, related_name='discrepancies')
+    token = models.ForeignKey(CuadroToken, on_delete=models.CASCADE, null=True, blank=True, related_name='discrepancies')
+    # Cents for account balances, tokens for the token checks
+    expected = models.BigIntegerField()
+    actual = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.kind}: expected {self.expected}, got {self.actual}"
+
+# Idempotency-Key of a money-moving request and the response it produced.
+# Written and replayed by finance.idempotency.idempotent.
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ('user', 'key')
+
+    def __str__(self):
+        return f"{self.user_id}:{self.key}"
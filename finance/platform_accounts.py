@@ -0,0 +1,87 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from django.conf import settings
+from django.core.cache import cache
+
+from fondiart_api.models import User
+
+# Bumped in the cache on every change. Only processes sharing that cache
+# (e.g. Redis) drop their copy right away; with the default LocMemCache the
+# others keep theirs until it is TTL seconds old.
+GENERATION_KEY = 'platform-accounts:gen'
+TTL = getattr(settings, 'PLATFORM_ACCOUNTS_TTL_SECONDS', 300)
+
+
+@dataclass(frozen=True)
+class PlatformAccounts:
+    """
+    The platform's admin user with its brokerage account and wallet, as ids.
+    cuenta_id and wallet_address are None if the admin doesn't have one.
+    """
+    user_id: int
+    cuenta_id: Optional[int]
+    wallet_address: Optional[str]
+    generation: int = 0
+    resolved_at: float = 0.0
+
+
+_lock = threading.Lock()
+_resolved = None
+
+
+def _new_generation():
+    # The key can be evicted while processes still hold copies stamped with
+    # it, so it is never reseeded with a value used before
+    seed = time.time_ns()
+    cache.add(GENERATION_KEY, seed, timeout=None)
+    return cache.get(GENERATION_KEY, seed)
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = _new_generation()
+    return generation
+
+
+def get_platform_accounts():
+    """
+    The PlatformAccounts of this process, looked up in one query the first
+    time and again after invalidate_platform_accounts() or once it is TTL
+    seconds old. Returns None when there is no admin user.
+    """
+    global _resolved
+    generation = _generation()
+    resolved = _resolved
+    if resolved is not None and resolved.generation == generation and time.monotonic() - resolved.resolved_at < TTL:
+        return resolved
+
+    with _lock:
+        row = (
+            User.objects.filter(role='admin').order_by('pk')
+            .values('pk', 'cuenta_comitente__id', 'wallet__address').first()
+        )
+        if row is None:
+            _resolved = None
+            return None
+        _resolved = PlatformAccounts(
+            row['pk'], row['cuenta_comitente__id'], row['wallet__address'], generation, time.monotonic(),
+        )
+        return _resolved
+
+
+def cached_platform_user_id():
+    resolved = _resolved
+    return resolved.user_id if resolved is not None else None
+
+
+def invalidate_platform_accounts():
+    global _resolved
+    _resolved = None
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # No generation, either never set or evicted
+        _new_generation()
@@ -0,0 +1,187 @@
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BigIntegerField, F, Max, Sum
+from django.db.models.functions import Cast, Round
+from django.utils import timezone
+
+from blockchain.models import CuadroToken
+from .ledger import CREDIT_TYPES, cents, signed_amount_expression
+from .models import (
+    AccountLedgerTotal, CuentaComitente, ReconciliationDiscrepancy, ReconciliationRun, TokenHolding, Transaccion,
+)
+
+Kind = ReconciliationDiscrepancy.Kind
+CHUNK_SIZE = 100_000
+WATERMARK_LAG = timedelta(seconds=getattr(settings, 'RECONCILIATION_WATERMARK_LAG_SECONDS', 300))
+
+
+def _in_cents(field):
+    # Money is compared as integer cents, computed by the database, so no float rounding creeps in
+    return Cast(Round(F(field) * 100), BigIntegerField())
+
+
+def _frame(rows, columns):
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def ledger_deltas(after_id, until_id, chunk_size=CHUNK_SIZE):
+    """
+    Signed cents per account of the transactions with after_id < id <= until_id,
+    as a Series indexed by cuenta_id. Rows are read chunk_size at a time by
+    id range and summed with pandas, so memory depends on the chunk size and
+    the number of accounts, not on the number of transactions.
+    """
+    totals = pd.Series(dtype='int64')
+    processed = 0
+    rows = (
+        Transaccion.objects.filter(id__lte=until_id).order_by('id')
+        .annotate(cents=_in_cents('monto_pesos')).values_list('id', 'cuenta_id', 'tipo', 'cents')
+    )
+    while True:
+        chunk = _frame(list(rows.filter(id__gt=after_id)[:chunk_size]), ['id', 'cuenta_id', 'tipo', 'cents'])
+        if chunk.empty:
+            return totals, processed
+        signed = np.where(chunk['tipo'].isin(list(CREDIT_TYPES)), chunk['cents'], -chunk['cents'])
+        chunk_totals = pd.Series(signed, index=chunk['cuenta_id'], dtype='int64').groupby(level=0).sum()
+        totals = pd.concat([totals, chunk_totals]).groupby(level=0).sum()
+        processed += len(chunk)
+        after_id = int(chunk['id'].iloc[-1])
+
+
+def _apply_deltas(deltas, batch_size=1000):
+    cuenta_ids = [int(pk) for pk in deltas.index]
+    for start in range(0, len(cuenta_ids), batch_size):
+        batch = cuenta_ids[start:start + batch_size]
+        existing = AccountLedgerTotal.objects.in_bulk(batch)
+        for cuenta_id in batch:
+            total = existing.get(cuenta_id)
+            if total is None:
+                existing[cuenta_id] = AccountLedgerTotal(cuenta_id=cuenta_id, net_cents=int(deltas[cuenta_id]))
+            else:
+                total.net_cents += int(deltas[cuenta_id])
+        AccountLedgerTotal.objects.bulk_create([total for total in existing.values() if total._state.adding])
+        AccountLedgerTotal.objects.bulk_update([total for total in existing.values() if not total._state.adding], ['net_cents'])
+
+
+def _check_accounts(run, tail, chunk_size):
+    """
+    Compares every balance with the account's ledger total plus its tail
+    (the deltas past the watermark), a pk range at a time. A mismatch is
+    only recorded if it survives a re-check with the account locked, so
+    trades landing while the job runs aren't reported.
+    """
+    discrepancies, checked, last_pk = [], 0, 0
+    while True:
+        balances = _frame(
+            list(CuentaComitente.objects.filter(pk__gt=last_pk).order_by('pk')
+                 .annotate(cents=_in_cents('balance')).values_list('pk', 'cents')[:chunk_size]),
+            ['cuenta_id', 'actual'],
+        )
+        if balances.empty:
+            return discrepancies, checked
+        last_pk = int(balances['cuenta_id'].iloc[-1])
+        totals = _frame(
+            list(AccountLedgerTotal.objects.filter(cuenta_id__in=balances['cuenta_id'].tolist()).values_list('cuenta_id', 'net_cents')),
+            ['cuenta_id', 'expected'],
+        )
+        merged = balances.merge(totals, on='cuenta_id', how='left').fillna({'expected': 0})
+        merged['expected'] += merged['cuenta_id'].map(tail).fillna(0)
+        suspects = merged.loc[merged['actual'] != merged['expected'], 'cuenta_id'].tolist()
+        checked += len(balances)
+        for cuenta_id in suspects:
+            discrepancy = _recheck_account(run, int(cuenta_id))
+            if discrepancy is not None:
+                discrepancies.append(discrepancy)
+
+
+def _recheck_account(run, cuenta_id):
+    # Locking the account holds off postings to it while both sides are read
+    with transaction.atomic():
+        balance = (
+            CuentaComitente.objects.select_for_update().filter(pk=cuenta_id)
+            .annotate(cents=_in_cents('balance')).values_list('cents', flat=True).first()
+        )
+        if balance is None:
+            return None
+        later = Transaccion.objects.filter(cuenta_id=cuenta_id, id__gt=run.watermark).aggregate(total=Sum(signed_amount_expression()))['total']
+        expected = (
+            AccountLedgerTotal.objects.filter(cuenta_id=cuenta_id).values_list('net_cents', flat=True).first() or 0
+        ) + int(cents(later or 0) * 100)
+    if balance == expected:
+        return None
+    return ReconciliationDiscrepancy(run=run, kind=Kind.ACCOUNT_BALANCE, cuenta_id=cuenta_id, expected=expected, actual=balance)
+
+
+def _check_tokens(run):
+    tokens = _frame(
+        list(CuadroToken.objects.values_list('pk', 'total_supply', 'tokens_disponibles', 'tokens_vendidos')),
+        ['token_id', 'total_supply', 'disponibles', 'vendidos'],
+    )
+    held = _frame(
+        list(TokenHolding.objects.values('token_id').annotate(held=Sum('quantity')).order_by().values_list('token_id', 'held')),
+        ['token_id', 'held'],
+    )
+    merged = tokens.merge(held, on='token_id', how='left').fillna({'held': 0})
+    discrepancies = []
+    for row in merged.loc[merged['vendidos'] != merged['held']].itertuples():
+        discrepancies.append(ReconciliationDiscrepancy(
+            run=run, kind=Kind.TOKEN_HOLDINGS, token_id=row.token_id, expected=int(row.vendidos), actual=int(row.held),
+        ))
+    supply = merged['disponibles'] + merged['vendidos']
+    for row in merged.loc[supply != merged['total_supply']].itertuples():
+        discrepancies.append(ReconciliationDiscrepancy(
+            run=run, kind=Kind.TOKEN_SUPPLY, token_id=row.token_id,
+            expected=int(row.total_supply), actual=int(row.disponibles + row.vendidos),
+        ))
+    return discrepancies, len(tokens)
+
+
+def reconcile(full=False, chunk_size=CHUNK_SIZE):
+    """
+    Runs one reconciliation and returns its ReconciliationRun.
+
+    The transactions after the previous run's watermark are folded into
+    AccountLedgerTotal, then every account balance and token supply is
+    checked and the mismatches are stored as ReconciliationDiscrepancy
+    rows. The totals and the new watermark commit together, so a run that
+    fails later leaves them consistent for the next one. full=True drops
+    the totals and folds the whole ledger again.
+
+    Ids are allocated before commit, so a row can become visible after rows
+    with higher ids. The watermark therefore only moves up to the newest
+    row older than WATERMARK_LAG. Younger rows are counted by the re-check
+    of suspect accounts and folded by a later run.
+    """
+    run = ReconciliationRun.objects.create()
+    with transaction.atomic():
+        # Concurrent runs queue on the latest folded run, then read the
+        # watermark the one ahead of them committed
+        folded = ReconciliationRun.objects.filter(watermark__isnull=False).order_by('-pk')
+        list(folded.select_for_update()[:1])
+        previous = folded.first()
+        if full or previous is None:
+            AccountLedgerTotal.objects.all().delete()
+            after_id = 0
+        else:
+            after_id = previous.watermark
+
+        settled = Transaccion.objects.filter(fecha__lt=timezone.now() - WATERMARK_LAG)
+        until_id = max(settled.aggregate(last=Max('id'))['last'] or 0, after_id)
+        deltas, processed = ledger_deltas(after_id, until_id, chunk_size)
+        _apply_deltas(deltas)
+        run.watermark = until_id
+        run.transactions_processed = processed
+        run.save(update_fields=['watermark', 'transactions_processed'])
+
+    tail, _ = ledger_deltas(run.watermark, Transaccion.objects.aggregate(last=Max('id'))['last'] or 0, chunk_size)
+    account_discrepancies, run.accounts_checked = _check_accounts(run, tail, chunk_size)
+    token_discrepancies, run.tokens_checked = _check_tokens(run)
+    discrepancies = account_discrepancies + token_discrepancies
+    ReconciliationDiscrepancy.objects.bulk_create(discrepancies)
+    run.discrepancies_found = len(discrepancies)
+    run.finished_at = timezone.now()
+    run.save(update_fields=['accounts_checked', 'tokens_checked', 'discrepancies_found', 'finished_at'])
+    return run
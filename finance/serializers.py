@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Transaccion, CuentaComitente, TokenHolding, Donation, SellOrder
+from fondiart_api.fieldsets import SparseFieldsetSerializerMixin
 from decimal import Decimal
 
 class ProjectDonationSerializer(serializers.ModelSerializer):
@@ -26,7 +27,7 @@ class TokenHoldingSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class UserTokenHoldingSerializer(serializers.ModelSerializer):
-    token_id = serializers.IntegerField(source='token.id', read_only=True)
+    token_id = serializers.IntegerField(read_only=True)
     token_name = serializers.CharField(source='token.token_name', read_only=True)
     unit_price = serializers.DecimalField(source='token.artwork.fractionFrom', max_digits=10, decimal_places=2, read_only=True)
 
@@ -47,18 +48,18 @@ class CuentaComitenteUpdateSerializer(serializers.ModelSerializer):
 class TransaccionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaccion
-        fields = ['id', 'cuenta', 'tipo', 'artwork', 'cantidad_tokens', 'monto_pesos', 'fecha', 'estado']
-        read_only_fields = ('cuenta', 'estado', 'fecha')
+        fields = ['id', 'cuenta', 'tipo', 'artwork', 'cantidad_tokens', 'monto_pesos', 'fecha', 'estado', 'balance_after']
+        read_only_fields = ('cuenta', 'estado', 'fecha', 'balance_after')
 
 class CheckFundsSerializer(serializers.Serializer):
     user_id = serializers.IntegerField()
-    amount = serializers.DecimalField(max_digits=15, decimal_places=2)
+    amount = serializers.DecimalField(max_digits=15, decimal_places=2, min_value=Decimal('0.01'))
 
 class LiquidateArtworkSerializer(serializers.Serializer):
     artwork_id = serializers.IntegerField()
-    total_amount = serializers.DecimalField(max_digits=15, decimal_places=2)
+    total_amount = serializers.DecimalField(max_digits=15, decimal_places=2, min_value=Decimal('0.01'))
 
-class SellOrderSerializer(serializers.ModelSerializer):
+class SellOrderSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     token_symbol = serializers.CharField(source='token.token_symbol', read_only=True)
     token_name = serializers.CharField(source='token.token_name', read_only=True)
     user_name = serializers.CharField(source='user.name', read_only=True)
@@ -82,9 +83,9 @@ class DonationTransactionSerializer(TransaccionSerializer):
         fields = ['monto_pesos', 'artist_name', 'fecha']
 
     def get_artist_name(self, obj):
-        if obj.recipient_artist:
+        if obj.recipient_artist_id:
             return obj.recipient_artist.name
-        if obj.artwork and obj.artwork.artist:
+        if obj.artwork_id and obj.artwork.artist:
             return obj.artwork.artist.name
         return None
 class DonationHistorySerializer(serializers.ModelSerializer):
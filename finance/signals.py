@@ -1,40 +1,39 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Donation, Transaccion, CuentaComitente
-from fondiart_api.models import Project
+from .models import CuentaComitente, Donation, Transaccion
+from .funding import record_project_contribution
+from .ledger import transactions_posted
+from .platform_accounts import cached_platform_user_id, invalidate_platform_accounts
+from fondiart_api.models import User, Wallet
+from fondiart_api.trending import record_artwork_event
 
 @receiver(post_save, sender=Donation)
 def handle_donation(sender, instance, created, **kwargs):
     if created:
-        project = instance.project
-        
-        # Update amount_raised on the project
-        project.amount_raised += instance.amount
-        project.save()
+        # Atomic increments of the project counters; disburses once the goal is met
+        record_project_contribution(instance.project_id, instance.donor_id, instance.amount)
 
-        # Check if funding goal is met and funds have not been disbursed yet
-        if project.amount_raised >= project.funding_goal and not project.funds_disbursed:
-            artist = project.artist
-            try:
-                artist_account = artist.cuenta_comitente
-            except CuentaComitente.DoesNotExist:
-                # If the artist doesn't have an account, we can't proceed.
-                # You might want to log this error.
-                return
+@receiver(transactions_posted)
+def record_trades_for_trending(sender, transactions, **kwargs):
+    # Primary market trades carry the artwork; secondary ones are recorded by BuyFromSellOrderView
+    for transaccion in transactions:
+        if transaccion.artwork_id and transaccion.tipo == Transaccion.TipoTransaccion.COMPRA:
+            record_artwork_event(transaccion.artwork_id, 'purchase')
+        elif transaccion.artwork_id and transaccion.tipo == Transaccion.TipoTransaccion.VENTA:
+            record_artwork_event(transaccion.artwork_id, 'sale')
 
-            # Transfer funds to artist's account
-            amount_to_transfer = project.amount_raised
-            artist_account.balance += amount_to_transfer
-            artist_account.save()
+def _invalidate_platform_accounts_for(user_id):
+    cached = cached_platform_user_id()
+    if cached is None or cached == user_id:
+        invalidate_platform_accounts()
 
-            # Create a transaction record
-            Transaccion.objects.create(
-                cuenta=artist_account,
-                tipo=Transaccion.TipoTransaccion.FINANCIACION_RECIBIDA,
-                monto_pesos=amount_to_transfer,
-                estado=Transaccion.EstadoTransaccion.COMPLETADA
-            )
+@receiver([post_save, post_delete], sender=User)
+def invalidate_platform_accounts_on_admin_change(sender, instance, **kwargs):
+    # Covers a new admin as well as the cached one losing the role or being deleted
+    if instance.role == 'admin' or instance.pk == cached_platform_user_id():
+        invalidate_platform_accounts()
 
-            # Mark project as disbursed
-            project.funds_disbursed = True
-            project.save()
\ No newline at end of file
+@receiver([post_save, post_delete], sender=CuentaComitente)
+@receiver([post_save, post_delete], sender=Wallet)
+def invalidate_platform_accounts_on_account_change(sender, instance, **kwargs):
+    _invalidate_platform_accounts_for(instance.user_id)
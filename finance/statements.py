@@ -0,0 +1,152 @@
+from datetime import date, datetime
+from decimal import Decimal
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from .ledger import cents, signed_amount, signed_amount_expression
+from .models import CuentaComitente, MonthlyStatement, PlatformFeeAccrual, TokenHolding, Transaccion
+
+Tipo = Transaccion.TipoTransaccion
+
+
+def parse_period(raw):
+    """
+    'YYYY-MM' -> first day of that month.
+    """
+    year, month = raw.split('-')
+    return date(int(year), int(month), 1)
+
+
+def month_bounds(period):
+    """
+    [start, end) of the month as aware datetimes in the current timezone.
+    """
+    next_month = date(period.year + period.month // 12, period.month % 12 + 1, 1)
+    return (
+        timezone.make_aware(datetime.combine(period, datetime.min.time())),
+        timezone.make_aware(datetime.combine(next_month, datetime.min.time())),
+    )
+
+
+def _opening_balances(accounts, start):
+    """
+    Balance of each account right before start, from the balance_after of
+    its last earlier transaction, all fetched with one query. Accounts
+    without one (no earlier rows, rows from before running balances, or an
+    opening balance set directly) are worked back from their current
+    balance with one grouped query over the rows since start.
+    """
+    last_before = Transaccion.objects.filter(cuenta_id=OuterRef('pk'), fecha__lt=start).order_by('-fecha', '-id')
+    rows = accounts.annotate(
+        last_balance=Subquery(last_before.values('balance_after')[:1]),
+    ).values_list('pk', 'last_balance', 'balance')
+    opening, current = {}, {}
+    for cuenta_id, last_balance, balance in rows:
+        if last_balance is None:
+            current[cuenta_id] = balance
+        else:
+            opening[cuenta_id] = last_balance
+    if current:
+        since = (
+            Transaccion.objects.filter(cuenta_id__in=current, fecha__gte=start)
+            .values('cuenta_id').annotate(total=Sum(signed_amount_expression())).order_by()
+        )
+        for row in since:
+            current[row['cuenta_id']] -= cents(row['total'])
+        opening.update(current)
+    return opening
+
+
+def build_statement_data(cuenta_ids, period):
+    """
+    Everything a statement shows, for a chunk of accounts, as plain
+    picklable dicts: one query per section (accounts, opening balances,
+    movements, fees, holdings) whatever the size of the chunk.
+
+    fees are the platform commissions the account paid, i.e. the accruals
+    linked to its rows. holdings are the current ones, as TokenHolding
+    keeps no history.
+    """
+    start, end = month_bounds(period)
+    accounts = CuentaComitente.objects.filter(pk__in=cuenta_ids)
+    data = {
+        cuenta_id: {
+            'cuenta_id': cuenta_id, 'user_id': user_id, 'username': username, 'period': period,
+            'movements': {}, 'fees': Decimal('0.00'), 'holdings': [],
+        }
+        for cuenta_id, user_id, username in accounts.values_list('pk', 'user_id', 'user__username')
+    }
+    for cuenta_id, balance in _opening_balances(accounts, start).items():
+        data[cuenta_id]['opening_balance'] = balance
+        data[cuenta_id]['closing_balance'] = balance
+
+    movements = (
+        Transaccion.objects.filter(cuenta_id__in=data, fecha__gte=start, fecha__lt=end)
+        .values('cuenta_id', 'tipo').annotate(count=Count('id'), total=Sum('monto_pesos')).order_by()
+    )
+    for row in movements:
+        # SQLite sums decimals as floats
+        total = cents(row['total'])
+        statement = data[row['cuenta_id']]
+        statement['movements'][row['tipo']] = {'count': row['count'], 'total': total}
+        statement['closing_balance'] += signed_amount(row['tipo'], total)
+
+    fees = (
+        PlatformFeeAccrual.objects.filter(
+            tipo=Tipo.COMISION, transaccion__cuenta_id__in=data,
+            transaccion__fecha__gte=start, transaccion__fecha__lt=end,
+        )
+        .values('transaccion__cuenta_id').annotate(total=Sum('monto')).order_by()
+    )
+    for row in fees:
+        data[row['transaccion__cuenta_id']]['fees'] = cents(row['total'])
+
+    by_user = {statement['user_id']: statement for statement in data.values()}
+    holdings = (
+        TokenHolding.objects.filter(user_id__in=by_user)
+        .values('user_id', 'token_id', 'token__token_symbol').annotate(quantity=Sum('quantity'))
+        .order_by('user_id', 'token_id')
+    )
+    for row in holdings:
+        by_user[row['user_id']]['holdings'].append(
+            {'token_id': row['token_id'], 'token_symbol': row['token__token_symbol'], 'quantity': row['quantity']}
+        )
+    return [data[cuenta_id] for cuenta_id in sorted(data)]
+
+
+def render_statement(statement):
+    """
+    Plain text statement. A pure function of build_statement_data()
+    output, so it can run in worker processes without a database.
+    """
+    lines = [
+        f"Monthly statement {statement['period']:%Y-%m}",
+        f"Account {statement['cuenta_id']} - {statement['username']}",
+        '',
+        f"{'Opening balance':<30}{statement['opening_balance']:>15}",
+    ]
+    for tipo, movement in sorted(statement['movements'].items()):
+        label = f"{Tipo(tipo).label} ({movement['count']})"
+        lines.append(f"{label:<30}{signed_amount(tipo, movement['total']):>15}")
+    lines += [
+        f"{'Closing balance':<30}{statement['closing_balance']:>15}",
+        f"{'Fees paid':<30}{statement['fees']:>15}",
+        '',
+        'Holdings' if statement['holdings'] else 'No holdings',
+    ]
+    for holding in statement['holdings']:
+        lines.append(f"  {holding['token_symbol']:<28}{holding['quantity']:>15}")
+    return '\n'.join(lines) + '\n'
+
+
+def statement_instance(statement, rendered):
+    return MonthlyStatement(
+        cuenta_id=statement['cuenta_id'],
+        period=statement['period'],
+        opening_balance=statement['opening_balance'],
+        closing_balance=statement['closing_balance'],
+        movements=statement['movements'],
+        fees=statement['fees'],
+        holdings=statement['holdings'],
+        rendered=rendered,
+    )
@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from fondiart_api.models import User
+from finance.models import CuentaComitente, Transaccion
+
+Tipo = Transaccion.TipoTransaccion
+
+class AccountExportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user', email='user@example.com', password='pw', name='User')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='pw', name='Other')
+        cuenta = CuentaComitente.objects.create(user=self.user)
+        self.rows = [
+            Transaccion.objects.create(cuenta=cuenta, tipo=tipo, monto_pesos=Decimal(amount))
+            for tipo, amount in [(Tipo.DEPOSITO, '100.00'), (Tipo.COMPRA, '30.00'), (Tipo.RETIRO, '5.25')]
+        ]
+        self.url = reverse('user-account-export', args=[self.user.id, 'transactions'])
+
+    def test_csv_export_resumes_within_the_same_range(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        until_id = response['X-Export-Until-Id']
+        lines = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(lines[0][:3], ['id', 'fecha', 'tipo'])
+        self.assertEqual([line[4] for line in lines[1:]], ['100.00', '30.00', '5.25'])
+
+        Transaccion.objects.create(cuenta=self.rows[0].cuenta, tipo=Tipo.DEPOSITO, monto_pesos=Decimal('1.00'))
+        response = self.client.get(self.url, {'output': 'ndjson', 'after_id': self.rows[0].id, 'until_id': until_id})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['monto_pesos'] for row in rows], ['30.00', '5.25'])
+
+    def test_only_the_owner_can_export(self):
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('user-account-export', args=[self.user.id, 'orders'])).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'to': '2026-13-01'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'after_id': '9' * 20}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,80 @@
+from decimal import Decimal
+from importlib import import_module
+from django.apps import apps
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from fondiart_api.models import User, Project
+from finance.models import CuentaComitente, Donation, ProjectContributor, Transaccion
+
+class ProjectFundingProgressTest(APITestCase):
+    def setUp(self):
+        self.artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        self.donor = User.objects.create_user(username='donor', email='donor@example.com', password='pw', name='Donor')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='pw', name='Other')
+        self.projects = [
+            Project.objects.create(title=f'Proyecto {i}', description='-', funding_goal=Decimal('200.00'), amount_raised=Decimal('50.00') * i, artist=self.artist)
+            for i in range(3)
+        ]
+        for donor, amount in ((self.donor, '10.00'), (self.donor, '5.00'), (self.other, '20.00')):
+            Donation.objects.create(project=self.projects[1], donor=donor, amount=Decimal(amount))
+        self.client.force_authenticate(self.donor)
+
+    def test_project_list_includes_progress_in_constant_queries(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('project-list'))
+        rows = {row['id']: row for row in response.data['results']}
+        self.assertEqual(rows[self.projects[1].id]['donors_count'], 2)
+        self.assertEqual(rows[self.projects[1].id]['my_contribution'], Decimal('15.00'))
+        self.assertEqual(rows[self.projects[1].id]['funding_percentage'], 42.5)  # 50 + 35 donated, of 200
+        self.assertEqual(rows[self.projects[0].id]['donors_count'], 0)
+
+        Project.objects.create(title='Otro', description='-', funding_goal=Decimal('10.00'), artist=self.artist)
+        with self.assertNumQueries(3):
+            self.client.get(reverse('artist-project-list', args=[self.artist.id]))
+
+    def test_batch_summary(self):
+        ids = f'{self.projects[2].id},999,{self.projects[1].id}'
+        response = self.client.get(reverse('project-funding-summary'), {'ids': ids})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['project_id'] for row in response.data['results']], [self.projects[2].id, self.projects[1].id])
+        self.assertEqual(response.data['results'][1]['total_donated'], Decimal('35.00'))
+        self.assertEqual(response.data['missing'], [999])
+        self.assertEqual(self.client.get(reverse('project-funding-summary'), {'ids': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_goal_crossing_disburses_once(self):
+        artist_account = CuentaComitente.objects.create(user=self.artist, balance=Decimal('0.00'))
+        project = Project.objects.create(title='Mural', description='-', funding_goal=Decimal('30.00'), artist=self.artist)
+        for donor, amount in ((self.donor, '20.00'), (self.other, '15.00'), (self.donor, '5.00')):
+            Donation.objects.create(project=project, donor=donor, amount=Decimal(amount))
+
+        project.refresh_from_db()
+        self.assertEqual(project.amount_raised, Decimal('40.00'))
+        self.assertEqual(project.donors_count, 2)
+        self.assertTrue(project.funds_disbursed)
+        self.assertEqual(ProjectContributor.objects.get(project=project, donor=self.donor).contributions_count, 2)
+        payouts = Transaccion.objects.filter(cuenta=artist_account, tipo=Transaccion.TipoTransaccion.FINANCIACION_RECIBIDA)
+        self.assertEqual(list(payouts.values_list('monto_pesos', flat=True)), [Decimal('35.00')])
+        artist_account.refresh_from_db()
+        self.assertEqual(artist_account.balance, Decimal('35.00'))
+
+    def test_backfill_attributes_legacy_funding(self):
+        # Funding used to leave only a FINANCIACION_PROYECTO row, with no project
+        populate_contributors = import_module('finance.migrations.0011_projectcontributor').populate_contributors
+        account = CuentaComitente.objects.create(user=self.other, balance=Decimal('0.00'))
+        for monto in ('102.00', '51.00'):
+            Transaccion.objects.create(cuenta=account, tipo=Transaccion.TipoTransaccion.FINANCIACION_PROYECTO, monto_pesos=Decimal(monto))
+        ProjectContributor.objects.all().delete()
+        Project.objects.update(donors_count=0)
+
+        populate_contributors(apps, None)
+
+        contributors = {
+            (row.project_id, row.donor_id): (row.total_amount, row.contributions_count) for row in ProjectContributor.objects.all()
+        }
+        self.assertEqual(contributors, {
+            (self.projects[1].id, self.donor.id): (Decimal('15.00'), 2),
+            (self.projects[1].id, self.other.id): (Decimal('70.00'), 2),
+            (self.projects[2].id, self.other.id): (Decimal('100.00'), 1),
+        })
+        self.assertEqual(list(Project.objects.order_by('pk').values_list('donors_count', flat=True)), [0, 2, 1])
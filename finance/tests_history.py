@@ -0,0 +1,40 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from fondiart_api.models import User
+from finance.models import CuentaComitente, Transaccion
+
+Tipo = Transaccion.TipoTransaccion
+
+class TransactionHistoryTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user', email='user@example.com', password='pw', name='User')
+        cuenta = CuentaComitente.objects.create(user=self.user)
+        for tipo, amount, days_ago in [(Tipo.DEPOSITO, '100.00', 10), (Tipo.COMPRA, '30.00', 5), (Tipo.COMPRA, '20.50', 1)]:
+            row = Transaccion.objects.create(cuenta=cuenta, tipo=tipo, monto_pesos=Decimal(amount), estado=Transaccion.EstadoTransaccion.COMPLETADA)
+            Transaccion.objects.filter(pk=row.pk).update(fecha=timezone.now() - timedelta(days=days_ago))
+        self.url = reverse('user-transaction-history', args=[self.user.id])
+        self.client.force_authenticate(self.user)
+
+    def test_filters_and_totals(self):
+        response = self.client.get(self.url, {'tipo': 'compra', 'from': (timezone.now() - timedelta(days=7)).date().isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['monto_pesos'] for row in response.data['results']], ['20.50', '30.00'])
+        self.assertEqual(response.data['totals'], {Tipo.COMPRA: {'count': 2, 'total': Decimal('50.50')}})
+
+        response = self.client.get(self.url, {'to': (timezone.now() - timedelta(days=3)).isoformat()})
+        self.assertEqual(response.data['totals'], {
+            Tipo.DEPOSITO: {'count': 1, 'total': Decimal('100.00')},
+            Tipo.COMPRA: {'count': 1, 'total': Decimal('30.00')},
+        })
+
+    def test_invalid_filters_are_rejected(self):
+        for params in (
+            {'tipo': 'REGALO'}, {'from': 'yesterday'}, {'artwork': 'x'},
+            # Well-formed but impossible dates, and an id past the bigint range
+            {'from': '2026-02-30'}, {'to': '2026-13-01T00:00'}, {'artwork': '99999999999999999999999'},
+        ):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,62 @@
+from decimal import Decimal
+from unittest import mock
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+from rest_framework.views import APIView
+from fondiart_api.models import User
+from finance.models import CuentaComitente, IdempotencyKey, Transaccion
+from finance.idempotency import idempotent
+
+class FailingWithdrawalView(APIView):
+    @idempotent
+    def post(self, request):
+        account = CuentaComitente.objects.get(user=request.user)
+        Transaccion.objects.create(cuenta=account, tipo=Transaccion.TipoTransaccion.RETIRO, monto_pesos=Decimal('10.00'))
+        return Response({'error': 'Bank unavailable.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+class IdempotencyKeyTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user', email='user@example.com', password='pw', name='User', cbu='0000003100010000000001')
+        self.account = CuentaComitente.objects.create(user=self.user, balance=Decimal('100.00'))
+        self.client.force_authenticate(self.user)
+        self.url = reverse('withdraw-to-cbu')
+
+    def withdraw(self, amount, key):
+        return self.client.post(self.url, {'user_id': self.user.id, 'amount': amount}, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retries_replay_the_stored_response(self):
+        first = self.withdraw('30.00', 'retry-1')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            replay = self.withdraw('30.00', 'retry-1')
+        self.assertEqual(replay.status_code, status.HTTP_200_OK)
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('70.00'))
+        self.assertEqual(Transaccion.objects.count(), 1)
+
+        self.assertEqual(self.withdraw('40.00', 'retry-1').status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(self.withdraw('40.00', 'retry-2').status_code, status.HTTP_200_OK)
+        self.assertEqual(IdempotencyKey.objects.count(), 2)
+
+    def test_server_errors_roll_back_the_handler_with_the_key(self):
+        request = APIRequestFactory().post('/withdraw/', {'amount': '10.00'}, format='json', HTTP_IDEMPOTENCY_KEY='fails')
+        force_authenticate(request, self.user)
+        response = FailingWithdrawalView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(Transaccion.objects.exists())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_concurrent_duplicate_replays_the_committed_response(self):
+        first = self.withdraw('30.00', 'race')
+        # The duplicate looked the key up before the first request committed it
+        with mock.patch('finance.idempotency._stored', return_value=None):
+            duplicate = self.withdraw('30.00', 'race')
+        self.assertEqual(duplicate.status_code, status.HTTP_200_OK)
+        self.assertEqual(duplicate.data, first.data)
+        self.assertEqual(duplicate['Idempotent-Replayed'], 'true')
+        self.assertEqual(Transaccion.objects.count(), 1)
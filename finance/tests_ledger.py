@@ -0,0 +1,161 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from blockchain.models import CuadroToken
+from fondiart_api.models import Artwork, User
+from finance.models import BalanceCheckpoint, CuentaComitente, PlatformFeeAccrual, TokenHolding, Transaccion
+from finance.balances import balance_at, checkpoint_account
+from finance.fees import sweep_platform_fees
+from finance.ledger import Leg, InsufficientFunds, UnbalancedPosting, external, platform, post_transfer
+
+Tipo = Transaccion.TipoTransaccion
+
+class LedgerTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='pw', name='Admin', role='admin')
+        self.artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        self.donor = User.objects.create_user(username='donor', email='donor@example.com', password='pw', name='Donor')
+        self.admin_account = CuentaComitente.objects.create(user=self.admin)
+        self.artist_account = CuentaComitente.objects.create(user=self.artist)
+        self.donor_account = CuentaComitente.objects.create(user=self.donor, balance=Decimal('100.00'))
+
+    def balances(self):
+        return list(CuentaComitente.objects.order_by('pk').values_list('balance', flat=True))
+
+    def test_posting_moves_money_and_writes_every_leg(self):
+        with self.assertNumQueries(5):  # savepoint, lock, update, insert, release
+            rows = post_transfer(
+                Leg(self.donor_account.id, Tipo.DONACION_ENVIADA, Decimal('51.00')),
+                Leg(self.artist_account.id, Tipo.DONACION_RECIBIDA, Decimal('50.00')),
+                Leg(self.admin_account.id, Tipo.COMISION, Decimal('1.00')),
+            )
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(self.balances(), [Decimal('1.00'), Decimal('50.00'), Decimal('49.00')])
+
+    def test_rejected_postings_change_nothing(self):
+        with self.assertRaises(UnbalancedPosting):
+            post_transfer(Leg(self.donor_account.id, Tipo.RETIRO, Decimal('10.00')), external(Tipo.DEPOSITO, Decimal('9.00')))
+        with self.assertRaises(InsufficientFunds):
+            post_transfer(Leg(self.donor_account.id, Tipo.RETIRO, Decimal('100.01')), external(Tipo.DEPOSITO, Decimal('100.01')))
+        self.assertEqual(self.balances(), [Decimal('0.00'), Decimal('0.00'), Decimal('100.00')])
+        self.assertFalse(Transaccion.objects.exists())
+
+    def test_donation_view_accrues_the_commission(self):
+        self.client.force_authenticate(self.donor)
+        response = self.client.post(reverse('create-donation'), {'artist_id': self.artist.id, 'amount': '50.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.balances(), [Decimal('0.00'), Decimal('50.00'), Decimal('49.00')])
+        self.assertEqual(PlatformFeeAccrual.objects.get().monto, Decimal('1.00'))
+
+        response = self.client.post(reverse('create-donation'), {'artist_id': self.artist.id, 'amount': '50.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Transaccion.objects.count(), 2)
+
+    def test_deposit_rejects_invalid_amounts(self):
+        self.client.force_authenticate(self.donor)
+        url = reverse('create-transaccion')
+        for monto in ('0', '-5.00', '1.005', 'abc', 'NaN', '1e40'):
+            response = self.client.post(url, {'tipo': Tipo.DEPOSITO, 'monto_pesos': monto}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, monto)
+        self.assertFalse(Transaccion.objects.exists())
+
+        response = self.client.post(url, {'tipo': Tipo.DEPOSITO, 'monto_pesos': '10.50'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.balances()[2], Decimal('110.50'))
+
+    def test_money_endpoints_reject_non_positive_amounts(self):
+        User.objects.filter(pk=self.donor.pk).update(cbu='0' * 22)
+        self.client.force_authenticate(self.donor)
+        for name in ('withdraw-to-cbu', 'transfer-to-admin'):
+            for amount in ('0', '-5.00'):
+                response = self.client.post(reverse(name), {'user_id': self.donor.id, 'amount': amount}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (name, amount))
+        response = self.client.post(
+            reverse('create-transaccion'), {'tipo': Tipo.COMPRA, 'monto_pesos': '0', 'artwork': 1, 'cantidad_tokens': 1}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse('liquidate-artwork'), {'artwork_id': 1, 'total_amount': '-1.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Transaccion.objects.exists())
+        self.assertEqual(self.balances()[2], Decimal('100.00'))
+
+    def test_sweep_credits_the_admin_once(self):
+        post_transfer(
+            Leg(self.donor_account.id, Tipo.COMPRA, Decimal('12.50')),
+            platform(Tipo.VENTA, Decimal('10.00')),
+            platform(Tipo.COMISION, Decimal('2.00')),
+            platform(Tipo.COMISION, Decimal('0.50')),
+        )
+        sweep = sweep_platform_fees()
+        self.assertEqual((sweep.total, sweep.accruals_count), (Decimal('12.50'), 3))
+        self.assertEqual(self.balances()[0], Decimal('12.50'))
+        self.assertEqual(
+            sorted(Transaccion.objects.filter(cuenta=self.admin_account).values_list('tipo', 'monto_pesos')),
+            [(Tipo.COMISION, Decimal('2.50')), (Tipo.VENTA, Decimal('10.00'))],
+        )
+        self.assertIsNone(sweep_platform_fees())
+        self.assertEqual(self.balances()[0], Decimal('12.50'))
+
+    def test_sweep_command_needs_an_admin_account(self):
+        self.admin_account.delete()
+        with self.assertRaisesMessage(CommandError, 'Admin does not have a brokerage account'):
+            call_command('sweep_platform_fees')
+
+    def test_liquidation_uses_the_pending_fees(self):
+        post_transfer(Leg(self.donor_account.id, Tipo.COMPRA, Decimal('12.50')), platform(Tipo.COMISION, Decimal('12.50')))
+        artwork = Artwork.objects.create(title='Obra', artist=self.artist, price=Decimal('1000.00'), status='approved')
+        token = CuadroToken.objects.create(
+            artwork=artwork, contract_address='0x1', token_name='Obra', token_symbol='OBR',
+            total_supply=100000, tokens_disponibles=0, tokens_vendidos=100000,
+        )
+        TokenHolding.objects.create(user=self.donor, token=token, quantity=1000, purchase_price=0)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse('liquidate-artwork'), {'artwork_id': artwork.id, 'total_amount': '1000.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 12.50 swept in, 9.90 paid for the 1000 tokens after the 1% commission
+        self.assertEqual(self.balances(), [Decimal('2.60'), Decimal('0.00'), Decimal('97.40')])
+        self.assertFalse(PlatformFeeAccrual.objects.filter(sweep__isnull=True).exists())
+
+    def test_running_balances_and_checkpoints(self):
+        deposit = lambda amount: post_transfer(Leg(self.donor_account.id, Tipo.DEPOSITO, Decimal(amount)), external(Tipo.RETIRO, Decimal(amount)))
+        with mock.patch('finance.ledger.CHECKPOINT_INTERVAL', 2):
+            first, = deposit('10.00')
+            deposit('5.00')
+            deposit('1.00')
+        self.assertEqual(first.balance_after, Decimal('110.00'))
+        checkpoint = BalanceCheckpoint.objects.get()
+        self.assertEqual(checkpoint.balance, Decimal('115.00'))
+
+        Transaccion.objects.filter(pk=first.pk).update(fecha=timezone.now() - timedelta(days=2))
+        yesterday = timezone.now() - timedelta(days=1)
+        self.assertEqual(balance_at(self.donor_account.id, yesterday), Decimal('110.00'))
+        self.client.force_authenticate(self.donor)
+        response = self.client.get(reverse('user-account-balance', args=[self.donor.id]), {'at': yesterday.isoformat()})
+        self.assertEqual(response.data['balance'], Decimal('110.00'))
+        response = self.client.get(reverse('user-account-balance', args=[self.donor.id]), {'at': '2026-02-30T10:00'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.artist)
+        response = self.client.get(reverse('user-account-balance', args=[self.donor.id]), {'at': yesterday.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('user-account-balance', args=[self.donor.id]))
+        self.assertEqual(response.data['balance'], Decimal('116.00'))
+
+    def test_checkpointing_older_rows(self):
+        for amount in ('10.00', '20.00', '5.00'):
+            tipo = Tipo.RETIRO if amount == '5.00' else Tipo.DEPOSITO
+            Transaccion.objects.create(cuenta=self.artist_account, tipo=tipo, monto_pesos=Decimal(amount))
+        self.assertEqual(balance_at(self.artist_account.id, timezone.now()), Decimal('25.00'))
+
+        self.assertEqual(checkpoint_account(self.artist_account.id, interval=2), 3)
+        self.assertEqual(list(Transaccion.objects.order_by('id').values_list('balance_after', flat=True)), [Decimal('10.00'), Decimal('30.00'), Decimal('25.00')])
+        self.assertEqual(BalanceCheckpoint.objects.get().balance, Decimal('30.00'))
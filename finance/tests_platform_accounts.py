@@ -0,0 +1,48 @@
+from unittest import mock
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from fondiart_api.models import User, Wallet
+from finance.models import CuentaComitente
+from finance.platform_accounts import GENERATION_KEY, TTL, get_platform_accounts
+
+
+class PlatformAccountsTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='pw', name='Admin', role='admin')
+        self.account = CuentaComitente.objects.create(user=self.admin)
+
+    def test_resolved_once_until_something_changes(self):
+        with self.assertNumQueries(1):
+            resolved = get_platform_accounts()
+        self.assertEqual((resolved.user_id, resolved.cuenta_id, resolved.wallet_address), (self.admin.id, self.account.id, None))
+        with self.assertNumQueries(0):
+            self.assertIs(get_platform_accounts(), resolved)
+
+        Wallet.objects.create(user=self.admin, address='0x' + '1' * 40, private_key='0' * 64)
+        self.assertEqual(get_platform_accounts().wallet_address, '0x' + '1' * 40)
+
+        self.admin.role = 'artist'
+        self.admin.save()
+        self.assertIsNone(get_platform_accounts())
+
+    def test_other_users_do_not_invalidate(self):
+        resolved = get_platform_accounts()
+        user = User.objects.create_user(username='someone', email='someone@example.com', password='pw', name='Someone')
+        CuentaComitente.objects.create(user=user)
+        with self.assertNumQueries(0):
+            self.assertIs(get_platform_accounts(), resolved)
+
+    def test_evicted_generation_or_expired_copy_is_looked_up_again(self):
+        get_platform_accounts()
+        # Another process changed the admin, then the generation was evicted
+        User.objects.filter(pk=self.admin.pk).update(role='artist')
+        cache.delete(GENERATION_KEY)
+        self.assertIsNone(get_platform_accounts())
+
+        User.objects.filter(pk=self.admin.pk).update(role='admin')
+        resolved = get_platform_accounts()
+        # A change this process isn't told about only shows once the copy expires
+        User.objects.filter(pk=self.admin.pk).update(role='artist')
+        self.assertIs(get_platform_accounts(), resolved)
+        with mock.patch('finance.platform_accounts.time.monotonic', return_value=resolved.resolved_at + TTL):
+            self.assertIsNone(get_platform_accounts())
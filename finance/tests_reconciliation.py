@@ -0,0 +1,71 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from blockchain.models import CuadroToken
+from fondiart_api.models import Artwork, User
+from finance.models import CuentaComitente, ReconciliationDiscrepancy, TokenHolding, Transaccion
+from finance.ledger import Leg, external, post_transfer
+from finance.reconciliation import reconcile
+
+Tipo = Transaccion.TipoTransaccion
+Kind = ReconciliationDiscrepancy.Kind
+
+class ReconciliationTest(APITestCase):
+    def setUp(self):
+        self.artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pw', name='Buyer')
+        self.artist_account = CuentaComitente.objects.create(user=self.artist)
+        self.buyer_account = CuentaComitente.objects.create(user=self.buyer)
+        artwork = Artwork.objects.create(title='Obra', artist=self.artist, price=Decimal('1000.00'), status='approved')
+        self.token = CuadroToken.objects.create(artwork=artwork, contract_address='0x1', token_name='Obra', token_symbol='OBR', total_supply=100000)
+        TokenHolding.objects.create(user=self.artist, token=self.token, quantity=70000, purchase_price=0)
+        self.deposit('100.10')
+
+    def settle(self):
+        # Moves every transaction past the reconciliation lag
+        Transaccion.objects.update(fecha=timezone.now() - timedelta(hours=1))
+
+    def deposit(self, amount):
+        post_transfer(Leg(self.buyer_account.id, Tipo.DEPOSITO, Decimal(amount)), external(Tipo.RETIRO, Decimal(amount)))
+
+    def test_consistent_ledger_has_no_discrepancies(self):
+        self.settle()
+        run = reconcile(chunk_size=1)
+        self.assertEqual((run.transactions_processed, run.accounts_checked, run.tokens_checked, run.discrepancies_found), (1, 2, 1, 0))
+
+        self.deposit('0.05')
+        self.settle()
+        run = reconcile()
+        self.assertEqual((run.transactions_processed, run.discrepancies_found), (1, 0))
+
+    def test_discrepancies_are_recorded(self):
+        reconcile()
+        CuentaComitente.objects.filter(pk=self.buyer_account.pk).update(balance=Decimal('100.00'))
+        Transaccion.objects.create(cuenta=self.artist_account, tipo=Tipo.DEPOSITO, monto_pesos=Decimal('5.00'))
+        CuadroToken.objects.filter(pk=self.token.pk).update(tokens_vendidos=70010)
+
+        run = reconcile()
+        found = sorted(run.discrepancies.values_list('kind', 'cuenta_id', 'token_id', 'expected', 'actual'))
+        self.assertEqual(found, [
+            (Kind.ACCOUNT_BALANCE, self.artist_account.id, None, 500, 0),
+            (Kind.ACCOUNT_BALANCE, self.buyer_account.id, None, 10010, 10000),
+            (Kind.TOKEN_HOLDINGS, None, self.token.id, 70010, 70000),
+            (Kind.TOKEN_SUPPLY, None, self.token.id, 100000, 100010),
+        ])
+
+    def test_rows_committed_below_the_watermark_are_folded_later(self):
+        self.settle()
+        self.deposit('2.00')
+        recent = Transaccion.objects.latest('id')
+        Transaccion.objects.filter(pk=recent.pk).update(id=10)
+        run = reconcile()
+        # The recent deposit stays past the watermark, but counts in the check
+        self.assertEqual((run.watermark, run.transactions_processed, run.discrepancies_found), (recent.pk - 1, 1, 0))
+
+        # A row given a lower id than the recent one, committed after the run
+        self.deposit('3.00')
+        Transaccion.objects.filter(pk=11).update(id=5)
+        self.settle()
+        run = reconcile()
+        self.assertEqual((run.watermark, run.transactions_processed, run.discrepancies_found), (10, 2, 0))
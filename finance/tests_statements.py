@@ -0,0 +1,61 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from blockchain.models import CuadroToken
+from fondiart_api.models import Artwork, User
+from finance.models import CuentaComitente, MonthlyStatement, SellOrder, TokenHolding, Transaccion
+from finance.ledger import Leg, external, platform, post_transfer
+
+Tipo = Transaccion.TipoTransaccion
+
+class MonthlyStatementTest(APITestCase):
+    def setUp(self):
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pw', name='Buyer')
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pw', name='Seller')
+        self.buyer_account = CuentaComitente.objects.create(user=self.buyer)
+        self.seller_account = CuentaComitente.objects.create(user=self.seller)
+        deposit, = post_transfer(Leg(self.buyer_account.id, Tipo.DEPOSITO, Decimal('100.00')), external(Tipo.RETIRO, Decimal('100.00')))
+        # The deposit belongs to the previous month
+        Transaccion.objects.filter(pk=deposit.pk).update(fecha=timezone.now().replace(day=1) - timedelta(days=1))
+        post_transfer(
+            Leg(self.buyer_account.id, Tipo.COMPRA, Decimal('41.00')),
+            Leg(self.seller_account.id, Tipo.VENTA, Decimal('40.00')),
+            platform(Tipo.COMISION, Decimal('1.00'), payer_id=self.buyer_account.id),
+        )
+
+    def generate(self, **options):
+        call_command('generate_statements', period=f'{timezone.localdate():%Y-%m}', workers=1, stdout=StringIO(), **options)
+
+    def test_statement_of_every_account(self):
+        self.generate()
+        statement = MonthlyStatement.objects.get(cuenta=self.buyer_account)
+        self.assertEqual((statement.opening_balance, statement.closing_balance, statement.fees), (Decimal('100.00'), Decimal('59.00'), Decimal('1.00')))
+        self.assertEqual(statement.movements, {Tipo.COMPRA: {'count': 1, 'total': '41.00'}})
+        self.assertIn('Closing balance', statement.rendered)
+        self.assertEqual(MonthlyStatement.objects.get(cuenta=self.seller_account).closing_balance, Decimal('40.00'))
+
+    def test_rerun_only_builds_missing_statements(self):
+        self.generate(chunk_size=1)
+        MonthlyStatement.objects.filter(cuenta=self.seller_account).delete()
+        kept = MonthlyStatement.objects.get()
+        self.generate()
+        self.assertEqual(MonthlyStatement.objects.count(), 2)
+        self.assertEqual(MonthlyStatement.objects.get(cuenta=self.buyer_account).pk, kept.pk)
+
+    def test_secondary_trade_fees_belong_to_each_side(self):
+        artwork = Artwork.objects.create(title='Obra', artist=self.seller, price=Decimal('1000.00'))
+        token = CuadroToken.objects.create(artwork=artwork, contract_address='0x1', token_name='Obra', token_symbol='OBR', total_supply=100000)
+        TokenHolding.objects.create(user=self.seller, token=token, quantity=10, purchase_price=0)
+        order = SellOrder.objects.create(token=token, user=self.seller, quantity=10, price=Decimal('5.00'))
+        self.client.force_authenticate(self.buyer)
+        response = self.client.post(reverse('buy-from-sell-order'), {'sell_order_id': order.id, 'quantity': 4}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.generate()
+        # 20.00 traded: 2% paid by the buyer on top of the 1.00 above, 1% by the seller
+        self.assertEqual(MonthlyStatement.objects.get(cuenta=self.buyer_account).fees, Decimal('1.40'))
+        self.assertEqual(MonthlyStatement.objects.get(cuenta=self.seller_account).fees, Decimal('0.20'))
@@ -11,11 +11,14 @@ from .views import (
     ProjectDonationView,
     ProjectDonationSummaryView,
     ProjectDonorsCountView,
+    ProjectFundingSummaryView,
     CheckSufficientFundsView,
     TransferToAdminView,
     LiquidateArtworkView,
     WithdrawToCBUView,
     UserTransactionHistoryView,
+    AccountBalanceView,
+    AccountExportView,
     SellOrderListCreateView,
     SellOrderDetailView,
     UserSellOrderListView,
@@ -32,6 +35,7 @@ urlpatterns = [
     path('tokens/buy/', BuyTokensView.as_view(), name='buy-tokens'),
     path('users/<int:user_id>/tokens/', UserTokenHoldingsView.as_view(), name='user-token-holdings'),
     path('donations/', DonationView.as_view(), name='create-donation'),
+    path('projects/summary/', ProjectFundingSummaryView.as_view(), name='project-funding-summary'),
     path('projects/fund/', FundProjectView.as_view(), name='fund-project'),
     path('donations/project/', ProjectDonationView.as_view(), name='project-donation-create'),
     path('projects/<int:project_id>/donations/summary/<int:user_id>/', ProjectDonationSummaryView.as_view(), name='project-donation-summary'),
@@ -41,6 +45,8 @@ urlpatterns = [
     path('liquidate-artwork/', LiquidateArtworkView.as_view(), name='liquidate-artwork'),
     path('withdraw-to-cbu/', WithdrawToCBUView.as_view(), name='withdraw-to-cbu'),
     path('users/<int:user_id>/transactions/', UserTransactionHistoryView.as_view(), name='user-transaction-history'),
+    path('users/<int:user_id>/balance/', AccountBalanceView.as_view(), name='user-account-balance'),
+    path('users/<int:user_id>/export/<str:dataset>/', AccountExportView.as_view(), name='user-account-export'),
     path('sell-orders/', SellOrderListCreateView.as_view(), name='sell-order-list-create'),
     path('sell-orders/<int:pk>/', SellOrderDetailView.as_view(), name='sell-order-detail'),
     path('users/<int:user_id>/sell-orders/', UserSellOrderListView.as_view(), name='user-sell-orders'),
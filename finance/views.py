@@ -1,8 +1,25 @@
-from rest_framework import generics, status
+from rest_framework import generics, serializers, status
 from rest_framework.permissions import IsAuthenticated
 from fondiart_api.permissions import IsAdminRoleUser
+from fondiart_api.pagination import KeysetPaginationMixin
+from fondiart_api.query_plan import QueryPlanMixin
+from fondiart_api.fieldsets import SparseFieldsetMixin
+from fondiart_api.artist_stats import adjust_artist_stats
+from fondiart_api.trending import record_artwork_event
+from .funding import funding_progress, funding_percentage, record_project_contribution
+from .ledger import Leg, InsufficientFunds, LedgerError, cents, external, platform, post_transfer
+from .balances import balance_at
+from .history import filter_transactions, totals_by_type
+from .exports import FORMATS, export_rows
+from .idempotency import idempotent
+from .fees import sweep_platform_fees
+from .platform_accounts import get_platform_accounts
 from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied
+from django.http import StreamingHttpResponse
 from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from .models import Transaccion, CuentaComitente, TokenHolding, Donation, SellOrder
 from blockchain.models import CuadroToken
 from .serializers import (
@@ -19,17 +36,17 @@ from .serializers import (
     DonationTransactionSerializer
 )
 from fondiart_api.models import Artwork, User, Project
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from django.db.models import Sum, Count
 
 class ProjectDonorsCountView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, project_id):
-        donors_count = Donation.objects.filter(project_id=project_id).values('donor').distinct().count()
+        donors_count = Project.objects.filter(pk=project_id).values_list('donors_count', flat=True).first()
 
         return Response({
-            'donors_count': donors_count,
+            'donors_count': donors_count or 0,
         })
 
 class ProjectDonationSummaryView(generics.GenericAPIView):
@@ -47,6 +64,40 @@ class ProjectDonationSummaryView(generics.GenericAPIView):
             'donation_count': summary['donation_count'] or 0,
         })
 
+# Upper bound on ?ids= for ProjectFundingSummaryView
+PROJECT_SUMMARY_MAX_IDS = 300
+
+class ProjectFundingSummaryView(generics.GenericAPIView):
+    """
+    Funding progress for many projects at once (?ids=1,2,3): the same numbers
+    as ProjectDonorsCountView and ProjectDonationSummaryView, for the current
+    user, in two queries whatever the number of projects.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        raw_ids = [raw.strip() for raw in (request.query_params.get('ids') or '').split(',') if raw.strip()]
+        if not raw_ids or not all(raw.isdigit() for raw in raw_ids):
+            return Response({'error': 'ids must be a comma separated list of project ids.'}, status=status.HTTP_400_BAD_REQUEST)
+        ids = list(dict.fromkeys(int(raw) for raw in raw_ids))
+        if len(ids) > PROJECT_SUMMARY_MAX_IDS:
+            return Response({'error': f'At most {PROJECT_SUMMARY_MAX_IDS} ids per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        projects = Project.objects.only('id', 'funding_goal', 'amount_raised', 'donors_count').in_bulk(ids)
+        progress = funding_progress(projects.values(), request.user)
+        results = []
+        for pk in ids:
+            if pk in projects:
+                project = projects[pk]
+                results.append({
+                    'project_id': pk,
+                    'funding_goal': project.funding_goal,
+                    'amount_raised': project.amount_raised,
+                    'funding_percentage': funding_percentage(project),
+                    **progress[pk],
+                })
+        return Response({'results': results, 'missing': [pk for pk in ids if pk not in projects]})
+
 class ProjectDonationView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ProjectDonationSerializer
@@ -61,22 +112,19 @@ class ProjectDonationView(generics.CreateAPIView):
         except CuentaComitente.DoesNotExist:
             raise serializers.ValidationError("Donor does not have a brokerage account.")
 
-        commission = amount * Decimal('0.02')
+        commission = cents(amount * Decimal('0.02'))
         total_cost = amount + commission
 
-        if donor_account.balance < total_cost:
-            raise serializers.ValidationError("Insufficient funds.")
-
         with transaction.atomic():
-            donor_account.balance -= total_cost
-            donor_account.save()
-
-            Transaccion.objects.create(
-                cuenta=donor_account,
-                tipo=Transaccion.TipoTransaccion.DONACION_ENVIADA,
-                monto_pesos=total_cost,
-                estado=Transaccion.EstadoTransaccion.COMPLETADA
-            )
+            try:
+                # The amount goes to the project, held until its goal is met
+                post_transfer(
+                    Leg(donor_account.id, Transaccion.TipoTransaccion.DONACION_ENVIADA, total_cost),
+                    external(Transaccion.TipoTransaccion.FINANCIACION_RECIBIDA, amount),
+                    platform(Transaccion.TipoTransaccion.COMISION, commission, payer_id=donor_account.id),
+                )
+            except InsufficientFunds:
+                raise serializers.ValidationError("Insufficient funds.")
 
             serializer.save(donor=donor)
 
@@ -84,6 +132,7 @@ class FundProjectView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = FundProjectSerializer
 
+    @idempotent
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -102,28 +151,21 @@ class FundProjectView(generics.GenericAPIView):
         except CuentaComitente.DoesNotExist:
             return Response({'error': 'Funding user does not have a brokerage account.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        commission = amount * Decimal('0.02')
+        commission = cents(amount * Decimal('0.02'))
         total_cost = amount + commission
 
-        if funder_account.balance < total_cost:
+        try:
+            with transaction.atomic():
+                # The amount goes to the project, held until its goal is met
+                post_transfer(
+                    Leg(funder_account.id, Transaccion.TipoTransaccion.FINANCIACION_PROYECTO, total_cost),
+                    external(Transaccion.TipoTransaccion.FINANCIACION_RECIBIDA, amount),
+                    platform(Transaccion.TipoTransaccion.COMISION, commission, payer_id=funder_account.id),
+                )
+                record_project_contribution(project.id, funder.id, amount)
+        except InsufficientFunds:
             return Response({'error': 'Insufficient funds.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            # Update balances
-            funder_account.balance -= total_cost
-            funder_account.save()
-
-            project.amount_raised += amount
-            project.save()
-
-            # Record the transaction
-            Transaccion.objects.create(
-                cuenta=funder_account,
-                tipo=Transaccion.TipoTransaccion.FINANCIACION_PROYECTO,
-                monto_pesos=total_cost,
-                estado=Transaccion.EstadoTransaccion.COMPLETADA
-            )
-
         return Response({'message': f"Successfully funded project '{project.title}' with {amount}."})
 
 class DonationView(generics.GenericAPIView):
@@ -131,6 +173,7 @@ class DonationView(generics.GenericAPIView):
     serializer_class = DonationSerializer
 
 
+    @idempotent
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -154,44 +197,25 @@ class DonationView(generics.GenericAPIView):
         except CuentaComitente.DoesNotExist:
             return Response({'error': 'Brokerage account not found for donor or artist.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        commission = amount * Decimal('0.02')
+        commission = cents(amount * Decimal('0.02'))
         final_cost = amount + commission
 
-        if donor_account.balance < final_cost:
+        try:
+            with transaction.atomic():
+                post_transfer(
+                    Leg(donor_account.id, Transaccion.TipoTransaccion.DONACION_ENVIADA, final_cost, recipient_artist_id=artist.id),
+                    Leg(artist_account.id, Transaccion.TipoTransaccion.DONACION_RECIBIDA, amount, recipient_artist_id=artist.id),
+                    platform(Transaccion.TipoTransaccion.COMISION, commission, payer_id=donor_account.id),
+                )
+                adjust_artist_stats(artist.id, donations_received=amount, donations_count=1)
+        except InsufficientFunds:
             return Response({'error': 'Insufficient funds.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            # Perform the transaction
-            donor_account.balance -= final_cost
-            donor_account.save()
-
-            artist_account.balance += amount
-            artist_account.save()
-
-            # Record the transaction for the donor
-            Transaccion.objects.create(
-                cuenta=donor_account,
-                tipo=Transaccion.TipoTransaccion.DONACION_ENVIADA,
-                monto_pesos=final_cost,
-                estado=Transaccion.EstadoTransaccion.COMPLETADA,
-                recipient_artist=artist
-            )
-            print(f"[DEBUG] DonationView: DONACION_ENVIADA created with recipient_artist: {artist.name}")
-
-            # Record the transaction for the artist
-            Transaccion.objects.create(
-                cuenta=artist_account,
-                tipo=Transaccion.TipoTransaccion.DONACION_RECIBIDA,
-                monto_pesos=amount,
-                estado=Transaccion.EstadoTransaccion.COMPLETADA,
-                recipient_artist=artist
-            )
-            print(f"[DEBUG] DonationView: DONACION_RECIBIDA created with recipient_artist: {artist.name}")
-
         return Response({'message': 'Donation successful.'}, status=status.HTTP_200_OK)
 
-class UserTokenHoldingsView(generics.ListAPIView):
+class UserTokenHoldingsView(QueryPlanMixin, generics.ListAPIView):
     serializer_class = UserTokenHoldingSerializer
+    select_related_fields = ('token__artwork',)
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -202,6 +226,7 @@ class BuyTokensView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = BuyTokensSerializer
 
+    @idempotent
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -221,32 +246,25 @@ class BuyTokensView(generics.GenericAPIView):
         except CuentaComitente.DoesNotExist:
             return Response({'error': 'User does not have a brokerage account.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if token.tokens_disponibles < quantity:
-            return Response({'error': 'Not enough tokens available for sale.'}, status=status.HTTP_400_BAD_REQUEST)
-
         token_price = artwork.fractionFrom
         total_price = token_price * quantity
-        commission = total_price * Decimal('0.02')
+        commission = cents(total_price * Decimal('0.02'))
         final_cost = total_price + commission
 
-        if cuenta_comitente.balance < final_cost:
-            return Response({'error': 'Insufficient funds.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        admin_user = User.objects.filter(role='admin').first()
-        if not admin_user:
-            return Response({'error': 'Admin user not found.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        try:
-            admin_cuenta_comitente = CuentaComitente.objects.get(user=admin_user)
-        except CuentaComitente.DoesNotExist:
-            return Response({'error': 'Admin does not have a brokerage account.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
         with transaction.atomic():
-            cuenta_comitente.balance -= final_cost
-            cuenta_comitente.save()
+            # The token row serializes purchases of this artwork
+            token = CuadroToken.objects.select_for_update().get(pk=token.pk)
+            if token.tokens_disponibles < quantity:
+                return Response({'error': 'Not enough tokens available for sale.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            admin_cuenta_comitente.balance += final_cost
-            admin_cuenta_comitente.save()
+            try:
+                post_transfer(
+                    Leg(cuenta_comitente.id, Transaccion.TipoTransaccion.COMPRA, final_cost, artwork_id=artwork.id, cantidad_tokens=quantity),
+                    platform(Transaccion.TipoTransaccion.VENTA, total_price, payer_id=cuenta_comitente.id),
+                    platform(Transaccion.TipoTransaccion.COMISION, commission, payer_id=cuenta_comitente.id),
+                )
+            except InsufficientFunds:
+                return Response({'error': 'Insufficient funds.'}, status=status.HTTP_400_BAD_REQUEST)
 
             token.tokens_disponibles -= quantity
             token.tokens_vendidos += quantity
@@ -266,16 +284,7 @@ class BuyTokensView(generics.GenericAPIView):
                 holding.quantity = quantity
                 holding.save()
 
-
-            # Create a transaction record
-            Transaccion.objects.create(
-                cuenta=cuenta_comitente,
-                tipo=Transaccion.TipoTransaccion.COMPRA,
-                artwork=artwork,
-                cantidad_tokens=quantity,
-                monto_pesos=final_cost,
-                estado=Transaccion.EstadoTransaccion.COMPLETADA
-            )
+            adjust_artist_stats(artwork.artist_id, tokens_sold=quantity, primary_revenue=total_price)
 
             response_serializer = TokenHoldingSerializer(holding)
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
@@ -315,6 +324,20 @@ class CuentaComitenteUpdateView(generics.UpdateAPIView):
     queryset = CuentaComitente.objects.all()
     lookup_field = 'user__id'
 
+def _monto_valido(raw):
+    """
+    The amount as a Decimal if it is positive and in whole cents, else None.
+    It is not rounded: the ledger only takes what the client asked for.
+    """
+    try:
+        monto = Decimal(str(raw))
+        if monto.is_finite() and monto > 0 and monto == cents(monto):
+            return monto
+    except InvalidOperation:
+        # Not a number, or too many digits to quantize
+        pass
+    return None
+
 class CreateTransaccionView(generics.CreateAPIView):
     serializer_class = TransaccionSerializer
 
@@ -334,30 +357,25 @@ class CreateTransaccionView(generics.CreateAPIView):
             if not all([monto_pesos, artwork_id, cantidad_tokens]):
                 return Response({'error': 'Para la compra se requiere monto_pesos, artwork y cantidad_tokens.'}, status=status.HTTP_400_BAD_REQUEST)
 
+            monto_pesos = _monto_valido(monto_pesos)
+            if monto_pesos is None:
+                return Response({'error': 'monto_pesos debe ser un importe positivo con hasta 2 decimales.'}, status=status.HTTP_400_BAD_REQUEST)
             try:
                 artwork = Artwork.objects.get(id=artwork_id)
-                monto_pesos = float(monto_pesos)
-
-                if cuenta.balance < monto_pesos:
-                    return Response({'error': 'Saldo insuficiente.'}, status=status.HTTP_400_BAD_REQUEST)
-
-                with transaction.atomic():
-                    cuenta.balance -= monto_pesos
-                    cuenta.save()
-
-                    # Aquí iría la lógica para transferir los tokens al usuario
-                    # Por ejemplo, llamar a un servicio de blockchain
-
-                    transaccion = Transaccion.objects.create(
-                        cuenta=cuenta,
-                        tipo=tipo,
-                        artwork=artwork,
-                        cantidad_tokens=cantidad_tokens,
-                        monto_pesos=monto_pesos,
-                        estado=Transaccion.EstadoTransaccion.COMPLETADA
-                    )
+
+                # Aquí iría la lógica para transferir los tokens al usuario
+                # Por ejemplo, llamar a un servicio de blockchain
+
+                transaccion, = post_transfer(
+                    Leg(cuenta.id, tipo, monto_pesos, artwork_id=artwork.id, cantidad_tokens=cantidad_tokens),
+                    external(Transaccion.TipoTransaccion.VENTA, monto_pesos),
+                )
                 return Response(TransaccionSerializer(transaccion).data, status=status.HTTP_201_CREATED)
 
+            except InsufficientFunds:
+                return Response({'error': 'Saldo insuficiente.'}, status=status.HTTP_400_BAD_REQUEST)
+            except LedgerError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             except Artwork.DoesNotExist:
                 return Response({'error': 'La obra de arte no existe.'}, status=status.HTTP_404_NOT_FOUND)
             except Exception as e:
@@ -371,16 +389,16 @@ class CreateTransaccionView(generics.CreateAPIView):
             if not monto_pesos:
                 return Response({'error': 'Para el depósito se requiere monto_pesos.'}, status=status.HTTP_400_BAD_REQUEST)
             
-            with transaction.atomic():
-                monto_pesos = float(monto_pesos)
-                cuenta.balance += monto_pesos
-                cuenta.save()
-                transaccion = Transaccion.objects.create(
-                    cuenta=cuenta,
-                    tipo=tipo,
-                    monto_pesos=monto_pesos,
-                    estado=Transaccion.EstadoTransaccion.COMPLETADA
+            monto_pesos = _monto_valido(monto_pesos)
+            if monto_pesos is None:
+                return Response({'error': 'monto_pesos debe ser un importe positivo con hasta 2 decimales.'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                transaccion, = post_transfer(
+                    Leg(cuenta.id, tipo, monto_pesos),
+                    external(Transaccion.TipoTransaccion.RETIRO, monto_pesos),
                 )
+            except LedgerError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             return Response(TransaccionSerializer(transaccion).data, status=status.HTTP_201_CREATED)
 
         else:
@@ -424,39 +442,15 @@ class TransferToAdminView(generics.GenericAPIView):
         except CuentaComitente.DoesNotExist:
             return Response({'error': 'User does not have a brokerage account.'}, status=status.HTTP_404_NOT_FOUND)
 
-        admin_user = User.objects.filter(role='admin').first()
-        if not admin_user:
-            return Response({'error': 'Admin user not found.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
         try:
-            admin_account = CuentaComitente.objects.get(user=admin_user)
-        except CuentaComitente.DoesNotExist:
-            return Response({'error': 'Admin does not have a brokerage account.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        if user_account.balance < amount:
-            return Response({'error': 'Insufficient funds.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        with transaction.atomic():
-            user_account.balance -= amount
-            user_account.save()
-
-            admin_account.balance += amount
-            admin_account.save()
-
-            # Create transaction records
-            Transaccion.objects.create(
-                cuenta=user_account,
-                tipo=Transaccion.TipoTransaccion.RETIRO, # Or a new type like 'TRANSFER_TO_ADMIN'
-                monto_pesos=amount,
-                estado=Transaccion.EstadoTransaccion.COMPLETADA
-            )
-
-            Transaccion.objects.create(
-                cuenta=admin_account,
-                tipo=Transaccion.TipoTransaccion.DEPOSITO, # Or a new type like 'TRANSFER_FROM_USER'
-                monto_pesos=amount,
-                estado=Transaccion.EstadoTransaccion.COMPLETADA
+            post_transfer(
+                Leg(user_account.id, Transaccion.TipoTransaccion.RETIRO, amount), # Or a new type like 'TRANSFER_TO_ADMIN'
+                platform(Transaccion.TipoTransaccion.DEPOSITO, amount, payer_id=user_account.id), # Or a new type like 'TRANSFER_FROM_USER'
             )
+        except InsufficientFunds:
+            return Response({'error': 'Insufficient funds.'}, status=status.HTTP_400_BAD_REQUEST)
+        except LedgerError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({'message': 'Transfer to admin successful.'}, status=status.HTTP_200_OK)
 
@@ -475,66 +469,51 @@ class LiquidateArtworkView(generics.GenericAPIView):
             artwork = Artwork.objects.get(pk=artwork_id)
             cuadro_token = CuadroToken.objects.get(artwork=artwork)
             artist = artwork.artist
-            admin_user = User.objects.filter(role='admin').first()
-            admin_account = CuentaComitente.objects.get(user=admin_user)
-        except (Artwork.DoesNotExist, CuadroToken.DoesNotExist, User.DoesNotExist, CuentaComitente.DoesNotExist) as e:
+        except (Artwork.DoesNotExist, CuadroToken.DoesNotExist) as e:
             return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        platform_accounts = get_platform_accounts()
+        if platform_accounts is None or platform_accounts.cuenta_id is None:
+            return Response({'error': 'Admin does not have a brokerage account.'}, status=status.HTTP_404_NOT_FOUND)
 
         token_value = total_amount / 100000
-        token_holders = TokenHolding.objects.filter(token=cuadro_token)
-        
-        total_payout = 0
+        token_holders = list(TokenHolding.objects.filter(token=cuadro_token))
+        holder_accounts = CuentaComitente.objects.in_bulk([holder.user_id for holder in token_holders], field_name='user_id')
+        if len(holder_accounts) < len({holder.user_id for holder in token_holders}):
+            return Response({'error': 'A token holder does not have a brokerage account.'}, status=status.HTTP_404_NOT_FOUND)
+
+        # The platform buys every holding back, keeping a 1% commission,
+        # and splits the value of the unsold tokens with the artist
+        legs = []
         for holder in token_holders:
-            total_payout += (holder.quantity * token_value) * Decimal('0.99')
-
-        if admin_account.balance < total_payout:
-            return Response({'error': 'Admin has insufficient funds to liquidate.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        with transaction.atomic():
-            # Logic to pay token holders
-            for holder in token_holders:
-                holder_account = CuentaComitente.objects.get(user=holder.user)
-                transfer_amount = (holder.quantity * token_value)
-                commission = transfer_amount * Decimal('0.01')
-                final_transfer_amount = transfer_amount - commission
-                
-                admin_account.balance -= final_transfer_amount
-                holder_account.balance += final_transfer_amount
-                
-                admin_account.save()
-                holder_account.save()
-
-                Transaccion.objects.create(
-                    cuenta=admin_account,
-                    tipo=Transaccion.TipoTransaccion.VENTA, # Or a new type
-                    monto_pesos=final_transfer_amount,
-                    estado=Transaccion.EstadoTransaccion.COMPLETADA
-                )
-                Transaccion.objects.create(
-                    cuenta=holder_account,
-                    tipo=Transaccion.TipoTransaccion.COMPRA, # Or a new type
-                    monto_pesos=final_transfer_amount,
-                    estado=Transaccion.EstadoTransaccion.COMPLETADA
-                )
-                holder.delete()
-
-            # Logic to distribute remaining value
-            remaining_tokens = cuadro_token.tokens_disponibles
-            if remaining_tokens > 0:
-                remaining_value = remaining_tokens * token_value
-                distribution_amount = remaining_value / 2
-                
+            transfer_amount = (holder.quantity * token_value)
+            commission = transfer_amount * Decimal('0.01')
+            final_transfer_amount = cents(transfer_amount - commission)
+            legs.append(Leg(platform_accounts.cuenta_id, Transaccion.TipoTransaccion.COMPRA, final_transfer_amount))
+            legs.append(Leg(holder_accounts[holder.user_id].id, Transaccion.TipoTransaccion.VENTA, final_transfer_amount))
+
+        remaining_tokens = cuadro_token.tokens_disponibles
+        if remaining_tokens > 0:
+            distribution_amount = cents(remaining_tokens * token_value / 2)
+            try:
                 artist_account = CuentaComitente.objects.get(user=artist)
-
-                admin_account.balance -= remaining_value
-                artist_account.balance += distribution_amount
-                admin_account.balance += distribution_amount
-
-                admin_account.save()
-                artist_account.save()
-
-            # Delete the token
-            cuadro_token.delete()
+            except CuentaComitente.DoesNotExist as e:
+                return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+            legs.append(Leg(platform_accounts.cuenta_id, Transaccion.TipoTransaccion.COMPRA, distribution_amount))
+            legs.append(Leg(artist_account.id, Transaccion.TipoTransaccion.VENTA, distribution_amount))
+
+        # Commissions reach the admin balance only when swept, so the
+        # pending ones are swept first to be available for the buy-back
+        sweep_platform_fees()
+        try:
+            with transaction.atomic():
+                post_transfer(*legs)
+                TokenHolding.objects.filter(pk__in=[holder.pk for holder in token_holders]).delete()
+                # Delete the token
+                cuadro_token.delete()
+        except InsufficientFunds:
+            return Response({'error': 'Admin has insufficient funds to liquidate.'}, status=status.HTTP_400_BAD_REQUEST)
+        except LedgerError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({'message': 'Artwork liquidated successfully.'}, status=status.HTTP_200_OK)
 
@@ -542,6 +521,7 @@ class WithdrawToCBUView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = CheckFundsSerializer
 
+    @idempotent
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -560,36 +540,89 @@ class WithdrawToCBUView(generics.GenericAPIView):
         except CuentaComitente.DoesNotExist:
             return Response({'error': 'User does not have a brokerage account.'}, status=status.HTTP_404_NOT_FOUND)
 
-        if user_account.balance < amount:
-            return Response({'error': 'Insufficient funds.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        with transaction.atomic():
-            user_account.balance -= amount
-            user_account.save()
-
-            Transaccion.objects.create(
-                cuenta=user_account,
-                tipo=Transaccion.TipoTransaccion.RETIRO,
-                monto_pesos=amount,
-                estado=Transaccion.EstadoTransaccion.COMPLETADA
+        try:
+            # The counterpart is the user's bank account
+            post_transfer(
+                Leg(user_account.id, Transaccion.TipoTransaccion.RETIRO, amount),
+                external(Transaccion.TipoTransaccion.DEPOSITO, amount),
             )
+        except InsufficientFunds:
+            return Response({'error': 'Insufficient funds.'}, status=status.HTTP_400_BAD_REQUEST)
+        except LedgerError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({'message': 'Withdrawal successful. The amount will be credited to your CBU.'}, status=status.HTTP_200_OK)
 
-class UserTransactionHistoryView(generics.ListAPIView):
+class UserTransactionHistoryView(KeysetPaginationMixin, generics.ListAPIView):
     serializer_class = TransaccionSerializer
     permission_classes = [IsAuthenticated]
+    keyset_ordering = ('-fecha', '-pk')
 
     def get_queryset(self):
-        user_id = self.kwargs.get('user_id')
+        # Filtering through the account's user avoids resolving the account first
+        queryset = Transaccion.objects.filter(cuenta__user_id=self.kwargs.get('user_id'))
+        return filter_transactions(queryset, self.request.query_params).order_by('-fecha', '-pk')
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if isinstance(response.data, dict):
+            response.data['totals'] = totals_by_type(self.filter_queryset(self.get_queryset()))
+        return response
+
+class AccountBalanceView(generics.GenericAPIView):
+    """
+    Balance of a user's account now or, with ?at=<ISO datetime>, at that moment.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, user_id):
+        if request.user.id != user_id and request.user.role != 'admin':
+            raise PermissionDenied('You can only see your own balance.')
         try:
             cuenta = CuentaComitente.objects.get(user_id=user_id)
-            return Transaccion.objects.filter(cuenta=cuenta).order_by('-fecha')
         except CuentaComitente.DoesNotExist:
-            return Transaccion.objects.none()
+            return Response({'error': 'User does not have a brokerage account.'}, status=status.HTTP_404_NOT_FOUND)
 
-class SellOrderListCreateView(generics.ListCreateAPIView):
+        raw_at = request.query_params.get('at')
+        if not raw_at:
+            return Response({'balance': cuenta.balance, 'at': timezone.now()})
+        try:
+            at = parse_datetime(raw_at)
+        except ValueError:
+            # Well-formed but impossible, e.g. 2026-02-30T10:00
+            at = None
+        if at is None:
+            return Response({'error': 'at must be an ISO 8601 datetime.'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(at):
+            at = timezone.make_aware(at)
+        return Response({'balance': balance_at(cuenta.id, at), 'at': at})
+
+class AccountExportView(generics.GenericAPIView):
+    """
+    Streams all of a user's transactions, holdings or donations as CSV or
+    NDJSON (?output=csv|ndjson), see finance.exports for the range params.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, user_id, dataset):
+        if request.user.id != user_id and request.user.role != 'admin':
+            raise PermissionDenied('You can only export your own account.')
+        output = request.query_params.get('output', 'csv')
+        if output not in FORMATS:
+            return Response({'error': f'output must be one of {", ".join(FORMATS)}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        columns, rows, until_id = export_rows(dataset, user_id, request.query_params)
+        stream, content_type = FORMATS[output]
+        response = StreamingHttpResponse(stream(columns, rows), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{dataset}-{user_id}.{output}"'
+        # Passed back as until_id when resuming, so the export covers the same rows
+        response['X-Export-Until-Id'] = str(until_id)
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+class SellOrderListCreateView(SparseFieldsetMixin, QueryPlanMixin, generics.ListCreateAPIView):
     serializer_class = SellOrderSerializer
+    select_related_fields = ('token', 'user')
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -609,8 +642,9 @@ class SellOrderListCreateView(generics.ListCreateAPIView):
 
         serializer.save(user=user)
 
-class SellOrderDetailView(generics.RetrieveUpdateAPIView):
+class SellOrderDetailView(SparseFieldsetMixin, QueryPlanMixin, generics.RetrieveUpdateAPIView):
     serializer_class = SellOrderSerializer
+    select_related_fields = ('token', 'user')
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -645,16 +679,18 @@ class SellOrderDetailView(generics.RetrieveUpdateAPIView):
         self.perform_update(serializer)
         return Response(serializer.data)
 
-class UserSellOrderListView(generics.ListAPIView):
+class UserSellOrderListView(SparseFieldsetMixin, QueryPlanMixin, generics.ListAPIView):
     serializer_class = SellOrderSerializer
+    select_related_fields = ('token', 'user')
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         user_id = self.kwargs.get('user_id')
         return SellOrder.objects.filter(user_id=user_id)
 
-class OpenSellOrderListView(generics.ListAPIView):
+class OpenSellOrderListView(SparseFieldsetMixin, QueryPlanMixin, generics.ListAPIView):
     serializer_class = SellOrderSerializer
+    select_related_fields = ('token', 'user')
     permission_classes = [IsAuthenticated]
     queryset = SellOrder.objects.filter(status='abierta')
 
@@ -662,6 +698,7 @@ class BuyFromSellOrderView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = BuyFromSellOrderSerializer
 
+    @idempotent
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -675,9 +712,6 @@ class BuyFromSellOrderView(generics.GenericAPIView):
         except SellOrder.DoesNotExist:
             return Response({'error': 'Sell order not found or not open.'}, status=status.HTTP_404_NOT_FOUND)
 
-        if sell_order.quantity < quantity_to_buy:
-            return Response({'error': 'Not enough tokens in the sell order.'}, status=status.HTTP_400_BAD_REQUEST)
-
         seller = sell_order.user
         if buyer == seller:
             return Response({'error': 'You cannot buy from your own sell order.'}, status=status.HTTP_400_BAD_REQUEST)
@@ -685,29 +719,33 @@ class BuyFromSellOrderView(generics.GenericAPIView):
         try:
             buyer_account = CuentaComitente.objects.get(user=buyer)
             seller_account = CuentaComitente.objects.get(user=seller)
-            admin_user = User.objects.filter(role='admin').first()
-            admin_account = CuentaComitente.objects.get(user=admin_user)
         except CuentaComitente.DoesNotExist:
-            return Response({'error': 'Brokerage account not found for buyer, seller, or admin.'}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({'error': 'Brokerage account not found for buyer or seller.'}, status=status.HTTP_400_BAD_REQUEST)
 
         total_price = sell_order.price * quantity_to_buy
-        buyer_commission = total_price * Decimal('0.02')
+        buyer_commission = cents(total_price * Decimal('0.02'))
         buyer_total_cost = total_price + buyer_commission
-        seller_commission = total_price * Decimal('0.01')
+        seller_commission = cents(total_price * Decimal('0.01'))
         seller_net_amount = total_price - seller_commission
 
-        if buyer_account.balance < buyer_total_cost:
-            return Response({'error': 'Insufficient funds.'}, status=status.HTTP_400_BAD_REQUEST)
-
         with transaction.atomic():
+            # The order row serializes trades against it
+            sell_order = SellOrder.objects.select_for_update().get(pk=sell_order.pk)
+            if sell_order.status != 'abierta':
+                return Response({'error': 'Sell order not found or not open.'}, status=status.HTTP_404_NOT_FOUND)
+            if sell_order.quantity < quantity_to_buy:
+                return Response({'error': 'Not enough tokens in the sell order.'}, status=status.HTTP_400_BAD_REQUEST)
+
             # Funds transfer
-            buyer_account.balance -= buyer_total_cost
-            seller_account.balance += seller_net_amount
-            admin_account.balance += buyer_commission + seller_commission
-            
-            buyer_account.save()
-            seller_account.save()
-            admin_account.save()
+            try:
+                post_transfer(
+                    Leg(buyer_account.id, Transaccion.TipoTransaccion.COMPRA, buyer_total_cost),
+                    Leg(seller_account.id, Transaccion.TipoTransaccion.VENTA, seller_net_amount),
+                    platform(Transaccion.TipoTransaccion.COMISION, buyer_commission, payer_id=buyer_account.id),
+                    platform(Transaccion.TipoTransaccion.COMISION, seller_commission, payer_id=seller_account.id),
+                )
+            except InsufficientFunds:
+                return Response({'error': 'Insufficient funds.'}, status=status.HTTP_400_BAD_REQUEST)
 
             # Token transfer
             seller_holding = TokenHolding.objects.get(user=seller, token=sell_order.token)
@@ -736,28 +774,20 @@ class BuyFromSellOrderView(generics.GenericAPIView):
                 sell_order.status = 'cerrada'
             sell_order.save()
 
-            # Transaction records
-            Transaccion.objects.create(cuenta=buyer_account, tipo=Transaccion.TipoTransaccion.COMPRA, monto_pesos=buyer_total_cost, estado=Transaccion.EstadoTransaccion.COMPLETADA)
-            Transaccion.objects.create(cuenta=seller_account, tipo=Transaccion.TipoTransaccion.VENTA, monto_pesos=seller_net_amount, estado=Transaccion.EstadoTransaccion.COMPLETADA)
+            # Secondary market volume on the artist's tokens
+            artwork_id, artist_id = Artwork.objects.filter(cuadro_token__id=sell_order.token_id).values_list('id', 'artist_id').first() or (None, None)
+            adjust_artist_stats(artist_id, secondary_revenue=total_price)
+            record_artwork_event(artwork_id, 'sale')
 
         return Response({'message': 'Purchase successful.'}, status=status.HTTP_200_OK)
 
-class UserDonationHistoryView(generics.ListAPIView):
+class UserDonationHistoryView(QueryPlanMixin, generics.ListAPIView):
     serializer_class = DonationTransactionSerializer # Changed serializer
+    select_related_fields = ('recipient_artist', 'artwork__artist')
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user_id = self.kwargs.get('user_id')
-        print(f"[DEBUG] UserDonationHistoryView: Received user_id: {user_id}")
-        try:
-            cuenta = CuentaComitente.objects.get(user_id=user_id)
-            queryset = Transaccion.objects.filter(
-                cuenta=cuenta,
-                tipo__in=[Transaccion.TipoTransaccion.DONACION_ENVIADA, Transaccion.TipoTransaccion.DONACION_RECIBIDA]
-            ).order_by('-fecha')
-            print(f"[DEBUG] UserDonationHistoryView: Queryset SQL: {queryset.query}")
-            print(f"[DEBUG] UserDonationHistoryView: Queryset results count: {queryset.count()}")
-            return queryset
-        except CuentaComitente.DoesNotExist:
-            print(f"[DEBUG] UserDonationHistoryView: CuentaComitente not found for user_id: {user_id}")
-            return Transaccion.objects.none()
+        return Transaccion.objects.filter(
+            cuenta__user_id=self.kwargs.get('user_id'),
+            tipo__in=[Transaccion.TipoTransaccion.DONACION_ENVIADA, Transaccion.TipoTransaccion.DONACION_RECIBIDA]
+        ).order_by('-fecha', '-pk')
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FondiartApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fondiart_api'
+
+    def ready(self):
+        import fondiart_api.signals
@@ -0,0 +1,170 @@
+from decimal import Decimal
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.utils import timezone
+
+from .models import ArtistStats, Artwork, Favorite, Project
+
+# Counters that can't be derived from the history and survive a recompute
+_NON_DERIVABLE = ('secondary_revenue',)
+
+
+def _catalog_counts(artist_id):
+    """
+    Artwork, favorite and project counters, i.e. everything the catalog
+    write paths touch.
+    """
+    counts = Artwork.objects.filter(artist_id=artist_id).aggregate(
+        artworks_pending=Count('pk', filter=Q(status='pending')),
+        artworks_approved=Count('pk', filter=Q(status='approved')),
+        artworks_rejected=Count('pk', filter=Q(status='rejected')),
+        artworks_sold=Count('pk', filter=Q(estado_venta='vendida')),
+    )
+    projects = Project.objects.filter(artist_id=artist_id).aggregate(
+        count=Count('pk'),
+        funded=Count('pk', filter=Q(amount_raised__gte=F('funding_goal'))),
+        raised=Sum('amount_raised'),
+    )
+    counts.update(
+        projects_count=projects['count'],
+        projects_funded=projects['funded'],
+        projects_raised=projects['raised'] or Decimal('0'),
+        favorites_count=Favorite.objects.filter(artwork__artist_id=artist_id).count(),
+    )
+    return counts
+
+
+def compute_artist_stats(artist_id):
+    """
+    Totals for one artist computed from the source tables. Only used to
+    create or rebuild a stats row; requests read the stored row.
+    """
+    from finance.models import Transaccion
+
+    values = _catalog_counts(artist_id)
+    purchases = Transaccion.objects.filter(
+        tipo=Transaccion.TipoTransaccion.COMPRA, artwork__artist_id=artist_id,
+    ).aggregate(
+        tokens=Sum('cantidad_tokens'),
+        revenue=Sum(F('cantidad_tokens') * F('artwork__fractionFrom'), output_field=DecimalField(max_digits=30, decimal_places=2)),
+    )
+    donations = Transaccion.objects.filter(
+        tipo=Transaccion.TipoTransaccion.DONACION_RECIBIDA, recipient_artist_id=artist_id,
+    ).aggregate(amount=Sum('monto_pesos'), count=Count('pk'))
+    values.update(
+        tokens_sold=int(purchases['tokens'] or 0),
+        primary_revenue=purchases['revenue'] or Decimal('0'),
+        donations_received=donations['amount'] or Decimal('0'),
+        donations_count=donations['count'],
+    )
+    return values
+
+
+def recompute_artist_stats(artist_id):
+    values = compute_artist_stats(artist_id)
+    stats, created = ArtistStats.objects.get_or_create(artist_id=artist_id, defaults=values)
+    if not created:
+        for field, value in values.items():
+            if field not in _NON_DERIVABLE:
+                setattr(stats, field, value)
+        stats.save()
+    return stats
+
+
+def get_artist_stats(artist_id):
+    try:
+        return ArtistStats.objects.get(artist_id=artist_id)
+    except ArtistStats.DoesNotExist:
+        return recompute_artist_stats(artist_id)
+
+
+def adjust_artist_stats(artist_id, **deltas):
+    """
+    Adds the given deltas to an artist's counters with a single UPDATE ... SET
+    x = x + delta, so concurrent writers don't overwrite each other. Call it
+    after the write it accounts for: a missing row is computed from the
+    source tables, which already include that write.
+    """
+    if not artist_id:
+        return
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if not changes:
+        return
+    if not ArtistStats.objects.filter(artist_id=artist_id).update(updated_at=timezone.now(), **changes):
+        recompute_artist_stats(artist_id)
+        # The history doesn't hold these, so they still need the delta
+        kept = {field: change for field, change in changes.items() if field in _NON_DERIVABLE}
+        if kept:
+            ArtistStats.objects.filter(artist_id=artist_id).update(**kept)
+
+
+# Fields of each catalog model its artist's counters depend on
+_COUNTED_FIELDS = {
+    Artwork: ('artist', 'status', 'estado_venta'),
+    Project: ('artist', 'amount_raised', 'funding_goal'),
+}
+
+
+def catalog_counters(instance):
+    """
+    (artist_id, counters) that one Artwork or Project row contributes to
+    its artist's stats.
+    """
+    if isinstance(instance, Artwork):
+        return instance.artist_id, {
+            'artworks_pending': int(instance.status == 'pending'),
+            'artworks_approved': int(instance.status == 'approved'),
+            'artworks_rejected': int(instance.status == 'rejected'),
+            'artworks_sold': int(instance.estado_venta == 'vendida'),
+        }
+    return instance.artist_id, {
+        'projects_count': 1,
+        'projects_funded': int(instance.amount_raised >= instance.funding_goal),
+        'projects_raised': instance.amount_raised,
+    }
+
+
+def stored_catalog_counters(instance, update_fields=None):
+    """
+    Counters of the row as stored, read before a save overwrites it. A save
+    limited to fields the counters don't depend on can't change them, so
+    it costs no query.
+    """
+    fields = _COUNTED_FIELDS[type(instance)]
+    if instance._state.adding:
+        return None
+    if update_fields is not None and not {name.removesuffix('_id') for name in update_fields} & set(fields):
+        return catalog_counters(instance)
+    stored = type(instance)._base_manager.filter(pk=instance.pk).only(*fields).first()
+    return catalog_counters(stored) if stored is not None else None
+
+
+def adjust_catalog_counters(before=None, after=None):
+    """
+    Applies the difference between two (artist_id, counters) pairs, either
+    of them None for a created or deleted row, as F() increments. Called by
+    the model signals; only existing rows are touched, since these also
+    fire while an artist is being deleted. Missing rows are built on first
+    read, from source tables that already include the write.
+    """
+    deltas = {}
+    for sign, side in ((-1, before), (1, after)):
+        if side is None:
+            continue
+        artist_id, counters = side
+        changes = deltas.setdefault(artist_id, {})
+        for field, value in counters.items():
+            changes[field] = changes.get(field, 0) + sign * value
+    for artist_id, changes in deltas.items():
+        changes = {field: F(field) + delta for field, delta in changes.items() if delta}
+        if artist_id and changes:
+            ArtistStats.objects.filter(artist_id=artist_id).update(updated_at=timezone.now(), **changes)
+
+
+def rebuild_artist_stats():
+    from .models import User
+
+    total = 0
+    for artist_id in User.objects.filter(role='artist').values_list('id', flat=True).iterator():
+        recompute_artist_stats(artist_id)
+        total += 1
+    return total
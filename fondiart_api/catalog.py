@@ -0,0 +1,138 @@
+from django.db.models import Min, Count, Case, When, Value, CharField
+
+from .models import Artwork, ArtworkCatalogEntry
+
+
+# Upper bounds (in pesos) of the price buckets reported by catalog_facets
+PRICE_BUCKET_BOUNDS = (10000, 50000, 100000, 500000)
+NO_PRICE_BUCKET = 'sin-precio'
+
+
+def _price_bucket_expression():
+    whens = [When(price__isnull=True, then=Value(NO_PRICE_BUCKET))]
+    lower = 0
+    for upper in PRICE_BUCKET_BOUNDS:
+        whens.append(When(price__lt=upper, then=Value(f'{lower}-{upper}')))
+        lower = upper
+    return Case(*whens, default=Value(f'{lower}+'), output_field=CharField())
+
+
+def price_bucket_labels():
+    labels, lower = [], 0
+    for upper in PRICE_BUCKET_BOUNDS:
+        labels.append(f'{lower}-{upper}')
+        lower = upper
+    return labels + [f'{lower}+', NO_PRICE_BUCKET]
+
+
+def catalog_facets(queryset):
+    """
+    Counts of a catalog queryset by estado_venta, venta_directa, status,
+    price bucket and soporte, from a single grouped query.
+    """
+    facets = {
+        'estado_venta': {value: 0 for value, _ in Artwork.SALE_STATUS_CHOICES},
+        'venta_directa': {'true': 0, 'false': 0},
+        'status': {value: 0 for value, _ in Artwork.STATUS_CHOICES},
+        'price': {label: 0 for label in price_bucket_labels()},
+        'soporte': {},
+    }
+    rows = (
+        queryset.order_by()
+        .annotate(price_bucket=_price_bucket_expression())
+        .values('estado_venta', 'venta_directa', 'status', 'price_bucket', 'soporte')
+        .annotate(count=Count('pk'))
+    )
+    total = 0
+    for row in rows:
+        count = row['count']
+        total += count
+        facets['estado_venta'][row['estado_venta']] = facets['estado_venta'].get(row['estado_venta'], 0) + count
+        facets['venta_directa']['true' if row['venta_directa'] else 'false'] += count
+        facets['status'][row['status']] = facets['status'].get(row['status'], 0) + count
+        facets['price'][row['price_bucket']] += count
+        soporte = (row['soporte'] or '').strip()
+        if soporte:
+            facets['soporte'][soporte] = facets['soporte'].get(soporte, 0) + count
+    facets['total'] = total
+    return facets
+
+
+def _best_asks(artwork_ids):
+    from finance.models import SellOrder
+
+    rows = SellOrder.objects.filter(
+        token__artwork_id__in=artwork_ids,
+        status='abierta',
+        quantity__gt=0,
+    ).values('token__artwork_id').annotate(best_ask=Min('price'))
+    return {row['token__artwork_id']: row['best_ask'] for row in rows}
+
+
+def _entry_values(artwork, best_ask):
+    token = getattr(artwork, 'cuadro_token', None)
+    return {
+        'title': artwork.title,
+        'artist_id': artwork.artist_id,
+        'artist_name': artwork.artist.name,
+        'status': artwork.status,
+        'estado_venta': artwork.estado_venta,
+        'venta_directa': artwork.venta_directa,
+        'price': artwork.price,
+        'fractionFrom': artwork.fractionFrom,
+        'fractionsTotal': artwork.fractionsTotal,
+        'fractionsLeft': artwork.fractionsLeft,
+        'tags': artwork.tags,
+        'image': artwork.image.name if artwork.image else None,
+        'medidas': artwork.medidas,
+        'soporte': artwork.soporte,
+        'rating_avg': artwork.rating_avg,
+        'rating_count': artwork.rating_count,
+        'createdAt': artwork.createdAt,
+        'tokens_disponibles': token.tokens_disponibles if token else None,
+        'best_ask': best_ask,
+    }
+
+
+def refresh_catalog_entries(artwork_ids):
+    """
+    Rebuilds the catalog rows for the given artworks from the source tables.
+    Artworks that no longer exist are dropped from the catalog.
+    """
+    artwork_ids = list(set(artwork_ids))
+    if not artwork_ids:
+        return
+
+    artworks = Artwork.objects.filter(id__in=artwork_ids).select_related('artist', 'cuadro_token')
+    best_asks = _best_asks(artwork_ids)
+
+    found = set()
+    for artwork in artworks:
+        found.add(artwork.id)
+        ArtworkCatalogEntry.objects.update_or_create(
+            artwork_id=artwork.id,
+            defaults=_entry_values(artwork, best_asks.get(artwork.id)),
+        )
+
+    missing = set(artwork_ids) - found
+    if missing:
+        ArtworkCatalogEntry.objects.filter(artwork_id__in=missing).delete()
+
+
+def refresh_catalog_entry(artwork_id):
+    refresh_catalog_entries([artwork_id])
+
+
+def refresh_artist_name(artist_id, name):
+    return ArtworkCatalogEntry.objects.filter(artist_id=artist_id).exclude(artist_name=name).update(artist_name=name)
+
+
+def rebuild_catalog(batch_size=500):
+    """
+    Rebuilds the whole catalog. Used by the rebuild_artwork_catalog command.
+    """
+    ids = list(Artwork.objects.values_list('id', flat=True).order_by('id'))
+    for start in range(0, len(ids), batch_size):
+        refresh_catalog_entries(ids[start:start + batch_size])
+    ArtworkCatalogEntry.objects.exclude(artwork_id__in=Artwork.objects.values('id')).delete()
+    return len(ids)
@@ -0,0 +1,79 @@
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+# Sections cached per artwork; every one of them is dropped by invalidate_artwork()
+DETAIL = 'detail'
+RATING = 'rating'
+CONTRACT_ADDRESS = 'contract_address'
+AUCTION_ID = 'auction_id'
+
+
+def _cache():
+    return caches[getattr(settings, 'ARTWORK_DETAIL_CACHE_ALIAS', 'default')]
+
+
+def _ttl():
+    return getattr(settings, 'ARTWORK_DETAIL_CACHE_TTL', 300)
+
+
+def _generation_key(artwork_id):
+    return f'artwork-detail:{artwork_id}:gen'
+
+
+def _new_generation(cache, key):
+    # A generation can be evicted while sections keyed by it survive, so it
+    # is never reseeded with a value used before
+    seed = time.time_ns()
+    cache.add(key, seed, timeout=None)
+    return cache.get(key, seed)
+
+
+def _generation(cache, artwork_id):
+    key = _generation_key(artwork_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = _new_generation(cache, key)
+    return generation
+
+
+def _section_key(artwork_id, generation, section, variant=''):
+    return f'artwork-detail:{artwork_id}:{generation}:{section}:{variant}'
+
+
+def get_artwork_section(artwork_id, section, build, variant=''):
+    """
+    Cached value of one section of an artwork page, computed with build()
+    on a miss. build() may return None (e.g. no auction); that is cached too.
+
+    Entries are keyed by a per-artwork generation, so a payload built from
+    stale rows while an invalidation runs is written under a dead key.
+    """
+    cache = _cache()
+    key = _section_key(artwork_id, _generation(cache, artwork_id), section, variant)
+    entry = cache.get(key)
+    if entry is None:
+        entry = {'value': build()}
+        cache.set(key, entry, _ttl())
+    return entry['value']
+
+
+def set_artwork_section(artwork_id, section, value, variant=''):
+    cache = _cache()
+    cache.set(_section_key(artwork_id, _generation(cache, artwork_id), section, variant), {'value': value}, _ttl())
+
+
+def invalidate_artwork(*artwork_ids):
+    cache = _cache()
+    for artwork_id in artwork_ids:
+        key = _generation_key(artwork_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # No generation, either nothing was cached or it was evicted
+            _new_generation(cache, key)
+
+
+def detail_variant(request):
+    # Image URLs in the detail payload are absolute, so they depend on the host
+    return request.get_host() if request is not None else ''
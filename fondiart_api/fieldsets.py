@@ -0,0 +1,131 @@
+import re
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+_DISPLAY_RE = re.compile(r'get_(\w+)_display')
+
+
+def _split(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+def requested_fieldset(request):
+    """
+    The (fields, exclude) sets asked for with ?fields=a,b / ?exclude=c on a
+    read request, or None when the full representation is wanted.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    params = request.query_params
+    fields, exclude = _split(params.get(FIELDS_PARAM)), _split(params.get(EXCLUDE_PARAM))
+    if not fields and not exclude:
+        return None
+    return fields, exclude
+
+
+def model_path(model, attrs):
+    """
+    The ORM path (e.g. 'artwork__artist__name') a serializer source such as
+    ['artwork', 'artist', 'name'] reads, or None if it is not a plain column.
+    """
+    parts = []
+    for attr in attrs:
+        match = _DISPLAY_RE.fullmatch(attr)
+        if match:
+            attr = match.group(1)
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete:
+            return None
+        parts.append(field.name)
+        if not field.is_relation:
+            break
+        model = field.related_model
+    return '__'.join(parts) or None
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Drops the fields not asked for with ?fields= / ?exclude= from the
+    top-level representation, and reports which model columns the
+    remaining fields read (get_projection) so the view can .only() them.
+
+    Fields whose source can't be derived (method fields, source='*')
+    declare the columns they read in fieldset_sources.
+    """
+    fieldset_sources = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = requested_fieldset(self.context.get('request'))
+        if fieldset is None or not self._is_top_level():
+            return fields
+        only, exclude = fieldset
+        return {
+            name: field for name, field in fields.items()
+            if (not only or name in only) and name not in exclude
+        }
+
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def get_projection(self):
+        model = self.Meta.model
+        paths = set()
+        for name, field in self.fields.items():
+            if name in self.fieldset_sources:
+                paths.update(self.fieldset_sources[name])
+                continue
+            path = model_path(model, field.source_attrs)
+            if path is None:
+                # Can't tell what this field reads, load the whole row
+                return None
+            paths.add(path)
+        return sorted(paths)
+
+
+class SparseFieldsetMixin:
+    """
+    View side of SparseFieldsetSerializerMixin: when a fieldset is requested
+    the queryset only loads the columns (and joins only the relations) the
+    remaining fields read, plus whatever the ordering needs.
+    """
+    def get_sparse_projection(self):
+        if not hasattr(self, '_sparse_projection'):
+            self._sparse_projection = None
+            if requested_fieldset(self.request) is not None:
+                serializer = self.get_serializer()
+                if hasattr(serializer, 'get_projection'):
+                    self._sparse_projection = serializer.get_projection()
+        return self._sparse_projection
+
+    def get_projection_ordering(self, queryset):
+        names = [name for name in queryset.query.order_by if isinstance(name, str)]
+        if getattr(self, 'uses_keyset_pagination', None) and self.uses_keyset_pagination():
+            names += list(self.get_keyset_ordering())
+        paths = set()
+        for name in names:
+            path = model_path(queryset.model, name.lstrip('-').split('__'))
+            if path:
+                paths.add(path)
+        return paths
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        projection = self.get_sparse_projection()
+        if not projection:
+            return queryset
+        columns = set(projection) | self.get_projection_ordering(queryset)
+        relations = {path.rsplit('__', 1)[0] for path in columns if '__' in path}
+        # Joins for relations that were projected away would conflict with .only()
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*sorted(relations))
+        return queryset.only(*sorted(columns))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from fondiart_api.artist_stats import rebuild_artist_stats
+
+class Command(BaseCommand):
+    help = 'Recomputes the per-artist stats rows behind artists/<id>/summary/ from the source tables.'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding artist stats...')
+        total = rebuild_artist_stats()
+        self.stdout.write(self.style.SUCCESS(f'Artist stats rebuilt for {total} artists.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from fondiart_api.catalog import rebuild_catalog
+
+class Command(BaseCommand):
+    help = 'Rebuilds the denormalized artwork catalog used by the public listings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of artworks refreshed per batch.')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding artwork catalog...')
+        total = rebuild_catalog(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Artwork catalog rebuilt for {total} artworks.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from fondiart_api.search import get_search_backend
+
+class Command(BaseCommand):
+    help = 'Re-indexes every artwork in the configured full-text search backend.'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        self.stdout.write(f'Rebuilding search index with {type(backend).__name__}...')
+        total = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} artworks.'))
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def populate_catalog(apps, schema_editor):
+    Artwork = apps.get_model('fondiart_api', 'Artwork')
+    ArtworkCatalogEntry = apps.get_model('fondiart_api', 'ArtworkCatalogEntry')
+    CuadroToken = apps.get_model('blockchain', 'CuadroToken')
+    SellOrder = apps.get_model('finance', 'SellOrder')
+
+    tokens = {t.artwork_id: t.tokens_disponibles for t in CuadroToken.objects.all()}
+    best_asks = {
+        row['token__artwork_id']: row['best_ask']
+        for row in SellOrder.objects.filter(status='abierta', quantity__gt=0)
+        .values('token__artwork_id').annotate(best_ask=Min('price'))
+    }
+
+    entries = [
+        ArtworkCatalogEntry(
+            artwork_id=artwork.id,
+            title=artwork.title,
+            artist_id=artwork.artist_id,
+            artist_name=artwork.artist.name,
+            status=artwork.status,
+            estado_venta=artwork.estado_venta,
+            venta_directa=artwork.venta_directa,
+            price=artwork.price,
+            fractionFrom=artwork.fractionFrom,
+            fractionsTotal=artwork.fractionsTotal,
+            fractionsLeft=artwork.fractionsLeft,
+            tags=artwork.tags,
+            image=artwork.image.name if artwork.image else None,
+            medidas=artwork.medidas,
+            soporte=artwork.soporte,
+            rating_avg=artwork.rating_avg,
+            rating_count=artwork.rating_count,
+            createdAt=artwork.createdAt,
+            tokens_disponibles=tokens.get(artwork.id),
+            best_ask=best_asks.get(artwork.id),
+        )
+        for artwork in Artwork.objects.select_related('artist').iterator()
+    ]
+    ArtworkCatalogEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fondiart_api', '0019_artwork_medidas_artwork_soporte'),
+        ('blockchain', '0004_alter_cuadrotoken_tokens_disponibles_and_more'),
+        ('finance', '0009_transaccion_recipient_artist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtworkCatalogEntry',
+            fields=[
+                ('artwork', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog_entry', serialize=False, to='fondiart_api.artwork')),
+                ('title', models.CharField(max_length=255)),
+                ('artist_id', models.BigIntegerField(db_index=True)),
+                ('artist_name', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='pending', max_length=10)),
+                ('estado_venta', models.CharField(choices=[('publicada', 'Publicada'), ('vendida', 'Vendida'), ('suspendida', 'Suspendida')], default='publicada', max_length=10)),
+                ('venta_directa', models.BooleanField(default=False)),
+                ('price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('fractionFrom', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('fractionsTotal', models.IntegerField(blank=True, null=True)),
+                ('fractionsLeft', models.IntegerField(blank=True, null=True)),
+                ('tags', models.JSONField(default=list)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='artworks/')),
+                ('medidas', models.CharField(blank=True, max_length=255, null=True)),
+                ('soporte', models.CharField(blank=True, max_length=255, null=True)),
+                ('rating_avg', models.FloatField(default=0.0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('createdAt', models.DateTimeField()),
+                ('tokens_disponibles', models.PositiveIntegerField(blank=True, null=True)),
+                ('best_ask', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['venta_directa', 'createdAt'], name='catalog_directa_created_idx'), models.Index(fields=['createdAt'], name='catalog_created_idx'), models.Index(fields=['price'], name='catalog_price_idx'), models.Index(fields=['rating_avg'], name='catalog_rating_idx')],
+            },
+        ),
+        migrations.RunPython(populate_catalog, migrations.RunPython.noop),
+    ]
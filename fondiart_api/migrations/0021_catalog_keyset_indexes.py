@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fondiart_api', '0020_artworkcatalogentry'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='artworkcatalogentry',
+            name='catalog_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='artworkcatalogentry',
+            name='catalog_price_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='artworkcatalogentry',
+            name='catalog_rating_idx',
+        ),
+        migrations.AddIndex(
+            model_name='artworkcatalogentry',
+            index=models.Index(fields=['createdAt', 'artwork'], name='catalog_created_pk_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artworkcatalogentry',
+            index=models.Index(fields=['price', 'artwork'], name='catalog_price_pk_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artworkcatalogentry',
+            index=models.Index(fields=['rating_avg', 'artwork'], name='catalog_rating_pk_idx'),
+        ),
+    ]
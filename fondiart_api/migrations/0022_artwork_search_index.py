@@ -0,0 +1,66 @@
+from django.db import migrations
+
+SEARCH_TABLE = 'fondiart_api_artwork_search'
+
+
+def document(artwork):
+    tags = artwork.tags if isinstance(artwork.tags, list) else []
+    return [
+        artwork.title or '',
+        artwork.description or '',
+        artwork.artist.name or '',
+        ' '.join(str(tag) for tag in tags),
+        artwork.medidas or '',
+        artwork.soporte or '',
+    ]
+
+
+def create_search_index(apps, schema_editor):
+    Artwork = apps.get_model('fondiart_api', 'Artwork')
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+                'title, description, artist_name, tags, medidas, soporte, '
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+            for artwork in Artwork.objects.select_related('artist').iterator():
+                cursor.execute(
+                    f'INSERT INTO {SEARCH_TABLE} (rowid, title, description, artist_name, tags, medidas, soporte) '
+                    'VALUES (%s, %s, %s, %s, %s, %s, %s)',
+                    [artwork.pk] + document(artwork),
+                )
+        elif vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+                'artwork_id bigint PRIMARY KEY REFERENCES fondiart_api_artwork (id) ON DELETE CASCADE, '
+                'document tsvector NOT NULL)'
+            )
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_gin ON {SEARCH_TABLE} USING GIN (document)')
+            for artwork in Artwork.objects.select_related('artist').iterator():
+                title, description, artist_name, tags, medidas, soporte = document(artwork)
+                cursor.execute(
+                    f'INSERT INTO {SEARCH_TABLE} (artwork_id, document) VALUES (%s, '
+                    "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'A') || "
+                    "setweight(to_tsvector('simple', %s), 'B') || setweight(to_tsvector('simple', %s), 'C') || "
+                    "setweight(to_tsvector('simple', %s), 'D'))",
+                    [artwork.pk, title, artist_name, tags, f'{medidas} {soporte}', description],
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fondiart_api', '0021_catalog_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
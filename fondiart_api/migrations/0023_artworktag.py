@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_tag_index(apps, schema_editor):
+    Artwork = apps.get_model('fondiart_api', 'Artwork')
+    ArtworkTag = apps.get_model('fondiart_api', 'ArtworkTag')
+    rows = []
+    for artwork_id, tags in Artwork.objects.values_list('id', 'tags').iterator():
+        if not isinstance(tags, list):
+            continue
+        for tag in {str(t).strip().lower()[:100] for t in tags if str(t).strip()}:
+            rows.append(ArtworkTag(artwork_id=artwork_id, tag=tag))
+    ArtworkTag.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fondiart_api', '0022_artwork_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtworkTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(max_length=100)),
+                ('artwork', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_index', to='fondiart_api.artwork')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', 'artwork'], name='artworktag_tag_artwork_idx')],
+                'unique_together': {('artwork', 'tag')},
+            },
+        ),
+        migrations.RunPython(populate_tag_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fondiart_api', '0024_resourceversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtistStats',
+            fields=[
+                ('artist', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('artworks_pending', models.PositiveIntegerField(default=0)),
+                ('artworks_approved', models.PositiveIntegerField(default=0)),
+                ('artworks_rejected', models.PositiveIntegerField(default=0)),
+                ('artworks_sold', models.PositiveIntegerField(default=0)),
+                ('tokens_sold', models.PositiveBigIntegerField(default=0)),
+                ('primary_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('secondary_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('donations_received', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('donations_count', models.PositiveIntegerField(default=0)),
+                ('projects_count', models.PositiveIntegerField(default=0)),
+                ('projects_funded', models.PositiveIntegerField(default=0)),
+                ('projects_raised', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('favorites_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fondiart_api', '0025_artiststats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='donors_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fondiart_api', '0026_project_donors_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artworkcatalogentry',
+            name='trending_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='trending_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='artworkcatalogentry',
+            index=models.Index(fields=['trending_score', 'artwork'], name='catalog_trending_pk_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['trending_score', 'id'], name='project_trending_pk_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+INDEX = 'catalog_price_desc_pk_idx'
+
+
+def create_index(apps, schema_editor):
+    # catalog_price_pk_idx read backwards gives DESC NULLS FIRST on Postgres,
+    # so the price-desc listing (NULLs last) needs its own ordering. SQLite
+    # sorts NULLs first in an index, so it serves DESC NULLS LAST backwards.
+    if schema_editor.connection.vendor == 'postgresql':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {INDEX} ON fondiart_api_artworkcatalogentry '
+                '(price DESC NULLS LAST, artwork_id DESC)'
+            )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'DROP INDEX IF EXISTS {INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fondiart_api', '0027_trending_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
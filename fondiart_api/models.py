@@ -56,6 +56,15 @@ class Project(models.Model):
     publication_date = models.DateTimeField(auto_now_add=True)
     amount_raised = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     funds_disbursed = models.BooleanField(default=False)
+    # Distinct contributors, maintained with finance.ProjectContributor
+    donors_count = models.PositiveIntegerField(default=0)
+    # Time-decayed activity in log space, maintained by fondiart_api.trending
+    trending_score = models.FloatField(default=0.0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['trending_score', 'id'], name='project_trending_pk_idx'),
+        ]
 
     def __str__(self):
         return f"'{self.title}' by {self.artist.name}"
@@ -198,4 +207,90 @@ class ArtistPerformance(models.Model):
         unique_together = ('artist', 'date')
 
     def __str__(self):
-        return f"Performance for {self.artist.name} on {self.date}"
\ No newline at end of file
+        return f"Performance for {self.artist.name} on {self.date}"
+
+# Materialized per-artist totals behind artists/<id>/summary/, kept up to date
+# incrementally by the catalog and finance write paths (see fondiart_api.artist_stats)
+class ArtistStats(models.Model):
+    artist = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    artworks_pending = models.PositiveIntegerField(default=0)
+    artworks_approved = models.PositiveIntegerField(default=0)
+    artworks_rejected = models.PositiveIntegerField(default=0)
+    artworks_sold = models.PositiveIntegerField(default=0)
+    tokens_sold = models.PositiveBigIntegerField(default=0)
+    primary_revenue = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    secondary_revenue = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    donations_received = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    donations_count = models.PositiveIntegerField(default=0)
+    projects_count = models.PositiveIntegerField(default=0)
+    projects_funded = models.PositiveIntegerField(default=0)
+    projects_raised = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    favorites_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.artist.name}"
+
+# Inverted index of Artwork.tags, kept in sync by the artwork serializers
+class ArtworkTag(models.Model):
+    artwork = models.ForeignKey(Artwork, on_delete=models.CASCADE, related_name='tag_index')
+    tag = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ('artwork', 'tag')
+        indexes = [
+            models.Index(fields=['tag', 'artwork'], name='artworktag_tag_artwork_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tag} on {self.artwork_id}"
+
+# Denormalized read model for the public catalog. Kept in sync by
+# fondiart_api.catalog from the Artwork, User, CuadroToken and SellOrder signals.
+class ArtworkCatalogEntry(models.Model):
+    artwork = models.OneToOneField(Artwork, on_delete=models.CASCADE, primary_key=True, related_name='catalog_entry')
+    title = models.CharField(max_length=255)
+    artist_id = models.BigIntegerField(db_index=True)
+    artist_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=Artwork.STATUS_CHOICES, default='pending')
+    estado_venta = models.CharField(max_length=10, choices=Artwork.SALE_STATUS_CHOICES, default='publicada')
+    venta_directa = models.BooleanField(default=False)
+    price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    fractionFrom = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    fractionsTotal = models.IntegerField(null=True, blank=True)
+    fractionsLeft = models.IntegerField(null=True, blank=True)
+    tags = models.JSONField(default=list)
+    image = models.ImageField(upload_to='artworks/', blank=True, null=True)
+    medidas = models.CharField(max_length=255, blank=True, null=True)
+    soporte = models.CharField(max_length=255, blank=True, null=True)
+    rating_avg = models.FloatField(default=0.0)
+    rating_count = models.IntegerField(default=0)
+    createdAt = models.DateTimeField()
+    # Token availability and best open ask on the secondary market
+    tokens_disponibles = models.PositiveIntegerField(null=True, blank=True)
+    best_ask = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # Only written by fondiart_api.trending, never by a catalog refresh
+    trending_score = models.FloatField(default=0.0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['venta_directa', 'createdAt'], name='catalog_directa_created_idx'),
+            # Composite with the pk so keyset pagination seeks instead of sorting
+            models.Index(fields=['createdAt', 'artwork'], name='catalog_created_pk_idx'),
+            models.Index(fields=['price', 'artwork'], name='catalog_price_pk_idx'),
+            models.Index(fields=['rating_avg', 'artwork'], name='catalog_rating_pk_idx'),
+            models.Index(fields=['trending_score', 'artwork'], name='catalog_trending_pk_idx'),
+        ]
+
+    def __str__(self):
+        return f"Catalog entry for {self.title}"
+
+# Version stamp per public resource, bumped by the signals in fondiart_api.signals
+# and used to answer conditional GETs (see fondiart_api.conditional)
+class ResourceVersion(models.Model):
+    resource = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.resource} v{self.version}"
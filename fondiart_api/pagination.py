@@ -0,0 +1,213 @@
+import base64
+import json
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _model_field(model, name):
+    try:
+        return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+    except FieldDoesNotExist:
+        # Annotations (e.g. a computed rank)
+        return None
+
+
+def _nullable(model, name):
+    field = _model_field(model, name.lstrip('-'))
+    return field is not None and field.null
+
+
+def nulls_last_ordering(model, ordering):
+    """
+    order_by() expressions for field names like ('-price', 'pk') that sort
+    NULLs last in either direction, as keyset pagination expects. Only
+    nullable fields get the modifier, so the others still match a plain
+    index.
+    """
+    expressions = []
+    for name in ordering:
+        if not _nullable(model, name):
+            expressions.append(name)
+        elif name.startswith('-'):
+            expressions.append(F(name[1:]).desc(nulls_last=True))
+        else:
+            expressions.append(F(name).asc(nulls_last=True))
+    return expressions
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor (keyset) pagination over an arbitrary ordering.
+
+    The view provides the ordering through get_keyset_ordering(), e.g.
+    ('-price', '-pk'). The last field must be unique so every row has a
+    stable position. The cursor is an opaque token holding the values of
+    the last row of the page, and the next page is fetched with a
+    WHERE a >= x AND (a > x OR (a = x AND b > y)) filter, whose leading
+    range lets the database seek into an index on the ordering, so page N
+    costs the same as page 1.
+
+    NULLs always sort last, whatever the direction. When the leading field
+    is nullable, its NULL block is read by a second query (a IS NULL,
+    ordered by the remaining fields), so neither query needs a NULLS LAST
+    sort or an OR across the NULL block.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(view.get_keyset_ordering())
+        self.model = queryset.model
+
+        position = self.decode_cursor(request)
+        if _nullable(self.model, self.ordering[0]):
+            rows = self._split_at_nulls(queryset, position)
+        else:
+            queryset = queryset.order_by(*nulls_last_ordering(self.model, self.ordering))
+            if position is not None:
+                queryset = queryset.filter(self._after(self.ordering, position))
+            rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [self._dump(getattr(last, name)) for name in self._field_names()]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position))
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+            return [self._load(name, value) for name, value in zip(self._field_names(), position)]
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _field_names(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def _split_at_nulls(self, queryset, position):
+        # The rows with a value for the leading field, then its NULL block
+        field, rest = self.ordering[0].lstrip('-'), self.ordering[1:]
+        rows = []
+        if position is None or position[0] is not None:
+            valued = queryset.filter(**{f'{field}__isnull': False}).order_by(
+                self.ordering[0], *nulls_last_ordering(self.model, rest))
+            if position is not None:
+                valued = valued.filter(self._after(self.ordering, position, leading_nulls=False))
+            rows = list(valued[:self.page_size + 1])
+        if len(rows) <= self.page_size and rest:
+            nulls = queryset.filter(**{f'{field}__isnull': True}).order_by(*nulls_last_ordering(self.model, rest))
+            if position is not None and position[0] is None:
+                nulls = nulls.filter(self._after(rest, position[1:]))
+            rows += list(nulls[:self.page_size + 1 - len(rows)])
+        return rows
+
+    def _after(self, ordering, position, leading_nulls=True):
+        # Expands (a, b) > (x, y) into a >= x AND (a > x OR (a = x AND b > y)),
+        # plus OR a IS NULL when a is nullable, since NULLs sort last
+        name, value = ordering[0], position[0]
+        field = name.lstrip('-')
+        descending = name.startswith('-')
+        if value is None:
+            # Inside the NULL block only the remaining fields can move forward
+            if len(ordering) == 1:
+                return Q(pk__in=[])
+            return Q(**{f'{field}__isnull': True}) & self._after(ordering[1:], position[1:])
+        condition = Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+        if len(ordering) > 1:
+            condition = Q(**{f"{field}__{'lte' if descending else 'gte'}": value}) & (
+                condition | Q(**{field: value}) & self._after(ordering[1:], position[1:])
+            )
+        if leading_nulls and _nullable(self.model, field):
+            condition |= Q(**{f'{field}__isnull': True})
+        return condition
+
+    def _dump(self, value):
+        if value is None or isinstance(value, (int, float, str, bool)):
+            return value
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    def _load(self, name, value):
+        if value is None:
+            return None
+        field = _model_field(self.model, name)
+        # Annotations (e.g. a computed rank) are compared as-is
+        return value if field is None else field.to_python(value)
+
+
+class KeysetPaginationMixin:
+    """
+    Lets a list view switch to keyset pagination with ?pagination=cursor
+    (or by following a ?cursor= link). Views declare keyset_ordering or
+    override get_keyset_ordering(); without the flag they keep their
+    regular pagination_class.
+    """
+    keyset_pagination_class = KeysetPagination
+    keyset_ordering = ('-pk',)
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def uses_keyset_pagination(self):
+        params = self.request.query_params
+        return params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.uses_keyset_pagination():
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
@@ -0,0 +1,27 @@
+from django.db.models import Prefetch
+
+
+def top_k_prefetch(lookup, k, ordering, queryset=None, to_attr=None):
+    """
+    Prefetch of the first k children per parent in one query.
+
+    A sliced Prefetch queryset is turned by the ORM into a
+    ROW_NUMBER() OVER (PARTITION BY <fk> ORDER BY <ordering>) <= k filter,
+    so the whole page of parents costs a single extra query whatever its size.
+    The last ordering field should be unique for the top k to be stable.
+
+        top_k_prefetch('artworks', 3, ('-createdAt', '-pk'), to_attr='preview_artworks')
+    """
+    if queryset is None:
+        raise ValueError('top_k_prefetch needs the child queryset')
+    return Prefetch(lookup, queryset=queryset.order_by(*ordering)[:k], to_attr=to_attr)
+
+
+def prefetched(obj, to_attr, fallback):
+    """
+    The list prefetched into to_attr, or fallback() when the object was
+    loaded without the prefetch (e.g. a serializer used outside its view).
+    """
+    if hasattr(obj, to_attr):
+        return getattr(obj, to_attr)
+    return fallback()
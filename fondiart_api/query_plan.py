@@ -0,0 +1,30 @@
+class QueryPlanMixin:
+    """
+    Lets a view declare the relations its serializer walks, so they are
+    joined or prefetched once per request instead of lazily per row.
+
+        select_related_fields = ('artwork__artist',)
+        prefetch_related_fields = ('bids',)
+
+    The plan is applied in filter_queryset(), after get_queryset() and any
+    filtering, so it works with views that override either. Entries in
+    prefetch_related_fields may be plain lookups or Prefetch objects.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def get_select_related_fields(self):
+        return self.select_related_fields
+
+    def get_prefetch_related_fields(self):
+        return self.prefetch_related_fields
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        select_related = self.get_select_related_fields()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        prefetch_related = self.get_prefetch_related_fields()
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
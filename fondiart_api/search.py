@@ -0,0 +1,239 @@
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Artwork, ArtworkCatalogEntry
+
+SEARCH_TABLE = 'fondiart_api_artwork_search'
+MAX_RESULTS = getattr(settings, 'ARTWORK_SEARCH_MAX_RESULTS', 1000)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _tokens(query):
+    return _TOKEN_RE.findall(query or '')[:16]
+
+
+def artwork_document(artwork):
+    """
+    The searchable fields of an artwork, in the column order of the index.
+    """
+    tags = artwork.tags if isinstance(artwork.tags, list) else []
+    return [
+        artwork.title or '',
+        artwork.description or '',
+        artwork.artist.name or '',
+        ' '.join(str(tag) for tag in tags),
+        artwork.medidas or '',
+        artwork.soporte or '',
+    ]
+
+
+class BaseSearchBackend:
+    def index(self, artwork):
+        raise NotImplementedError
+
+    def remove(self, artwork_id):
+        raise NotImplementedError
+
+    def search(self, query, limit=MAX_RESULTS):
+        """
+        Returns artwork ids ordered from most to least relevant.
+        """
+        raise NotImplementedError
+
+    def filter(self, queryset, query):
+        """
+        Narrows an artwork or catalog queryset to every match, unranked and
+        without the MAX_RESULTS cap, for listings sorted by something else.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def rebuild(self):
+        self.clear()
+        count = 0
+        for artwork in Artwork.objects.select_related('artist').iterator(chunk_size=500):
+            self.index(artwork)
+            count += 1
+        return count
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """
+    SQLite FTS5 virtual table keyed by the artwork id, ranked with BM25.
+    """
+    # bm25() weights for title, description, artist_name, tags, medidas, soporte
+    weights = (10.0, 2.0, 6.0, 4.0, 1.0, 2.0)
+
+    def index(self, artwork):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [artwork.pk])
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, description, artist_name, tags, medidas, soporte) '
+                'VALUES (%s, %s, %s, %s, %s, %s, %s)',
+                [artwork.pk] + artwork_document(artwork),
+            )
+
+    def remove(self, artwork_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [artwork_id])
+
+    @staticmethod
+    def _match(tokens):
+        # Every term must match, the last one as a prefix for search-as-you-type
+        return (' '.join(f'"{token}"' for token in tokens[:-1]) + f' "{tokens[-1]}"*').strip()
+
+    def search(self, query, limit=MAX_RESULTS):
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+        weights = ', '.join(str(w) for w in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+                f'ORDER BY bm25({SEARCH_TABLE}, {weights}) LIMIT %s',
+                [self._match(tokens), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, queryset, query):
+        tokens = _tokens(query)
+        if not tokens:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [self._match(tokens)],
+        ))
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Weighted tsvector per artwork with a GIN index, ranked with ts_rank_cd.
+    """
+    config = 'simple'
+
+    def index(self, artwork):
+        title, description, artist_name, tags, medidas, soporte = artwork_document(artwork)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (artwork_id, document) VALUES (%s, '
+                f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'B') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'C') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'D')) "
+                'ON CONFLICT (artwork_id) DO UPDATE SET document = EXCLUDED.document',
+                [artwork.pk, title, artist_name, tags, f'{medidas} {soporte}', description],
+            )
+
+    def remove(self, artwork_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE artwork_id = %s', [artwork_id])
+
+    @staticmethod
+    def _tsquery(tokens):
+        return ' & '.join(tokens[:-1] + [f'{tokens[-1]}:*'])
+
+    def search(self, query, limit=MAX_RESULTS):
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT artwork_id FROM {SEARCH_TABLE}, to_tsquery('{self.config}', %s) query "
+                'WHERE document @@ query ORDER BY ts_rank_cd(document, query) DESC, artwork_id LIMIT %s',
+                [self._tsquery(tokens), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, queryset, query):
+        tokens = _tokens(query)
+        if not tokens:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT artwork_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('{self.config}', %s)", [self._tsquery(tokens)],
+        ))
+
+
+class CatalogScanBackend(BaseSearchBackend):
+    """
+    Fallback for databases without full-text support: substring scan of the catalog.
+    """
+    def index(self, artwork):
+        pass
+
+    def remove(self, artwork_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def rebuild(self):
+        return 0
+
+    @staticmethod
+    def _matches(query):
+        condition = Q()
+        for token in _tokens(query):
+            condition &= Q(title__icontains=token) | Q(artist_name__icontains=token) | Q(tags__icontains=token)
+        return ArtworkCatalogEntry.objects.filter(condition) if condition else None
+
+    def search(self, query, limit=MAX_RESULTS):
+        matches = self._matches(query)
+        if matches is None:
+            return []
+        return list(matches.values_list('pk', flat=True)[:limit])
+
+    def filter(self, queryset, query):
+        matches = self._matches(query)
+        if matches is None:
+            return queryset.none()
+        return queryset.filter(pk__in=matches.values('pk'))
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTS5Backend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    """
+    ARTWORK_SEARCH_BACKEND can point to a backend class; otherwise it is
+    picked from the database vendor.
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'ARTWORK_SEARCH_BACKEND', None)
+        backend_class = import_string(path) if path else VENDOR_BACKENDS.get(connection.vendor, CatalogScanBackend)
+        _backend = backend_class()
+    return _backend
+
+
+def search_artwork_ids(query, limit=MAX_RESULTS):
+    return get_search_backend().search(query, limit=limit)
+
+
+def filter_by_search(queryset, query):
+    return get_search_backend().filter(queryset, query)
+
+
+def rank_expression(ranked_ids):
+    """
+    Annotation giving each artwork its position in the search results.
+    """
+    if not ranked_ids:
+        return Value(0, output_field=IntegerField())
+    return Case(
+        *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ranked_ids)],
+        default=Value(len(ranked_ids)),
+        output_field=IntegerField(),
+    )
@@ -2,14 +2,46 @@ from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from urllib.parse import unquote
 import cloudinary.uploader
-from .models import User, Artwork, Order, Favorite, Wallet, BankAccount, Auction, Bid, Project
+from .models import User, Artwork, Order, Favorite, Wallet, BankAccount, Auction, Bid, Project, ArtworkCatalogEntry
+from .tags import sync_artwork_tags
+from .fieldsets import SparseFieldsetSerializerMixin
+from .prefetch import prefetched
+from finance.funding import funding_progress, funding_percentage
+
+class ProjectListSerializer(serializers.ListSerializer):
+    # Computes the funding progress of the whole page with one grouped query
+    def to_representation(self, data):
+        projects = list(data.all() if hasattr(data, 'all') else data)
+        request = self.context.get('request')
+        self.child.funding = funding_progress(projects, getattr(request, 'user', None))
+        return super().to_representation(projects)
 
 class ProjectSerializer(serializers.ModelSerializer):
     artist_name = serializers.CharField(source='artist.name', read_only=True)
+    funding_percentage = serializers.SerializerMethodField()
+    donors_count = serializers.SerializerMethodField()
+    my_contribution = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
         fields = '__all__'
+        list_serializer_class = ProjectListSerializer
+
+    def get_progress(self, obj):
+        funding = getattr(self, 'funding', None)
+        if funding is None or obj.pk not in funding:
+            request = self.context.get('request')
+            self.funding = funding = funding_progress([obj], getattr(request, 'user', None))
+        return funding[obj.pk]
+
+    def get_funding_percentage(self, obj):
+        return funding_percentage(obj)
+
+    def get_donors_count(self, obj):
+        return self.get_progress(obj)['donors_count']
+
+    def get_my_contribution(self, obj):
+        return self.get_progress(obj)['my_contribution']
 
 class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
     image = serializers.CharField(required=False, allow_blank=True)
@@ -76,6 +108,14 @@ class ArtworkImageSerializer(serializers.ModelSerializer):
         model = Artwork
         fields = ['image']
 
+# Preview orderings for ArtistSerializer.artworks, picked with ?preview=
+ARTWORK_PREVIEW_ORDERINGS = {
+    'first': ('pk',),
+    'newest': ('-createdAt', '-pk'),
+    'best-rated': ('-rating_avg', '-rating_count', '-pk'),
+}
+ARTWORK_PREVIEW_SIZE = 3
+
 class ArtistSerializer(serializers.ModelSerializer):
     artworks = serializers.SerializerMethodField()
 
@@ -84,8 +124,11 @@ class ArtistSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'avatarUrl', 'artworks', 'bio']
 
     def get_artworks(self, obj):
-        # Get the first 3 artworks for the artist
-        artworks = Artwork.objects.filter(artist=obj)[:3]
+        # The first 3 artworks for the artist, prefetched by ArtistListView
+        artworks = prefetched(
+            obj, 'preview_artworks',
+            lambda: Artwork.objects.filter(artist=obj).order_by(*ARTWORK_PREVIEW_ORDERINGS['first'])[:ARTWORK_PREVIEW_SIZE],
+        )
         return ArtworkImageSerializer(artworks, many=True).data
 
 # Artwork Serializers
@@ -94,10 +137,11 @@ class RatingSerializer(serializers.Serializer):
     count = serializers.IntegerField()
     my = serializers.IntegerField(required=False)
 
-class ArtworkListItemSerializer(serializers.ModelSerializer):
+class ArtworkListItemSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     artist = serializers.SerializerMethodField()
     status = serializers.CharField(source='get_status_display')
     rating = serializers.SerializerMethodField()
+    fieldset_sources = {'artist': ('artist__name',), 'rating': ('rating_avg', 'rating_count')}
 
     class Meta:
         model = Artwork
@@ -107,7 +151,25 @@ class ArtworkListItemSerializer(serializers.ModelSerializer):
         ]
 
     def get_artist(self, obj):
-        return {'id': str(obj.artist.id), 'name': obj.artist.name}
+        return {'id': str(obj.artist_id), 'name': obj.artist.name}
+
+    def get_rating(self, obj):
+        return {'avg': obj.rating_avg, 'count': obj.rating_count, 'my': 0}
+
+class ArtworkCatalogSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    # Same payload as ArtworkListItemSerializer, read from the denormalized catalog
+    id = serializers.IntegerField(source='artwork_id', read_only=True)
+    artist = serializers.SerializerMethodField()
+    status = serializers.CharField(source='get_status_display')
+    rating = serializers.SerializerMethodField()
+    fieldset_sources = {'artist': ('artist_id', 'artist_name'), 'rating': ('rating_avg', 'rating_count')}
+
+    class Meta:
+        model = ArtworkCatalogEntry
+        fields = ArtworkListItemSerializer.Meta.fields + ['tokens_disponibles', 'best_ask']
+
+    def get_artist(self, obj):
+        return {'id': str(obj.artist_id), 'name': obj.artist_name}
 
     def get_rating(self, obj):
         return {'avg': obj.rating_avg, 'count': obj.rating_count, 'my': 0}
@@ -115,7 +177,7 @@ class ArtworkListItemSerializer(serializers.ModelSerializer):
 class ArtworkDetailSerializer(ArtworkListItemSerializer):
     gallery = serializers.ListField(child=serializers.URLField())
     description = serializers.CharField()
-    ownerId = serializers.CharField(source='artist.id')
+    ownerId = serializers.CharField(source='artist_id')
     approvedAt = serializers.DateTimeField(allow_null=True)
 
     class Meta(ArtworkListItemSerializer.Meta):
@@ -168,7 +230,9 @@ class ArtworkCreateSerializer(serializers.ModelSerializer):
             validated_data['fractionsLeft'] = 30000
 
         validated_data['status'] = 'approved' if validated_data.get('venta_directa') else 'pending'
-        return super().create(validated_data)
+        artwork = super().create(validated_data)
+        sync_artwork_tags(artwork)
+        return artwork
 
 class ArtworkUpdateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -183,6 +247,12 @@ class ArtworkUpdateSerializer(serializers.ModelSerializer):
         }
         partial = True
 
+    def update(self, instance, validated_data):
+        artwork = super().update(instance, validated_data)
+        if 'tags' in validated_data:
+            sync_artwork_tags(artwork)
+        return artwork
+
 # Order Serializers
 class OrderCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -190,8 +260,8 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         fields = ['artwork', 'fractions', 'paymentMethod']
 
 class OrderSerializer(serializers.ModelSerializer):
-    buyerId = serializers.CharField(source='buyer.id', read_only=True)
-    artworkId = serializers.CharField(source='artwork.id', read_only=True)
+    buyerId = serializers.CharField(source='buyer_id', read_only=True)
+    artworkId = serializers.CharField(source='artwork_id', read_only=True)
     unitPrice = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     amount = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     checkoutUrl = serializers.URLField(allow_null=True, read_only=True)
@@ -263,10 +333,11 @@ class AuctionUpdateSerializer(serializers.ModelSerializer):
         model = Auction
         fields = ['start_price', 'auction_date', 'status', 'buyer', 'final_price']
 
-class AuctionSerializer(serializers.ModelSerializer):
+class AuctionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     artwork_title = serializers.CharField(source='artwork.title', read_only=True)
     artwork_image = serializers.SerializerMethodField()
     artist_name = serializers.CharField(source='artwork.artist.name', read_only=True)
+    fieldset_sources = {'artwork_image': ('artwork__image',)}
 
     class Meta:
         model = Auction
@@ -0,0 +1,104 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Artwork, User, Auction, Favorite, Project
+from .catalog import refresh_catalog_entry, refresh_artist_name
+from .search import get_search_backend
+from .detail_cache import invalidate_artwork
+from .artist_stats import adjust_catalog_counters, catalog_counters, stored_catalog_counters
+from .trending import record_artwork_event
+from .conditional import bump_resource_versions, ARTWORK, CUADRO_TOKEN, AUCTION, SELL_ORDER, USER
+from blockchain.models import CuadroToken
+from finance.models import SellOrder
+
+@receiver(post_save, sender=Artwork)
+def sync_catalog_on_artwork_save(sender, instance, **kwargs):
+    refresh_catalog_entry(instance.id)
+
+@receiver([post_save, post_delete], sender=Artwork)
+def invalidate_detail_cache_on_artwork_change(sender, instance, **kwargs):
+    invalidate_artwork(instance.id)
+
+@receiver([post_save, post_delete], sender=Auction)
+def invalidate_detail_cache_on_auction_change(sender, instance, **kwargs):
+    invalidate_artwork(instance.artwork_id)
+
+@receiver(pre_save, sender=Artwork)
+@receiver(pre_save, sender=Project)
+def remember_artist_stats_counters(sender, instance, update_fields=None, **kwargs):
+    instance._stored_counters = stored_catalog_counters(instance, update_fields)
+
+@receiver(post_save, sender=Artwork)
+@receiver(post_save, sender=Project)
+def adjust_artist_stats_on_save(sender, instance, **kwargs):
+    adjust_catalog_counters(getattr(instance, '_stored_counters', None), catalog_counters(instance))
+
+@receiver(post_delete, sender=Artwork)
+@receiver(post_delete, sender=Project)
+def adjust_artist_stats_on_delete(sender, instance, **kwargs):
+    adjust_catalog_counters(before=catalog_counters(instance))
+
+def _favorite_counters(favorite):
+    # The artwork may already be gone when favorites are removed by its deletion
+    artist_id = Artwork.objects.filter(pk=favorite.artwork_id).values_list('artist_id', flat=True).first()
+    return artist_id, {'favorites_count': 1}
+
+@receiver(post_save, sender=Favorite)
+def adjust_artist_stats_on_favorite(sender, instance, created, **kwargs):
+    if created:
+        adjust_catalog_counters(after=_favorite_counters(instance))
+
+@receiver(post_delete, sender=Favorite)
+def adjust_artist_stats_on_unfavorite(sender, instance, **kwargs):
+    adjust_catalog_counters(before=_favorite_counters(instance))
+
+@receiver(post_save, sender=Favorite)
+def record_favorite_for_trending(sender, instance, created, **kwargs):
+    if created:
+        record_artwork_event(instance.artwork_id, 'favorite')
+
+@receiver(post_save, sender=Artwork)
+def index_artwork_on_save(sender, instance, **kwargs):
+    get_search_backend().index(instance)
+
+@receiver(post_delete, sender=Artwork)
+def unindex_artwork_on_delete(sender, instance, **kwargs):
+    get_search_backend().remove(instance.id)
+
+@receiver(post_save, sender=User)
+def sync_catalog_on_artist_save(sender, instance, created, **kwargs):
+    if created:
+        return
+    # Only a rename touches catalog rows, and only then the search documents change
+    if refresh_artist_name(instance.id, instance.name):
+        backend = get_search_backend()
+        for artwork in Artwork.objects.filter(artist=instance).select_related('artist'):
+            backend.index(artwork)
+            invalidate_artwork(artwork.id)
+
+@receiver([post_save, post_delete], sender=CuadroToken)
+def sync_catalog_on_token_change(sender, instance, **kwargs):
+    refresh_catalog_entry(instance.artwork_id)
+    invalidate_artwork(instance.artwork_id)
+
+@receiver([post_save, post_delete], sender=SellOrder)
+def sync_catalog_on_sell_order_change(sender, instance, **kwargs):
+    # The token may already be gone when the order is removed by a cascade
+    artwork_id = CuadroToken.objects.filter(pk=instance.token_id).values_list('artwork_id', flat=True).first()
+    if artwork_id:
+        refresh_catalog_entry(artwork_id)
+
+RESOURCE_BY_MODEL = {
+    Artwork: ARTWORK,
+    CuadroToken: CUADRO_TOKEN,
+    Auction: AUCTION,
+    SellOrder: SELL_ORDER,
+    User: USER,
+}
+
+def bump_version_on_change(sender, **kwargs):
+    bump_resource_versions(RESOURCE_BY_MODEL[sender])
+
+# Connected per model, so saves of models no ETag covers don't pay for it
+for model in RESOURCE_BY_MODEL:
+    post_save.connect(bump_version_on_change, sender=model, dispatch_uid=f'bump_version_on_{model._meta.label_lower}_save')
+    post_delete.connect(bump_version_on_change, sender=model, dispatch_uid=f'bump_version_on_{model._meta.label_lower}_delete')
@@ -0,0 +1,58 @@
+import json
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class StreamingListMixin:
+    """
+    Streams unpaginated list responses as a JSON array instead of building
+    the whole list in memory. Rows are read with a chunked server-side
+    iterator and serialized stream_chunk_size at a time, so memory stays flat
+    whatever the size of the result and the first bytes leave right away.
+
+    Only applies when the view has no paginator and the client asked for
+    JSON; paginated and browsable API requests go through the regular list().
+    """
+    stream_chunk_size = 500
+
+    def should_stream(self, request):
+        return self.paginator is None and isinstance(getattr(request, 'accepted_renderer', None), JSONRenderer)
+
+    def list(self, request, *args, **kwargs):
+        if not self.should_stream(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(self.stream_rows(queryset), content_type='application/json')
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def stream_rows(self, queryset):
+        encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        first = True
+        yield b'['
+        for chunk in self.iter_chunks(queryset):
+            data = self.get_serializer(chunk, many=True).data
+            for row in data:
+                yield (b'' if first else b',') + encoder.encode(row).encode('utf-8')
+                first = False
+        yield b']'
+
+    def iter_chunks(self, queryset):
+        chunk = []
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(obj)
+            if len(chunk) >= self.stream_chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def streamed_json(response):
+    """
+    Decodes a JSON response body, streamed or not. Meant for tests.
+    """
+    if response.streaming:
+        return json.loads(b''.join(response.streaming_content))
+    return json.loads(response.content)
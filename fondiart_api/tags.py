@@ -0,0 +1,64 @@
+from django.db.models import Count
+
+from .models import ArtworkTag
+
+MAX_TAG_LENGTH = 100
+
+
+def normalize_tag(tag):
+    return str(tag).strip().lower()[:MAX_TAG_LENGTH]
+
+
+def normalize_tags(tags):
+    if not isinstance(tags, (list, tuple, set)):
+        return set()
+    return {normalize_tag(tag) for tag in tags if str(tag).strip()}
+
+
+def sync_artwork_tags(artwork):
+    """
+    Makes the ArtworkTag rows of an artwork match its tags list.
+    """
+    wanted = normalize_tags(artwork.tags)
+    current = set(ArtworkTag.objects.filter(artwork=artwork).values_list('tag', flat=True))
+
+    stale = current - wanted
+    if stale:
+        ArtworkTag.objects.filter(artwork=artwork, tag__in=stale).delete()
+    new = wanted - current
+    if new:
+        ArtworkTag.objects.bulk_create(
+            [ArtworkTag(artwork=artwork, tag=tag) for tag in new],
+            ignore_conflicts=True,
+        )
+
+
+def filter_by_tags(queryset, tags, match='all'):
+    """
+    Restricts an Artwork or ArtworkCatalogEntry queryset to the given tags.
+    match='all' requires every tag, match='any' at least one.
+    """
+    tags = normalize_tags(tags)
+    if not tags:
+        return queryset
+    matching = ArtworkTag.objects.filter(tag__in=tags)
+    if match == 'any':
+        return queryset.filter(pk__in=matching.values('artwork_id'))
+    return queryset.filter(
+        pk__in=matching.values('artwork_id').annotate(matched=Count('tag')).filter(matched=len(tags)).values('artwork_id')
+    )
+
+
+def tag_counts(queryset, limit=None):
+    """
+    Per-tag artwork counts over the rows of queryset, in a single grouped query.
+    """
+    counts = (
+        ArtworkTag.objects.filter(artwork_id__in=queryset.order_by().values('pk'))
+        .values('tag')
+        .annotate(count=Count('artwork_id'))
+        .order_by('-count', 'tag')
+    )
+    if limit:
+        counts = counts[:limit]
+    return list(counts)
@@ -0,0 +1,35 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting that an endpoint runs a fixed number of SQL
+    queries whatever the size of its result.
+
+        self.assertQueryBudget(url, budget=3, populate=make_rows)
+
+    populate(n) must create n more rows that show up in the response. The
+    endpoint is requested after one and after several populate() calls; a
+    query count above the budget, or one that grows with the rows, fails.
+    """
+    query_budget_sizes = (1, 5)
+
+    def count_queries(self, url, **extra):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, **extra)
+        self.assertLess(response.status_code, 400, f'{url} returned {response.status_code}')
+        return len(context.captured_queries), context.captured_queries
+
+    def assertQueryBudget(self, url, budget, populate, **extra):
+        counts = []
+        created = 0
+        for size in self.query_budget_sizes:
+            populate(size - created)
+            created = size
+            count, queries = self.count_queries(url, **extra)
+            if count > budget:
+                sql = '\n'.join(query['sql'] for query in queries)
+                self.fail(f'{url} ran {count} queries with {size} rows, budget is {budget}:\n{sql}')
+            counts.append(count)
+        self.assertEqual(len(set(counts)), 1, f'{url} query count grows with the result size: {counts}')
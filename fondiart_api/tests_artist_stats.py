@@ -0,0 +1,82 @@
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from .models import User, Artwork, Favorite, Project, ArtistStats
+from .artist_stats import compute_artist_stats
+from blockchain.models import CuadroToken
+from finance.models import CuentaComitente
+
+class ArtistSummaryTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='pw', name='Admin', role='admin')
+        self.artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pw', name='Buyer')
+        for user in (self.admin, self.artist):
+            CuentaComitente.objects.create(user=user)
+        CuentaComitente.objects.create(user=self.buyer, balance=Decimal('10000.00'))
+        self.artwork = Artwork.objects.create(title='Obra', artist=self.artist, status='approved', fractionFrom=Decimal('10.00'))
+        Artwork.objects.create(title='Pendiente', artist=self.artist)
+        CuadroToken.objects.create(artwork=self.artwork, contract_address='0x1', token_name='Obra', token_symbol='OBR', total_supply=100000)
+        self.url = reverse('artist-summary', args=[self.artist.id])
+
+    def test_summary_is_built_once_then_updated_incrementally(self):
+        summary = self.client.get(self.url).data
+        self.assertEqual(summary['artworks'], {'pending': 1, 'approved': 1, 'rejected': 0, 'sold': 0, 'total': 2})
+        self.assertEqual(summary['tokens_sold'], 0)
+        self.assertTrue(ArtistStats.objects.filter(artist=self.artist).exists())
+
+        self.client.force_authenticate(self.buyer)
+        response = self.client.post(reverse('buy-tokens'), {'artwork_id': self.artwork.id, 'quantity': 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(reverse('create-donation'), {'artist_id': self.artist.id, 'amount': '100.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        Favorite.objects.create(user=self.buyer, artwork=self.artwork)
+        Project.objects.create(title='Mural', description='-', funding_goal=Decimal('50.00'), amount_raised=Decimal('60.00'), artist=self.artist)
+        self.artwork.estado_venta = 'vendida'
+        self.artwork.save()
+
+        with self.assertNumQueries(2):
+            summary = self.client.get(self.url).data
+        self.assertEqual(summary['tokens_sold'], 5)
+        self.assertEqual(summary['revenue']['primary'], Decimal('50.00'))
+        self.assertEqual(summary['donations'], {'received': Decimal('100.00'), 'count': 1})
+        self.assertEqual(summary['projects'], {'count': 1, 'funded': 1, 'raised': Decimal('60.00')})
+        self.assertEqual(summary['favorites_count'], 1)
+        self.assertEqual(summary['artworks']['sold'], 1)
+
+        # A full recompute agrees with the incremental updates
+        stats = ArtistStats.objects.get(artist=self.artist)
+        ArtistStats.objects.all().delete()
+        self.assertEqual(self.client.get(self.url).data['revenue']['primary'], stats.primary_revenue)
+
+    def test_catalog_changes_apply_deltas(self):
+        self.client.get(self.url)
+        pending = Artwork.objects.get(title='Pendiente')
+        favorite = Favorite.objects.create(user=self.buyer, artwork=pending)
+        project = Project.objects.create(title='Mural', description='-', funding_goal=Decimal('50.00'), amount_raised=Decimal('20.00'), artist=self.artist)
+
+        pending.status = 'approved'
+        pending.save()
+        with CaptureQueriesContext(connection) as queries:
+            pending.save(update_fields=['title'])
+        # Only the title was written, so the counters are left alone
+        self.assertFalse([query for query in queries if 'artiststats' in query['sql']])
+        project.amount_raised = Decimal('55.00')
+        project.save()
+        favorite.delete()
+        Project.objects.create(title='Otro', description='-', funding_goal=Decimal('10.00'), artist=self.artist).delete()
+
+        stats = ArtistStats.objects.filter(artist=self.artist).values(*compute_artist_stats(self.artist.id)).get()
+        self.assertEqual(stats, compute_artist_stats(self.artist.id))
+        self.assertEqual((stats['artworks_pending'], stats['artworks_approved']), (0, 2))
+        self.assertEqual((stats['projects_count'], stats['projects_funded'], stats['projects_raised']), (1, 1, Decimal('55.00')))
+        self.assertEqual(stats['favorites_count'], 0)
+
+        pending.delete()
+        self.assertEqual(ArtistStats.objects.get(artist=self.artist).artworks_approved, 1)
+
+    def test_unknown_artist(self):
+        self.assertEqual(self.client.get(reverse('artist-summary', args=[self.buyer.id])).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,214 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from .models import User, Artwork, Auction, ArtworkCatalogEntry, Favorite, ResourceVersion
+from blockchain.models import CuadroToken
+from finance.models import SellOrder
+from .search import search_artwork_ids
+from .tags import sync_artwork_tags
+from .streaming import streamed_json
+
+class ArtworkCatalogTest(APITestCase):
+    def setUp(self):
+        self.artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Ana Pintora', role='artist')
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pw', name='Seller')
+        self.artwork = Artwork.objects.create(title='Rio', artist=self.artist, price=Decimal('1000.00'), tags=['paisaje'])
+
+    def test_catalog_entry_follows_artwork_and_artist(self):
+        entry = ArtworkCatalogEntry.objects.get(artwork=self.artwork)
+        self.assertEqual(entry.artist_name, 'Ana Pintora')
+
+        self.artist.name = 'Ana P.'
+        self.artist.save()
+        self.artwork.rating_avg = 4.5
+        self.artwork.save()
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.artist_name, 'Ana P.')
+        self.assertEqual(entry.rating_avg, 4.5)
+
+    def test_catalog_tracks_tokens_and_best_ask(self):
+        token = CuadroToken.objects.create(artwork=self.artwork, contract_address='0x1', token_name='Rio Token', token_symbol='AP1', total_supply=100000)
+        SellOrder.objects.create(token=token, user=self.seller, quantity=10, price=Decimal('12.50'))
+        cheaper = SellOrder.objects.create(token=token, user=self.seller, quantity=5, price=Decimal('11.00'))
+
+        entry = ArtworkCatalogEntry.objects.get(artwork=self.artwork)
+        self.assertEqual(entry.tokens_disponibles, 30000)
+        self.assertEqual(entry.best_ask, Decimal('11.00'))
+
+        cheaper.status = 'cancelada'
+        cheaper.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.best_ask, Decimal('12.50'))
+
+    def test_finished_auction_closes_orders_in_catalog(self):
+        token = CuadroToken.objects.create(artwork=self.artwork, contract_address='0x1', token_name='Rio Token', token_symbol='AP1', total_supply=100000)
+        SellOrder.objects.create(token=token, user=self.seller, quantity=10, price=Decimal('12.50'))
+        auction = Auction.objects.create(artwork=self.artwork, start_price=Decimal('10.00'), auction_date=timezone.now() - timedelta(days=2))
+        ResourceVersion.objects.all().delete()
+
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='pw', name='Admin', role='admin')
+        self.client.force_authenticate(admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse('auction-detail', args=[auction.id]))
+        self.assertEqual(response.data['status'], 'finished')
+        self.assertIsNone(ArtworkCatalogEntry.objects.get(artwork=self.artwork).best_ask)
+        self.assertIn('sell_order', ResourceVersion.objects.values_list('resource', flat=True))
+
+    def test_artwork_list_reads_from_catalog(self):
+        response = self.client.get(reverse('artwork-list'), {'q': 'pintora'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = streamed_json(response)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], self.artwork.id)
+        self.assertEqual(rows[0]['artist'], {'id': str(self.artist.id), 'name': 'Ana Pintora'})
+
+class ArtworkSearchTest(APITestCase):
+    def setUp(self):
+        artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Lucía Méndez', role='artist')
+        self.title_match = Artwork.objects.create(title='Retrato azul', artist=artist, tags=['retrato'])
+        self.description_match = Artwork.objects.create(title='Sin título', description='Un cielo azul sobre el río', artist=artist, tags=[])
+        Artwork.objects.create(title='Naturaleza muerta', artist=artist, tags=['bodegón'], soporte='Óleo sobre lienzo')
+
+    def search(self, **params):
+        response = self.client.get(reverse('artwork-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in streamed_json(response)]
+
+    def test_relevance_ranks_title_above_description(self):
+        self.assertEqual(self.search(q='azul', sort='relevance'), [self.title_match.id, self.description_match.id])
+
+    def test_result_cap_only_applies_to_relevance(self):
+        # As if MAX_RESULTS were 1
+        with mock.patch('fondiart_api.views.search_artwork_ids', lambda q: search_artwork_ids(q, limit=1)):
+            self.assertEqual(self.search(q='azul', sort='relevance'), [self.title_match.id])
+            self.assertEqual(self.search(q='azul', sort='newest'), [self.description_match.id, self.title_match.id])
+
+    def test_search_covers_artist_soporte_and_prefixes(self):
+        self.assertEqual(len(self.search(q='mendez')), 3)
+        self.assertEqual(len(self.search(q='oleo lien')), 1)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.title_match.title = 'Retrato verde'
+        self.title_match.save()
+        self.assertEqual(self.search(q='azul'), [self.description_match.id])
+        self.description_match.delete()
+        self.assertEqual(self.search(q='azul'), [])
+
+class ArtworkTagIndexTest(APITestCase):
+    def setUp(self):
+        self.artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        self.client.force_authenticate(user=self.artist)
+
+    def create(self, title, tags):
+        response = self.client.post(reverse('artwork-create'), {
+            'title': title, 'description': 'Obra', 'tags': tags, 'image': 'https://example.com/a.png',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Artwork.objects.get(title=title)
+
+    def test_tag_filters_and_counts(self):
+        both = self.create('Ambas', ['Abstracto', 'azul'])
+        abstract = self.create('Abstracta', ['abstracto'])
+        self.create('Otra', ['paisaje'])
+        url = reverse('artwork-list')
+
+        self.assertEqual([row['id'] for row in streamed_json(self.client.get(url, {'tags': 'abstracto,azul'}))], [both.id])
+        any_ids = {row['id'] for row in streamed_json(self.client.get(url, {'tags': 'azul,abstracto', 'tag_match': 'any'}))}
+        self.assertEqual(any_ids, {both.id, abstract.id})
+
+        counts = self.client.get(reverse('artwork-tag-facets'), {'tag': 'abstracto'}).data['tags']
+        self.assertEqual(counts, [{'tag': 'abstracto', 'count': 2}, {'tag': 'azul', 'count': 1}])
+
+    def test_update_resyncs_tags(self):
+        artwork = self.create('Obra', ['azul'])
+        response = self.client.patch(reverse('artwork-detail-update', kwargs={'pk': artwork.pk}), {'tags': ['rojo']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(artwork.tag_index.values_list('tag', flat=True)), ['rojo'])
+
+class ArtworkFacetTest(APITestCase):
+    def test_facet_counts_follow_filters(self):
+        artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        for artwork in [
+            Artwork.objects.create(title='A', artist=artist, price=Decimal('5000'), soporte='Óleo', tags=['azul'], venta_directa=True),
+            Artwork.objects.create(title='B', artist=artist, price=Decimal('75000'), soporte='Óleo', tags=['azul', 'mar']),
+            Artwork.objects.create(title='C', artist=artist, price=None, estado_venta='vendida', tags=['mar']),
+        ]:
+            sync_artwork_tags(artwork)
+
+        facets = self.client.get(reverse('artwork-facets')).data
+        self.assertEqual(facets['total'], 3)
+        self.assertEqual(facets['estado_venta']['vendida'], 1)
+        self.assertEqual(facets['venta_directa'], {'true': 1, 'false': 2})
+        self.assertEqual(facets['price']['0-10000'], 1)
+        self.assertEqual(facets['price']['50000-100000'], 1)
+        self.assertEqual(facets['price']['sin-precio'], 1)
+        self.assertEqual(facets['soporte'], {'Óleo': 2})
+        self.assertEqual(facets['tags'], {'azul': 2, 'mar': 2})
+
+        facets = self.client.get(reverse('artwork-facets'), {'tag': 'mar', 'venta_directa': 'false'}).data
+        self.assertEqual(facets['total'], 2)
+        self.assertEqual(facets['tags'], {'mar': 2, 'azul': 1})
+
+    def test_facets_count_every_search_match_whatever_the_sort(self):
+        artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        for title in ('Mar azul', 'Cielo azul'):
+            Artwork.objects.create(title=title, artist=artist)
+        # As if MAX_RESULTS were 1
+        with mock.patch('fondiart_api.views.search_artwork_ids', lambda q: search_artwork_ids(q, limit=1)):
+            for sort in ('relevance', 'newest'):
+                self.assertEqual(self.client.get(reverse('artwork-facets'), {'q': 'azul', 'sort': sort}).data['total'], 2, sort)
+
+class ConditionalGetTest(APITestCase):
+    def test_etag_revalidation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+            artwork = Artwork.objects.create(title='A', artist=artist)
+        url = reverse('artwork-list')
+
+        first = self.client.get(url)
+        etag = first['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('Last-Modified', first)
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached.content, b'')
+
+        self.assertNotEqual(self.client.get(url, {'sort': 'newest'})['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            artwork.title = 'B'
+            artwork.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_versions_bump_after_commit_for_covered_models_only(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+            Favorite.objects.create(user=artist, artwork=Artwork.objects.create(title='A', artist=artist))
+            self.assertFalse(ResourceVersion.objects.exists())
+        # Favorites aren't part of any ETag
+        self.assertEqual(set(ResourceVersion.objects.values_list('resource', flat=True)), {'user', 'artwork'})
+
+class ArtworkBatchTest(APITestCase):
+    def test_batch_lookup_keeps_order_and_reports_missing(self):
+        artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        self.client.force_authenticate(artist)
+        first = Artwork.objects.create(title='Primera', artist=artist)
+        second = Artwork.objects.create(title='Segunda', artist=artist)
+        url = reverse('artwork-batch')
+
+        response = self.client.get(url, {'ids': f'{second.id},999,{first.id},{second.id}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['title'] for row in response.data['results']], ['Segunda', 'Primera'])
+        self.assertEqual(response.data['missing'], [999])
+
+        self.assertEqual(self.client.get(url, {'ids': '1,abc'}).status_code, status.HTTP_400_BAD_REQUEST)
+        too_many = ','.join(str(i) for i in range(1, 302))
+        self.assertEqual(self.client.get(url, {'ids': too_many}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,52 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from .detail_cache import _cache, _generation_key
+from .models import User, Artwork, Auction
+
+class ArtworkDetailCacheTest(APITestCase):
+    def setUp(self):
+        self.artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        self.artwork = Artwork.objects.create(title='Obra', description='Descripción', artist=self.artist, price=Decimal('100.00'))
+        self.client.force_authenticate(self.artist)
+
+    def test_detail_is_cached_and_refreshed_on_update(self):
+        url = reverse('artwork-detail-update', args=[self.artwork.id])
+        self.assertEqual(self.client.get(url).data['title'], 'Obra')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data['title'], 'Obra')
+
+        response = self.client.patch(url, {'title': 'Obra nueva'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Written through by perform_update, so the next read is still a hit
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data['title'], 'Obra nueva')
+
+        Artwork.objects.filter(pk=self.artwork.pk).update(title='Sin señal')
+        self.assertEqual(self.client.get(url).data['title'], 'Obra nueva')
+        self.artwork.refresh_from_db()
+        self.artwork.save()
+        self.assertEqual(self.client.get(url).data['title'], 'Sin señal')
+
+    def test_rating_and_auction_id_follow_model_changes(self):
+        rating_url = reverse('artwork-rating', args=[self.artwork.id])
+        self.assertEqual(self.client.get(rating_url).data['count'], 0)
+        self.client.post(reverse('artwork-rate', args=[self.artwork.id]), {'value': 4}, format='json')
+        self.assertEqual(self.client.get(rating_url).data['count'], 1)
+
+        auction_url = reverse('artwork-auction-detail', args=[self.artwork.id])
+        self.assertEqual(self.client.get(auction_url).status_code, status.HTTP_404_NOT_FOUND)
+        auction = Auction.objects.create(artwork=self.artwork, start_price=Decimal('10.00'), auction_date=timezone.now() + timedelta(days=1))
+        self.assertEqual(self.client.get(auction_url).data, {'auction_id': auction.id})
+
+    def test_evicted_generation_does_not_revive_old_entries(self):
+        url = reverse('artwork-detail-update', args=[self.artwork.id])
+        self.assertEqual(self.client.get(url).data['title'], 'Obra')
+        # The generation key is evicted but the section entry survives
+        cache = _cache()
+        cache.delete(_generation_key(self.artwork.id))
+        Artwork.objects.filter(pk=self.artwork.pk).update(title='Otra')
+        self.assertEqual(self.client.get(url).data['title'], 'Otra')
@@ -0,0 +1,42 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from .models import User, Artwork, Auction
+from .streaming import streamed_json
+
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='pw', name='Admin', role='admin')
+        self.artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Ana', role='artist')
+        self.artwork = Artwork.objects.create(title='Obra', description='Larga descripción', artist=self.artist, price=Decimal('100.00'))
+        self.client.force_authenticate(self.admin)
+
+    def test_catalog_list_fields_and_exclude(self):
+        rows = streamed_json(self.client.get(reverse('artwork-list'), {'fields': 'id,title,artist'}))
+        self.assertEqual(rows, [{'id': self.artwork.id, 'title': 'Obra', 'artist': {'id': str(self.artist.id), 'name': 'Ana'}}])
+
+        rows = streamed_json(self.client.get(reverse('artwork-list'), {'exclude': 'tags,rating'}))
+        self.assertNotIn('tags', rows[0])
+        self.assertIn('price', rows[0])
+
+    def test_projection_is_pushed_down_to_the_query(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('admin-artwork-list'), {'fields': 'id,title,artist'})
+        self.assertEqual(response.data['results'], [{'id': self.artwork.id, 'title': 'Obra', 'artist': {'id': str(self.artist.id), 'name': 'Ana'}}])
+        select = context.captured_queries[-1]['sql']
+        self.assertIn('"name"', select)
+        self.assertNotIn('"description"', select)
+        self.assertNotIn('"gallery"', select)
+
+        detail = self.client.get(reverse('artwork-detail-update', args=[self.artwork.id]), {'fields': 'id,description'})
+        self.assertEqual(detail.data, {'id': self.artwork.id, 'description': 'Larga descripción'})
+
+    def test_auction_fields(self):
+        Auction.objects.create(artwork=self.artwork, start_price=Decimal('10.00'), auction_date=timezone.now() + timedelta(days=3))
+        response = self.client.get(reverse('auction-list'), {'fields': 'id,artwork_title,artist_name'})
+        self.assertEqual(list(response.data['results'][0]), ['id', 'artwork_title', 'artist_name'])
+        self.assertEqual(response.data['results'][0]['artist_name'], 'Ana')
@@ -0,0 +1,79 @@
+from decimal import Decimal
+from unittest import mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from .models import User, Artwork
+from finance.models import CuentaComitente, Transaccion
+from .streaming import streamed_json
+from .views import ArtworkListView
+
+class KeysetPaginationTest(APITestCase):
+    def setUp(self):
+        self.artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        prices = [Decimal('10.00'), Decimal('10.00'), None, Decimal('5.00'), Decimal('20.00'), None, Decimal('10.00')]
+        for i, price in enumerate(prices):
+            Artwork.objects.create(title=f'Obra {i}', artist=self.artist, price=price, rating_avg=i % 3)
+
+    def walk(self, url, params):
+        ids, params = [], dict(params, pagination='cursor', page_size=2)
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_every_sort_walks_all_rows_once_in_order(self):
+        url = reverse('artwork-list')
+        for sort in ['newest', 'price-asc', 'price-desc', 'rating-desc', None]:
+            params = {'sort': sort} if sort else {}
+            expected = [row['id'] for row in streamed_json(self.client.get(url, params))]
+            walked = self.walk(url, params)
+            self.assertEqual(sorted(walked), sorted(expected), sort)
+            self.assertEqual(len(walked), len(set(walked)), sort)
+            if sort:
+                # Both paths place NULLs the same way
+                self.assertEqual(walked, expected, sort)
+
+        prices = [Artwork.objects.get(pk=pk).price for pk in self.walk(url, {'sort': 'price-asc'})]
+        self.assertEqual(prices, sorted(p for p in prices if p is not None) + [None, None])
+
+    def test_cursor_filter_only_checks_nulls_of_nullable_fields(self):
+        url = reverse('artwork-list')
+        second_page = self.client.get(url, {'sort': 'newest', 'pagination': 'cursor', 'page_size': 2}).data['next']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(second_page)
+        self.assertFalse([query for query in queries if 'IS NULL' in query['sql']])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('artwork-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_transaction_history_cursor(self):
+        cuenta = CuentaComitente.objects.create(user=self.artist)
+        for amount in range(5):
+            Transaccion.objects.create(cuenta=cuenta, tipo=Transaccion.TipoTransaccion.DEPOSITO, monto_pesos=amount)
+        self.client.force_authenticate(user=self.artist)
+        url = reverse('user-transaction-history', kwargs={'user_id': self.artist.id})
+        walked = self.walk(url, {})
+        self.assertEqual(walked, list(Transaccion.objects.order_by('-fecha', '-pk').values_list('pk', flat=True)))
+
+class StreamingListTest(APITestCase):
+    def test_unpaginated_artwork_list_is_streamed_in_chunks(self):
+        artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        for i in range(7):
+            Artwork.objects.create(title=f'Obra {i}', artist=artist)
+
+        with mock.patch.object(ArtworkListView, 'stream_chunk_size', 3):
+            response = self.client.get(reverse('artwork-list'), {'sort': 'newest'})
+            self.assertTrue(response.streaming)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            rows = streamed_json(response)
+        self.assertEqual([row['title'] for row in rows], [f'Obra {i}' for i in reversed(range(7))])
+
+        paginated = self.client.get(reverse('artwork-list'), {'pagination': 'cursor'})
+        self.assertFalse(paginated.streaming)
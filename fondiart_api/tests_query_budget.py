@@ -0,0 +1,84 @@
+from datetime import timedelta
+from decimal import Decimal
+from itertools import count
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from .models import User, Artwork, Auction
+from .serializers import ArtworkImageSerializer
+from .testing import QueryBudgetMixin
+from blockchain.models import CuadroToken
+from finance.models import CuentaComitente, Transaccion, TokenHolding, SellOrder
+
+class QueryBudgetTest(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.sequence = count()
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='pw', name='Admin', role='admin')
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='pw', name='Buyer')
+        self.cuenta = CuentaComitente.objects.create(user=self.user)
+        self.client.force_authenticate(self.user)
+
+    def make_artwork(self):
+        n = next(self.sequence)
+        artist = User.objects.create_user(username=f'artist{n}', email=f'artist{n}@example.com', password='pw', name=f'Artist {n}', role='artist')
+        return Artwork.objects.create(title=f'Obra {n}', artist=artist, status='approved', fractionFrom=Decimal('10.00'))
+
+    def make_token(self):
+        artwork = self.make_artwork()
+        return CuadroToken.objects.create(
+            artwork=artwork, contract_address=f'0x{artwork.pk:040x}', token_name=artwork.title, token_symbol='OBR', total_supply=100000,
+        )
+
+    def populate(self, factory):
+        def populate(n):
+            for _ in range(n):
+                factory()
+        return populate
+
+    def test_artwork_lists(self):
+        self.client.force_authenticate(self.admin)
+        self.assertQueryBudget(reverse('admin-artwork-list'), budget=2, populate=self.populate(self.make_artwork))
+
+    def test_auction_list(self):
+        def make_auction():
+            Auction.objects.create(artwork=self.make_artwork(), start_price=Decimal('100.00'), auction_date=timezone.now() + timedelta(days=7))
+        self.assertQueryBudget(reverse('auction-list'), budget=5, populate=self.populate(make_auction))
+
+    def test_cuadro_token_list(self):
+        self.assertQueryBudget(reverse('cuadro-token-list'), budget=3, populate=self.populate(self.make_token))
+
+    def test_sell_orders_and_holdings(self):
+        def make_position():
+            token = self.make_token()
+            TokenHolding.objects.create(user=self.user, token=token, quantity=10, purchase_price=Decimal('10.00'))
+            SellOrder.objects.create(token=token, user=self.user, quantity=5, price=Decimal('12.00'))
+        populate = self.populate(make_position)
+        self.assertQueryBudget(reverse('open-sell-orders'), budget=2, populate=populate)
+        self.assertQueryBudget(reverse('user-sell-orders', args=[self.user.pk]), budget=2, populate=lambda n: None)
+        self.assertQueryBudget(reverse('user-token-holdings', args=[self.user.pk]), budget=2, populate=lambda n: None)
+
+    def test_donation_history(self):
+        def make_donation():
+            artwork = self.make_artwork()
+            Transaccion.objects.create(
+                cuenta=self.cuenta, tipo=Transaccion.TipoTransaccion.DONACION_ENVIADA, monto_pesos=Decimal('50.00'),
+                artwork=artwork, recipient_artist=artwork.artist,
+            )
+        self.assertQueryBudget(reverse('user-donation-history', args=[self.user.pk]), budget=4, populate=self.populate(make_donation))
+
+    def test_artist_list_previews(self):
+        def make_artist():
+            artwork = self.make_artwork()
+            for i in range(4):
+                Artwork.objects.create(title=f'{artwork.title}.{i}', artist=artwork.artist, rating_avg=i, image=f'artworks/{artwork.pk}-{i}.jpg')
+        self.assertQueryBudget(reverse('artist-list'), budget=4, populate=self.populate(make_artist))
+
+        artists = self.client.get(reverse('artist-list'), {'preview': 'best-rated'}).data['results']
+        self.assertEqual(len(artists), 5)
+        for artist in artists:
+            self.assertEqual(len(artist['artworks']), 3)
+        newest = Artwork.objects.filter(artist_id=artists[0]['id']).order_by('-createdAt', '-pk')[:3]
+        self.assertEqual(
+            [row['image'] for row in self.client.get(reverse('artist-list'), {'preview': 'newest'}).data['results'][0]['artworks']],
+            [ArtworkImageSerializer(a).data['image'] for a in newest],
+        )
@@ -0,0 +1,55 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from .models import User, Artwork, ArtworkCatalogEntry, Favorite, Project
+from .streaming import streamed_json
+from .trending import record_artwork_event, TRENDING_HALF_LIFE_HOURS
+from finance.models import Donation
+
+class TrendingTest(APITestCase):
+    def setUp(self):
+        self.artist = User.objects.create_user(username='artist', email='artist@example.com', password='pw', name='Artist', role='artist')
+        self.fans = [
+            User.objects.create_user(username=f'fan{i}', email=f'fan{i}@example.com', password='pw', name=f'Fan {i}')
+            for i in range(3)
+        ]
+        self.artworks = [Artwork.objects.create(title=f'Obra {i}', artist=self.artist, status='approved') for i in range(3)]
+
+    def score(self, artwork):
+        return ArtworkCatalogEntry.objects.get(pk=artwork.pk).trending_score
+
+    def test_events_rank_artworks(self):
+        for fan in self.fans:
+            Favorite.objects.create(user=fan, artwork=self.artworks[2])
+        Favorite.objects.create(user=self.fans[0], artwork=self.artworks[0])
+        self.client.force_authenticate(self.fans[1])
+        self.client.post(reverse('artwork-rate', args=[self.artworks[0].id]), {'value': 5}, format='json')
+
+        response = self.client.get(reverse('artwork-list'), {'sort': 'trending'})
+        self.assertNotIn('ETag', response)
+        ids = [row['id'] for row in streamed_json(response)]
+        self.assertEqual(ids, [self.artworks[2].id, self.artworks[0].id, self.artworks[1].id])
+        # A catalog refresh leaves the score alone
+        self.artworks[2].title = 'Renombrada'
+        self.artworks[2].save()
+        self.assertGreater(self.score(self.artworks[2]), self.score(self.artworks[0]))
+
+    def test_older_events_decay(self):
+        now = timezone.now()
+        # Two favorites one half-life ago weigh as much as one now
+        for _ in range(2):
+            record_artwork_event(self.artworks[0].id, 'favorite', at=now - timedelta(hours=TRENDING_HALF_LIFE_HOURS))
+        record_artwork_event(self.artworks[1].id, 'favorite', at=now)
+        self.assertAlmostEqual(self.score(self.artworks[0]), self.score(self.artworks[1]), places=6)
+
+        record_artwork_event(self.artworks[2].id, 'favorite', at=now - timedelta(hours=TRENDING_HALF_LIFE_HOURS * 10))
+        self.assertLess(self.score(self.artworks[2]), self.score(self.artworks[1]))
+
+    def test_donations_rank_projects(self):
+        projects = [Project.objects.create(title=f'Proyecto {i}', description='-', funding_goal=Decimal('1000.00'), artist=self.artist) for i in range(2)]
+        Donation.objects.create(project=projects[1], donor=self.fans[0], amount=Decimal('10.00'))
+
+        response = self.client.get(reverse('project-list'), {'sort': 'trending'})
+        self.assertEqual([row['id'] for row in response.data['results']], [projects[1].id, projects[0].id])
@@ -0,0 +1,55 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import F, Value, FloatField
+from django.db.models.functions import Exp, Greatest, Least, Ln
+from django.utils import timezone
+
+from .models import ArtworkCatalogEntry, Project
+
+# Scores are kept in log space relative to a fixed epoch:
+#
+#     score = log(sum of weight * 2 ** ((event_time - EPOCH) / half_life))
+#
+# Decaying every score by the same factor doesn't change the ranking, so
+# nothing is ever rescaled: an event adds its term with one logaddexp UPDATE,
+# and scores of different ages compare directly. The default of 0 sits far
+# below any event since the epoch, so it acts as "no activity".
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+TRENDING_HALF_LIFE_HOURS = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 72)
+
+TRENDING_WEIGHTS = {
+    'favorite': 1.0,
+    'rating': 1.0,
+    'purchase': 3.0,
+    'sale': 2.0,
+    'donation': 3.0,
+}
+
+
+def event_exponent(event, at=None):
+    """
+    log(weight) plus the event's growth since the epoch, in the score's units.
+    """
+    at = at or timezone.now()
+    hours = (at - TRENDING_EPOCH).total_seconds() / 3600
+    return math.log(TRENDING_WEIGHTS[event]) + hours * math.log(2) / TRENDING_HALF_LIFE_HOURS
+
+
+def _logaddexp(field, exponent):
+    # log(e^a + e^b) = max(a, b) + log(1 + e^(min(a, b) - max(a, b))), computed by the database
+    value = Value(exponent, output_field=FloatField())
+    high = Greatest(F(field), value)
+    return high + Ln(Value(1.0) + Exp(Least(F(field), value) - high))
+
+
+def record_artwork_event(artwork_id, event, at=None):
+    if artwork_id:
+        ArtworkCatalogEntry.objects.filter(pk=artwork_id).update(
+            trending_score=_logaddexp('trending_score', event_exponent(event, at)))
+
+
+def record_project_event(project_id, event, at=None):
+    if project_id:
+        Project.objects.filter(pk=project_id).update(
+            trending_score=_logaddexp('trending_score', event_exponent(event, at)))
@@ -30,6 +30,10 @@ from .views import (
     UserWalletView,
     ArtistArtworkListView,
     NonDirectSaleArtworkListView,
+    ArtworkTagFacetView,
+    ArtworkFacetView,
+    ArtworkBatchView,
+    ArtistSummaryView,
     ImageUploadView,
     AuctionCreateView,
     ArtworkTokenizeView,
@@ -61,12 +65,16 @@ urlpatterns = [
     path('upload/', ImageUploadView.as_view(), name='image-upload'),
 
     path('artists/', ArtistListView.as_view(), name='artist-list'),
+    path('artists/<int:artist_id>/summary/', ArtistSummaryView.as_view(), name='artist-summary'),
     path('artists/<int:artist_id>/projects/', ArtistProjectListView.as_view(), name='artist-project-list'),
 
     path('projects/', ProjectListView.as_view(), name='project-list'),
     path('projects/<int:pk>/', ProjectDetailView.as_view(), name='project-detail'),
 
     path('artworks/', ArtworkListView.as_view(), name='artwork-list'),
+    path('artworks/batch/', ArtworkBatchView.as_view(), name='artwork-batch'),
+    path('artworks/facets/', ArtworkFacetView.as_view(), name='artwork-facets'),
+    path('artworks/tags/', ArtworkTagFacetView.as_view(), name='artwork-tag-facets'),
     path('artworks/non-direct-sale/', NonDirectSaleArtworkListView.as_view(), name='artwork-non-direct-sale-list'),
     path('artworks/create/', ArtworkCreateView.as_view(), name='artwork-create'),
     path('artworks/recommended/', ArtworkRecommendedView.as_view(), name='artwork-recommended'),
@@ -1,9 +1,22 @@
-from django.db.models import Q, Case, When, Value, CharField
+from django.db.models import F, Case, When, Value, CharField
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from .permissions import IsAdminRoleUser
+from .catalog import refresh_catalog_entries
+from .pagination import KeysetPaginationMixin, nulls_last_ordering
+from .query_plan import QueryPlanMixin
+from .prefetch import top_k_prefetch
+from .artist_stats import adjust_artist_stats, get_artist_stats
+from .fieldsets import SparseFieldsetMixin, requested_fieldset
+from .detail_cache import get_artwork_section, set_artwork_section, invalidate_artwork, detail_variant, DETAIL, RATING, AUCTION_ID
+from .streaming import StreamingListMixin
+from .trending import record_artwork_event
+from .search import filter_by_search, search_artwork_ids, rank_expression
+from .tags import filter_by_tags, tag_counts, normalize_tags
+from .catalog import catalog_facets
+from .conditional import ConditionalListMixin, bump_resource_versions, ARTWORK, CUADRO_TOKEN, AUCTION, SELL_ORDER, USER
 from rest_framework_simplejwt.tokens import RefreshToken
 from eth_account import Account
 from django.contrib.auth import authenticate
@@ -13,10 +26,11 @@ import cloudinary.uploader
 from django.shortcuts import get_object_or_404
 import subprocess
 
-from .models import User, Artwork, Order, Favorite, Wallet, BankAccount, Auction, Project, ArtistPerformance
+from .models import User, Artwork, Order, Favorite, Wallet, BankAccount, Auction, Project, ArtistPerformance, ArtworkCatalogEntry
 from finance.models import TokenHolding, CuentaComitente, SellOrder, SellOrder
+from finance.platform_accounts import get_platform_accounts
 from blockchain.models import CuadroToken
-from django.db.models import Q, Avg
+from django.db.models import Avg, Count
 import random
 from .serializers import (
     UserRegistrationSerializer,
@@ -26,6 +40,7 @@ from .serializers import (
     UserUpdateSerializer,
     UserDetailSerializer,
     ArtworkListItemSerializer,
+    ArtworkCatalogSerializer,
     ArtworkDetailSerializer,
     ArtworkDetailSerializer,
     ArtworkCreateSerializer,
@@ -46,16 +61,37 @@ from .serializers import (
     ArtistSerializer,
     ProjectSerializer,
     ProjectCreateUpdateSerializer,
-    GenerateArtworkNFTSerializer
+    GenerateArtworkNFTSerializer,
+    ARTWORK_PREVIEW_ORDERINGS,
+    ARTWORK_PREVIEW_SIZE,
 )
 import subprocess
 import os
 import json
+import hashlib
+from decimal import Decimal, InvalidOperation
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 
-class ProjectListView(generics.ListCreateAPIView):
+# sort=trending for the project lists; the pk keeps the order total
+PROJECT_SORT_ORDERINGS = {
+    'trending': ('-trending_score', '-pk'),
+}
+
+class ProjectSortMixin:
+    def sort_projects(self, queryset):
+        sort = self.request.query_params.get('sort')
+        if sort in PROJECT_SORT_ORDERINGS:
+            queryset = queryset.order_by(*PROJECT_SORT_ORDERINGS[sort])
+        return queryset
+
+class ProjectListView(ProjectSortMixin, QueryPlanMixin, generics.ListCreateAPIView):
     queryset = Project.objects.all()
+    select_related_fields = ('artist',)
+
+    def get_queryset(self):
+        return self.sort_projects(super().get_queryset())
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -96,18 +132,62 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         return self.queryset.filter(artist=user)
 
-class ArtistProjectListView(generics.ListAPIView):
+class ArtistProjectListView(ProjectSortMixin, QueryPlanMixin, generics.ListAPIView):
     serializer_class = ProjectSerializer
+    select_related_fields = ('artist',)
     permission_classes = (AllowAny,)
 
     def get_queryset(self):
         artist_id = self.kwargs['artist_id']
-        return Project.objects.filter(artist_id=artist_id)
+        return self.sort_projects(Project.objects.filter(artist_id=artist_id))
 
-class ArtistListView(generics.ListAPIView):
+class ArtistListView(ConditionalListMixin, QueryPlanMixin, generics.ListAPIView):
     queryset = User.objects.filter(role='artist')
     serializer_class = ArtistSerializer
     permission_classes = (AllowAny,)
+    etag_resources = (USER, ARTWORK)
+
+    def get_prefetch_related_fields(self):
+        # ?preview=first|newest|best-rated picks which 3 artworks each artist shows
+        ordering = ARTWORK_PREVIEW_ORDERINGS.get(self.request.query_params.get('preview'), ARTWORK_PREVIEW_ORDERINGS['first'])
+        previews = Artwork.objects.only('id', 'artist_id', 'image')
+        return [top_k_prefetch('artworks', ARTWORK_PREVIEW_SIZE, ordering, queryset=previews, to_attr='preview_artworks')]
+
+class ArtistSummaryView(APIView):
+    """
+    Everything an artist page shows, read from the artist's ArtistStats row.
+    """
+    permission_classes = (AllowAny,)
+
+    def get(self, request, artist_id):
+        artist = get_object_or_404(User, pk=artist_id, role='artist')
+        stats = get_artist_stats(artist.id)
+        return Response({
+            'artist': {'id': artist.id, 'name': artist.name, 'avatarUrl': artist.avatarUrl},
+            'artworks': {
+                'pending': stats.artworks_pending,
+                'approved': stats.artworks_approved,
+                'rejected': stats.artworks_rejected,
+                'sold': stats.artworks_sold,
+                'total': stats.artworks_pending + stats.artworks_approved + stats.artworks_rejected,
+            },
+            'tokens_sold': stats.tokens_sold,
+            'revenue': {
+                'primary': stats.primary_revenue,
+                'secondary': stats.secondary_revenue,
+            },
+            'donations': {
+                'received': stats.donations_received,
+                'count': stats.donations_count,
+            },
+            'projects': {
+                'count': stats.projects_count,
+                'funded': stats.projects_funded,
+                'raised': stats.projects_raised,
+            },
+            'favorites_count': stats.favorites_count,
+            'updated_at': stats.updated_at,
+        })
 
 # Auth Views
 class RegisterView(generics.CreateAPIView):
@@ -215,8 +295,9 @@ class UserWalletView(generics.RetrieveAPIView):
             from django.http import Http404
             raise Http404
             
-class ArtistArtworkListView(generics.ListAPIView):
+class ArtistArtworkListView(SparseFieldsetMixin, QueryPlanMixin, generics.ListAPIView):
     serializer_class = ArtworkListItemSerializer
+    select_related_fields = ('artist',)
     permission_classes = (AllowAny,)
 
     def get_queryset(self):
@@ -245,50 +326,187 @@ class ImageUploadView(APIView):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class NonDirectSaleArtworkListView(generics.ListAPIView):
-    serializer_class = ArtworkListItemSerializer
+    serializer_class = ArtworkCatalogSerializer
     permission_classes = (AllowAny,)
 
     def get_queryset(self):
-        return Artwork.objects.filter(venta_directa=False)
+        return ArtworkCatalogEntry.objects.filter(venta_directa=False)
 
 # Artwork Views
-class ArtworkListView(generics.ListAPIView):
-    queryset = Artwork.objects.all() # Return all artworks, both tokenized and direct sale
-    serializer_class = ArtworkListItemSerializer
+# sort: relevance, newest, price-asc, price-desc, rating-desc, trending. The pk tiebreaker
+# keeps the order total, which keyset pagination relies on.
+ARTWORK_SORT_ORDERINGS = {
+    'newest': ('-createdAt', '-pk'),
+    'price-asc': ('price', 'pk'),
+    'price-desc': ('-price', '-pk'),
+    'rating-desc': ('-rating_avg', '-pk'),
+    'trending': ('-trending_score', '-pk'),
+}
+# Position in the full-text results, only available when q is given
+RELEVANCE_ORDERING = ('search_rank', 'pk')
+
+class ArtworkCatalogFilterMixin:
+    """
+    Catalog filters shared by the artwork list and its facet endpoints.
+    """
+    # Whether sort=relevance ranks q with the capped search; facets count every match
+    ranks_search = True
+
+    def get_requested_tags(self):
+        params = self.request.query_params
+        tags = params.getlist('tag')
+        for value in params.getlist('tags'):
+            tags.extend(value.split(','))
+        return [tag for tag in tags if tag.strip()]
+
+    def filter_catalog(self, queryset):
+        # q: Búsqueda por título/descripción/autor/tags/medidas/soporte
+        q = self.request.query_params.get('q', None)
+        self.ranked_ids = None
+        if q and self.ranks_search and self.request.query_params.get('sort') == 'relevance':
+            # Ranking is capped at MAX_RESULTS ids; other sorts see every match
+            self.ranked_ids = search_artwork_ids(q)
+            queryset = queryset.filter(pk__in=self.ranked_ids)
+        elif q:
+            queryset = filter_by_search(queryset, q)
+
+        # tag / tags: Filtrar por tags, todos (tag_match=all) o alguno (tag_match=any)
+        tags = self.get_requested_tags()
+        if tags:
+            match = 'any' if self.request.query_params.get('tag_match') == 'any' else 'all'
+            queryset = filter_by_tags(queryset, tags, match=match)
+
+        params = self.request.query_params
+        for field in ('estado_venta', 'status', 'soporte'):
+            if params.get(field):
+                queryset = queryset.filter(**{field: params[field]})
+        if params.get('venta_directa') in ('true', 'false'):
+            queryset = queryset.filter(venta_directa=params['venta_directa'] == 'true')
+        try:
+            if params.get('min_price'):
+                queryset = queryset.filter(price__gte=Decimal(params['min_price']))
+            if params.get('max_price'):
+                queryset = queryset.filter(price__lte=Decimal(params['max_price']))
+        except InvalidOperation:
+            raise ValidationError({'price': 'min_price y max_price deben ser numéricos.'})
+
+        return queryset
+
+    def get_filter_key(self):
+        """
+        A stable representation of the filters above, used as a cache key.
+        """
+        params = self.request.query_params
+        key = {
+            'q': ' '.join((params.get('q') or '').lower().split()),
+            'tags': sorted(normalize_tags(self.get_requested_tags())),
+            'tag_match': 'any' if params.get('tag_match') == 'any' else 'all',
+        }
+        for field in ('estado_venta', 'status', 'soporte', 'venta_directa', 'min_price', 'max_price'):
+            key[field] = params.get(field) or ''
+        return json.dumps(key, sort_keys=True)
+
+class ArtworkListView(ConditionalListMixin, StreamingListMixin, SparseFieldsetMixin, ArtworkCatalogFilterMixin, KeysetPaginationMixin, generics.ListAPIView):
+    # Reads from the denormalized catalog, both tokenized and direct sale artworks
+    queryset = ArtworkCatalogEntry.objects.all()
+    serializer_class = ArtworkCatalogSerializer
     permission_classes = (AllowAny,)
-    pagination_class = None # Disable pagination for this endpoint
+    pagination_class = None # Unpaginated (and streamed) unless ?pagination=cursor is requested
+    # Everything the catalog rows are derived from
+    etag_resources = (ARTWORK, CUADRO_TOKEN, SELL_ORDER, USER)
+
+    def get_etag_resources(self):
+        # Trending scores move with every favorite, rating and trade, which aren't versioned
+        if self.request.query_params.get('sort') == 'trending':
+            return None
+        return super().get_etag_resources()
+
+    def get_keyset_ordering(self):
+        sort = self.request.query_params.get('sort', None)
+        if sort == 'relevance' and self.request.query_params.get('q'):
+            return RELEVANCE_ORDERING
+        return ARTWORK_SORT_ORDERINGS.get(sort, ('pk',))
 
     # Implement filtering and sorting based on OpenAPI parameters
     def get_queryset(self):
-        queryset = super().get_queryset()
-        # q: Búsqueda por título/autor/tags
-        q = self.request.query_params.get('q', None)
-        if q:
-            queryset = queryset.filter(
-                Q(title__icontains=q) |
-                Q(artist__name__icontains=q) |
-                Q(tags__icontains=q) # Assuming tags are stored as JSONField and can be searched this way
-            )
-        
-        # tag: Filtrar por tag
-        tag = self.request.query_params.get('tag', None)
-        if tag:
-            queryset = queryset.filter(tags__contains=[tag]) # For JSONField
+        queryset = self.filter_catalog(super().get_queryset())
 
-        # sort: relevance, newest, price-asc, price-desc, rating-desc
         sort = self.request.query_params.get('sort', None)
-        if sort == 'newest':
-            queryset = queryset.order_by('-createdAt')
-        elif sort == 'price-asc':
-            queryset = queryset.order_by('price')
-        elif sort == 'price-desc':
-            queryset = queryset.order_by('-price')
-        elif sort == 'rating-desc':
-            queryset = queryset.order_by('-rating_avg')
-        # 'relevance' would require a more complex search backend
+        if sort == 'relevance' and self.ranked_ids is not None:
+            queryset = queryset.annotate(search_rank=rank_expression(self.ranked_ids)).order_by(*RELEVANCE_ORDERING)
+        elif sort in ARTWORK_SORT_ORDERINGS:
+            # Same NULL placement as the keyset pages, e.g. unpriced artworks last
+            queryset = queryset.order_by(*nulls_last_ordering(queryset.model, ARTWORK_SORT_ORDERINGS[sort]))
 
         return queryset
 
+# Upper bound on ?ids= for ArtworkBatchView
+ARTWORK_BATCH_MAX_IDS = 300
+
+class ArtworkBatchView(SparseFieldsetMixin, QueryPlanMixin, generics.GenericAPIView):
+    """
+    Resolves up to ARTWORK_BATCH_MAX_IDS artworks (?ids=3,1,2) with one query
+    and one serializer pass. Results keep the requested order; ids that don't
+    exist are reported in 'missing'.
+    """
+    queryset = Artwork.objects.all()
+    serializer_class = ArtworkDetailSerializer
+    permission_classes = (IsAuthenticated,)
+    select_related_fields = ('artist',)
+
+    def get(self, request):
+        raw_ids = [raw.strip() for raw in (request.query_params.get('ids') or '').split(',') if raw.strip()]
+        invalid = [raw for raw in raw_ids if not raw.isdigit()]
+        if invalid:
+            return Response({'error': f'Invalid artwork ids: {", ".join(invalid[:10])}'}, status=status.HTTP_400_BAD_REQUEST)
+        # Duplicates are resolved once, keeping the first position
+        ids = list(dict.fromkeys(int(raw) for raw in raw_ids))
+        if not ids:
+            return Response({'error': 'ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > ARTWORK_BATCH_MAX_IDS:
+            return Response({'error': f'At most {ARTWORK_BATCH_MAX_IDS} ids per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+        found = self.filter_queryset(self.get_queryset()).in_bulk(ids)
+        artworks = [found[pk] for pk in ids if pk in found]
+        return Response({
+            'results': self.get_serializer(artworks, many=True).data,
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+class ArtworkFacetView(ArtworkCatalogFilterMixin, APIView):
+    """
+    Filter sidebar counts for any artworks/ filter combination, cached for a few seconds.
+    """
+    permission_classes = (AllowAny,)
+    # Counts cover every match whatever the sort, which the cache key leaves out
+    ranks_search = False
+    cache_ttl = getattr(settings, 'CATALOG_FACETS_CACHE_TTL', 30)
+
+    def get(self, request):
+        cache_key = 'artwork-facets:' + hashlib.sha1(self.get_filter_key().encode('utf-8')).hexdigest()
+        facets = cache.get(cache_key)
+        if facets is None:
+            queryset = self.filter_catalog(ArtworkCatalogEntry.objects.all())
+            facets = catalog_facets(queryset)
+            facets['tags'] = {row['tag']: row['count'] for row in tag_counts(queryset, limit=50)}
+            cache.set(cache_key, facets, self.cache_ttl)
+        return Response(facets)
+
+class ArtworkTagFacetView(ArtworkCatalogFilterMixin, APIView):
+    """
+    Per-tag counts for the artworks matching the same filters as artworks/.
+    """
+    permission_classes = (AllowAny,)
+    ranks_search = False
+
+    def get(self, request):
+        queryset = self.filter_catalog(ArtworkCatalogEntry.objects.all())
+        try:
+            limit = int(request.query_params.get('limit', 50))
+        except ValueError:
+            limit = 50
+        return Response({'tags': tag_counts(queryset, limit=limit)})
+
 class ArtworkCreateView(generics.CreateAPIView):
     queryset = Artwork.objects.all()
     serializer_class = ArtworkCreateSerializer
@@ -300,9 +518,12 @@ class ArtworkCreateView(generics.CreateAPIView):
         serializer.save(artist=self.request.user)
 
 # Remaining Artwork Views
-class ArtworkRecommendedView(generics.ListAPIView):
-    queryset = Artwork.objects.filter(status='approved').order_by('-rating_avg') # Simple recommendation for now
+class ArtworkRecommendedView(QueryPlanMixin, generics.ListAPIView):
+    # Trending first, rating as the tiebreaker for artworks without recent activity
+    queryset = Artwork.objects.filter(status='approved').order_by(
+        F('catalog_entry__trending_score').desc(nulls_last=True), '-rating_avg', '-pk')
     serializer_class = ArtworkListItemSerializer
+    select_related_fields = ('artist',)
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
@@ -313,8 +534,9 @@ class ArtworkRecommendedView(generics.ListAPIView):
             limit = 5 # Default if invalid
         return super().get_queryset()[:limit]
 
-class ArtworkDetailUpdateView(generics.RetrieveUpdateAPIView):
+class ArtworkDetailUpdateView(SparseFieldsetMixin, QueryPlanMixin, generics.RetrieveUpdateAPIView):
     queryset = Artwork.objects.all()
+    select_related_fields = ('artist',)
     permission_classes = (IsAuthenticated,)
     lookup_field = 'pk'
 
@@ -334,11 +556,24 @@ class ArtworkDetailUpdateView(generics.RetrieveUpdateAPIView):
         # Only allow artist to update their own artworks
         return self.queryset.filter(artist=user)
 
+    def retrieve(self, request, *args, **kwargs):
+        if requested_fieldset(request) is not None:
+            return super().retrieve(request, *args, **kwargs)
+        data = get_artwork_section(
+            self.kwargs['pk'], DETAIL,
+            lambda: super(ArtworkDetailUpdateView, self).retrieve(request, *args, **kwargs).data,
+            variant=detail_variant(request),
+        )
+        return Response(data)
+
     def perform_update(self, serializer):
         # If status was approved, set it back to pending on update
         if serializer.instance.status == 'approved':
             serializer.instance.status = 'pending'
-        serializer.save()
+        artwork = serializer.save()
+        invalidate_artwork(artwork.id)
+        detail = ArtworkDetailSerializer(artwork, context=self.get_serializer_context()).data
+        set_artwork_section(artwork.id, DETAIL, detail, variant=detail_variant(self.request))
 
 class ArtworkDeleteView(generics.DestroyAPIView):
     permission_classes = (IsAuthenticated,)
@@ -352,18 +587,18 @@ class ArtworkRatingView(APIView):
     permission_classes = (AllowAny,) # Rating can be public
     
     def get(self, request, pk):
-        try:
-            artwork = Artwork.objects.get(id=pk)
-            rating_data = {
-                'avg': artwork.rating_avg,
-                'count': artwork.rating_count,
-            }
-            if request.user.is_authenticated:
-                # Placeholder for 'my' rating if implemented
-                rating_data['my'] = 0 
-            return Response(RatingSerializer(rating_data).data)
-        except Artwork.DoesNotExist:
+        def build():
+            rating = Artwork.objects.filter(id=pk).values('rating_avg', 'rating_count').first()
+            return rating and {'avg': rating['rating_avg'], 'count': rating['rating_count']}
+
+        rating = get_artwork_section(pk, RATING, build)
+        if rating is None:
             return Response({'error': 'Artwork not found'}, status=status.HTTP_404_NOT_FOUND)
+        rating_data = dict(rating)
+        if request.user.is_authenticated:
+            # Placeholder for 'my' rating if implemented
+            rating_data['my'] = 0 
+        return Response(RatingSerializer(rating_data).data)
 
 class ArtworkRateView(APIView):
     permission_classes = (IsAuthenticated,)
@@ -380,6 +615,7 @@ class ArtworkRateView(APIView):
             artwork.rating_avg = (artwork.rating_avg * artwork.rating_count + value) / (artwork.rating_count + 1)
             artwork.rating_count += 1
             artwork.save()
+            record_artwork_event(artwork.id, 'rating')
 
             rating_data = {
                 'avg': artwork.rating_avg,
@@ -390,8 +626,9 @@ class ArtworkRateView(APIView):
         except Artwork.DoesNotExist:
             return Response({'error': 'Artwork not found'}, status=status.HTTP_404_NOT_FOUND)
 
-class MyArtworksView(generics.ListAPIView):
+class MyArtworksView(SparseFieldsetMixin, QueryPlanMixin, generics.ListAPIView):
     serializer_class = ArtworkDetailSerializer # Use detail serializer for artist's own artworks
+    select_related_fields = ('artist',)
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
@@ -413,10 +650,12 @@ class ArtworkStatsView(APIView):
             return Response({'error': 'Artwork not found'}, status=status.HTTP_404_NOT_FOUND)
 
 # Admin Views
-class AdminArtworkListView(generics.ListAPIView):
+class AdminArtworkListView(SparseFieldsetMixin, QueryPlanMixin, KeysetPaginationMixin, generics.ListAPIView):
     queryset = Artwork.objects.all() # Admin can see all statuses
     serializer_class = ArtworkListItemSerializer # Or a more detailed admin serializer
+    select_related_fields = ('artist',)
     permission_classes = (IsAdminRoleUser,)
+    keyset_ordering = ('-createdAt', '-pk')
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -450,7 +689,10 @@ class AdminArtworkStatusUpdateView(generics.UpdateAPIView):
         # artwork.moderation_reason = reason
 
         artwork.save()
-        return Response(self.get_serializer(artwork).data)
+        data = self.get_serializer(artwork).data
+        invalidate_artwork(artwork.id)
+        set_artwork_section(artwork.id, DETAIL, data, variant=detail_variant(request))
+        return Response(data)
 
 # Order Views
 class OrderCreateView(generics.CreateAPIView):
@@ -521,8 +763,9 @@ class FavoriteDeleteView(APIView):
         except Exception as e: # If not favorited, just return false
             return Response({'favorited': False}, status=status.HTTP_200_OK)
 
-class MyFavoritesView(generics.ListAPIView):
+class MyFavoritesView(SparseFieldsetMixin, QueryPlanMixin, generics.ListAPIView):
     serializer_class = ArtworkListItemSerializer # List of favorite artworks
+    select_related_fields = ('artist',)
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
@@ -592,12 +835,13 @@ class ArtworkTokenizeView(APIView):
         # Get artist and platform addresses
         try:
             artist_wallet = Wallet.objects.get(user=artwork.artist)
-            admin_user = User.objects.get(role='admin')
-            platform_wallet = Wallet.objects.get(user=admin_user)
         except Wallet.DoesNotExist:
             return Response({"error": "Wallet not found for artist or platform"}, status=status.HTTP_400_BAD_REQUEST)
-        except User.DoesNotExist:
+        platform_accounts = get_platform_accounts()
+        if platform_accounts is None:
             return Response({"error": "Admin user not found"}, status=status.HTTP_400_BAD_REQUEST)
+        if platform_accounts.wallet_address is None:
+            return Response({"error": "Wallet not found for artist or platform"}, status=status.HTTP_400_BAD_REQUEST)
 
         # Generate token symbol
         artist_name_parts = artwork.artist.name.split()
@@ -618,7 +862,7 @@ class ArtworkTokenizeView(APIView):
             artwork.artist.name,
             str(artwork.createdAt.year),
             artist_wallet.address,
-            platform_wallet.address,
+            platform_accounts.wallet_address,
             str(artwork.fractionsTotal),
             token_symbol,
         ]
@@ -636,6 +880,7 @@ class ArtworkTokenizeView(APIView):
             # Save contract address to artwork
             artwork.contract_address = contract_address
             artwork.save()
+            invalidate_artwork(artwork.id)
 
             return Response({"contract_address": contract_address}, status=status.HTTP_200_OK)
         except subprocess.CalledProcessError as e:
@@ -643,21 +888,33 @@ class ArtworkTokenizeView(APIView):
         except FileNotFoundError:
             return Response({"error": "Node.js or deployment script not found"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class AuctionListView(generics.ListAPIView):
+class AuctionListView(ConditionalListMixin, SparseFieldsetMixin, QueryPlanMixin, generics.ListAPIView):
     serializer_class = AuctionSerializer
+    select_related_fields = ('artwork__artist',)
     permission_classes = (AllowAny,)
+    etag_resources = (AUCTION, ARTWORK, USER)
 
-    def get_queryset(self):
-        print("--- [DEBUG] AuctionListView: get_queryset ---")
+    def list(self, request, *args, **kwargs):
+        # Status transitions must land before the ETag is computed
+        self.update_auction_statuses()
+        return super().list(request, *args, **kwargs)
+
+    def update_auction_statuses(self):
+        print("--- [DEBUG] AuctionListView: update_auction_statuses ---")
         now = timezone.now()
         today = now.date()
 
         finished_auctions = Auction.objects.filter(status__in=['upcoming', 'active'], auction_date__date__lt=today)
         print(f"[DEBUG] Found {len(finished_auctions)} finished auctions.")
 
-        artwork_ids_to_update = [auction.artwork.id for auction in finished_auctions]
+        artwork_ids_to_update = [auction.artwork_id for auction in finished_auctions]
         if artwork_ids_to_update:
             print(f"[DEBUG] Updating artworks with IDs: {artwork_ids_to_update}\n")
+            newly_sold = (
+                Artwork.objects.filter(id__in=artwork_ids_to_update).exclude(estado_venta='vendida')
+                .values('artist_id').annotate(count=Count('pk')).order_by()
+            )
+            newly_sold = {row['artist_id']: row['count'] for row in newly_sold}
             Artwork.objects.filter(id__in=artwork_ids_to_update).update(estado_venta='vendida')
             finished_auctions.update(status='finished')
 
@@ -665,12 +922,22 @@ class AuctionListView(generics.ListAPIView):
             SellOrder.objects.filter(token__artwork__id__in=artwork_ids_to_update, status='abierta').update(status='cerrada')
             print(f"[DEBUG] Closed open sell orders for artworks with IDs: {artwork_ids_to_update}\n")
 
-        Auction.objects.filter(status__in=['upcoming', 'active'], auction_date__date=today).update(status='active')
+            # Bulk updates skip the model signals, so refresh the catalog and versions explicitly
+            refresh_catalog_entries(artwork_ids_to_update)
+            invalidate_artwork(*artwork_ids_to_update)
+            for artist_id, count in newly_sold.items():
+                adjust_artist_stats(artist_id, artworks_sold=count)
+            bump_resource_versions(AUCTION, ARTWORK, SELL_ORDER)
+
+        if Auction.objects.filter(status__in=['upcoming', 'active'], auction_date__date=today).update(status='active'):
+            bump_resource_versions(AUCTION)
 
+    def get_queryset(self):
         return Auction.objects.all()
 
-class AuctionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AuctionDetailView(SparseFieldsetMixin, QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Auction.objects.all()
+    select_related_fields = ('artwork__artist',)
     serializer_class = AuctionSerializer
     permission_classes = (IsAdminRoleUser,)
     lookup_field = 'pk'
@@ -695,7 +962,10 @@ class AuctionDetailView(generics.RetrieveUpdateDestroyAPIView):
                 obj.artwork.save()
 
                 # Close associated open sell orders
-                SellOrder.objects.filter(token__artwork=obj.artwork, status='abierta').update(status='cerrada')
+                if SellOrder.objects.filter(token__artwork=obj.artwork, status='abierta').update(status='cerrada'):
+                    # The bulk update skips the model signals, so the best ask and versions are refreshed here
+                    refresh_catalog_entries([obj.artwork_id])
+                    bump_resource_versions(SELL_ORDER)
                 print(f"[DEBUG] Closed open sell orders for artwork {obj.artwork.id}.\n")
             elif obj.auction_date.date() == today:
                 new_status = 'active'
@@ -712,9 +982,13 @@ class ArtworkAuctionDetailView(APIView):
     permission_classes = [AllowAny] # Or IsAuthenticated, depending on your requirements
 
     def get(self, request, artwork_id):
-        artwork = get_object_or_404(Artwork, pk=artwork_id)
-        if hasattr(artwork, 'auction'):
-            return Response({'auction_id': artwork.auction.id}, status=status.HTTP_200_OK)
+        def build():
+            artwork = get_object_or_404(Artwork, pk=artwork_id)
+            return Auction.objects.filter(artwork=artwork).values_list('id', flat=True).first()
+
+        auction_id = get_artwork_section(artwork_id, AUCTION_ID, build)
+        if auction_id is not None:
+            return Response({'auction_id': auction_id}, status=status.HTTP_200_OK)
         else:
             return Response({'error': 'No auction found for this artwork'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -727,13 +1001,12 @@ class AuctionDeleteView(generics.DestroyAPIView):
         instance = self.get_object()
         artwork = instance.artwork
         artist = artwork.artist
-        admin_user = User.objects.filter(role='admin').first()
+        platform_accounts = get_platform_accounts()
 
-        if admin_user:
+        if platform_accounts:
             try:
                 cuadro_token = CuadroToken.objects.get(artwork=artwork)
-                TokenHolding.objects.filter(token=cuadro_token, user=artist).delete()
-                TokenHolding.objects.filter(token=cuadro_token, user=admin_user).delete()
+                TokenHolding.objects.filter(token=cuadro_token, user_id__in=[artist.id, platform_accounts.user_id]).delete()
                 cuadro_token.delete()
             except CuadroToken.DoesNotExist:
                 # Handle case where token does not exist
@@ -759,8 +1032,9 @@ class UserDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     lookup_field = 'pk'
 
-class RecommendedArtworksView(generics.ListAPIView):
+class RecommendedArtworksView(QueryPlanMixin, generics.ListAPIView):
     serializer_class = ArtworkListItemSerializer
+    select_related_fields = ('artist',)
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -817,13 +1091,14 @@ class GenerateArtworkNFTView(APIView):
             buyer = User.objects.get(pk=user_id)
             artwork = Artwork.objects.get(pk=artwork_id)
             auction = Auction.objects.get(pk=auction_id)
-            admin_user = User.objects.filter(role='admin').first()
+            platform_accounts = get_platform_accounts()
             
-            if not admin_user:
+            if not platform_accounts:
                 return Response({'error': 'Admin user not found.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             buyer_wallet = Wallet.objects.get(user=buyer)
-            admin_wallet = Wallet.objects.get(user=admin_user)
+            if platform_accounts.wallet_address is None:
+                raise Wallet.DoesNotExist('Admin does not have a wallet.')
 
         except (User.DoesNotExist, Artwork.DoesNotExist, Auction.DoesNotExist, Wallet.DoesNotExist) as e:
             return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
@@ -914,6 +1189,7 @@ class MarkArtworkAsSoldView(APIView):
 
         artwork.estado_venta = 'vendida'
         artwork.save()
+        invalidate_artwork(artwork.id)
 
         serializer = ArtworkDetailSerializer(artwork) # Use a detail serializer for the response
         return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
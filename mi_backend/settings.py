@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta # Moved this import to the top
 
@@ -152,6 +153,41 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20, # Default page size
 }
 
+# Local memory by default; set REDIS_URL to share the cache between workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fondiart',
+    },
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+# Serialized artwork pages (see fondiart_api.detail_cache)
+ARTWORK_DETAIL_CACHE_ALIAS = 'default'
+ARTWORK_DETAIL_CACHE_TTL = 300
+
+# Transactions per account between two finance.BalanceCheckpoint rows
+BALANCE_CHECKPOINT_INTERVAL = 100
+
+# How long a stored Idempotency-Key response can be replayed (see finance.idempotency)
+IDEMPOTENCY_KEY_TTL_HOURS = 24
+
+# Transactions younger than this are left past the reconciliation watermark,
+# so rows still committing get folded by a later run (see finance.reconciliation).
+# Must exceed the longest transaction that writes to the ledger.
+RECONCILIATION_WATERMARK_LAG_SECONDS = 300
+
+# Half-life of the events behind sort=trending (see fondiart_api.trending)
+TRENDING_HALF_LIFE_HOURS = 72
+
+# Longest a process keeps the platform admin's accounts when invalidation
+# can't reach it, i.e. without a cache shared by every process (see finance.platform_accounts)
+PLATFORM_ACCOUNTS_TTL_SECONDS = 300
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),